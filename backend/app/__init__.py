@@ -3,10 +3,13 @@ from flask_cors import CORS
 from flask_sqlalchemy import SQLAlchemy
 from .config import Config
 import json
+import requests
 from web3 import Web3
 import logging  # Add this at the top
+import importlib
 from pathlib import Path
-from .faucet import faucet_bp
+from . import readiness
+from .readiness import health_bp
 
 db = SQLAlchemy()
 
@@ -16,8 +19,95 @@ nft_land_contract = None
 action_logger_contract = None
 nft_marketplace_contract = None
 
+# Profile -> blueprints it serves, as (module, attribute, url_prefix).
+# Modules are imported only when a profile needs them, so a read-only worker
+# never loads solcx/Ganache (deploy), the faucet signer, or the auth stack.
+PROFILE_BLUEPRINTS = {
+    'read': [('.reads', 'reads_bp', None)],
+    'write': [('.routes', 'bp', None), ('.faucet', 'faucet_bp', '/faucet')],
+    'deploy': [('.deploy.routes', 'deploy_bp', '/deploy')],
+    'admin': [('.admin_routes', 'admin_bp', None)],
+}
+
+
+def parse_profiles(value) -> list:
+    """Normalise APP_PROFILES (comma string or iterable) and reject unknown names."""
+    if isinstance(value, str):
+        value = value.split(',')
+    profiles = [p.strip().lower() for p in value if p and p.strip()]
+    unknown = [p for p in profiles if p not in PROFILE_BLUEPRINTS]
+    if unknown:
+        raise ValueError(f"Unknown APP_PROFILES entries {unknown}; expected some of {sorted(PROFILE_BLUEPRINTS)}")
+    return profiles
+
+
+def register_profile_blueprints(app, profiles):
+    registered = set()
+    for profile in profiles:
+        for module_name, attr, url_prefix in PROFILE_BLUEPRINTS[profile]:
+            if (module_name, attr) in registered:
+                continue
+            blueprint = getattr(importlib.import_module(module_name, __name__), attr)
+            app.register_blueprint(blueprint, url_prefix=url_prefix)
+            registered.add((module_name, attr))
+
+
+def _load_abi(app, config_key: str, label: str) -> list:
+    cfg_path = app.config.get(config_key)
+    if not cfg_path:
+        raise ValueError(f"{config_key} not configured")
+
+    abi_path = Path(cfg_path) if Path(cfg_path).is_absolute() else Path(__file__).parent / 'abi' / cfg_path
+    abi_text = abi_path.read_text()
+    try:
+        return json.loads(abi_text)
+    except Exception as e:
+        raise ValueError(f"Failed to parse {label} ABI at {abi_path}: {e}")
+
 
-def create_app(config_class=Config):
+def init_chain_clients(app):
+    """
+    Build this process's Web3 client and contract registry and attach them to
+    ``app`` (app.w3, app.nft_land_contract, ...).  Nothing here touches the
+    network; connectivity is validated by readiness.  Called from create_app
+    and again in every worker after fork, so each process gets its own HTTP
+    session instead of sharing the pre-fork sockets.
+    """
+    global w3, nft_land_contract, action_logger_contract, nft_marketplace_contract
+
+    w3 = Web3(Web3.HTTPProvider(app.config['RPC_URL'], session=requests.Session()))
+
+    # Load and parse NFT contract ABI
+    contract_abi = _load_abi(app, 'NFT_LAND_CONTRACT_ABI_PATH', 'NFT contract')
+    # Set the contract address (replace with your contract's deployed address)
+    contract_address = app.config.get('NFT_DOC_CONTRACT_ADDRESS')
+    nft_land_contract = w3.eth.contract(address=Web3.to_checksum_address(contract_address), abi=contract_abi)
+
+    # Load and parse ActionLogger ABI
+    action_logger_abi = _load_abi(app, 'ACTION_LOGGER_CONTRACT_ABI_PATH', 'ActionLogger')
+    contract_address = app.config.get('ACTION_LOGGER_CONTRACT_ADDRESS')
+    action_logger_contract = w3.eth.contract(address=Web3.to_checksum_address(contract_address), abi=action_logger_abi)
+
+    # NFTMarketplace is optional (listings are served from the indexed MarketListing table)
+    nft_marketplace_contract = None
+    contract_address = app.config.get('NFT_MARKETPLACE_CONTRACT_ADDRESS')
+    if contract_address:
+        marketplace_abi = _load_abi(app, 'NFT_MARKETPLACE_CONTRACT_ABI_PATH', 'NFTMarketplace')
+        nft_marketplace_contract = w3.eth.contract(address=Web3.to_checksum_address(contract_address),
+                                                   abi=marketplace_abi)
+
+    app.w3 = w3
+    app.nft_land_contract = nft_land_contract
+    app.action_logger_contract = action_logger_contract
+    app.nft_marketplace_contract = nft_marketplace_contract
+
+
+def create_app(config_class=Config, start_background=True, start_checks=True):
+    """
+    ``start_background=False`` leaves long-lived background services (the
+    event indexer) and ``start_checks=False`` the startup-check thread to be
+    started per worker after fork; serve.py uses both.
+    """
     app = Flask(__name__)
     app.config.from_object(config_class)
     # Use configured MAX_CONTENT_LENGTH from Config (default in Config.py). Do not override here.
@@ -32,61 +122,23 @@ def create_app(config_class=Config):
 
     db.init_app(app)
 
-    global w3, nft_land_contract, action_logger_contract, nft_marketplace_contract
-
     if not app.config['RPC_URL']:
         raise ValueError("RPC_URL not set in .env or config")
 
-    w3 = Web3(Web3.HTTPProvider(app.config['RPC_URL']))
-    if not w3.is_connected():
-        raise ConnectionError("Failed to connect to RPC")
-    app.w3 = w3
-
-    # Load and parse NFT contract ABI
-    cfg_path = app.config.get('NFT_LAND_CONTRACT_ABI_PATH')
-    if not cfg_path:
-        raise ValueError("NFT_LAND_CONTRACT_ABI_PATH not configured")
-
-    abi_path = Path(cfg_path) if Path(cfg_path).is_absolute() else Path(__file__).parent / 'abi' / cfg_path
-    contract_abi_text = abi_path.read_text()
-    try:
-        contract_abi = json.loads(contract_abi_text)
-    except Exception as e:
-        raise ValueError(f"Failed to parse NFT contract ABI at {abi_path}: {e}")
-
-    # Set the contract address (replace with your contract's deployed address)
-    contract_address = app.config.get('NFT_DOC_CONTRACT_ADDRESS')
-    # Check that contract code exists at address
-    if not w3.eth.get_code(Web3.to_checksum_address(contract_address)):
-        raise ConnectionError(f"No contract code found at NFT_DOC_CONTRACT_ADDRESS {contract_address} on RPC")
-
-    nft_land_contract = w3.eth.contract(address=Web3.to_checksum_address(contract_address), abi=contract_abi)
+    init_chain_clients(app)
 
-    # Load and parse ActionLogger ABI
-    cfg_path = app.config.get('ACTION_LOGGER_CONTRACT_ABI_PATH')
-    if not cfg_path:
-        raise ValueError("ACTION_LOGGER_CONTRACT_ABI_PATH not configured")
-    abi_path = Path(cfg_path) if Path(cfg_path).is_absolute() else Path(__file__).parent / 'abi' / cfg_path
-    action_logger_abi_text = abi_path.read_text()
-    try:
-        action_logger_abi = json.loads(action_logger_abi_text)
-    except Exception as e:
-        raise ValueError(f"Failed to parse ActionLogger ABI at {abi_path}: {e}")
-
-    contract_address = app.config.get('ACTION_LOGGER_CONTRACT_ADDRESS')
-    if not w3.eth.get_code(Web3.to_checksum_address(contract_address)):
-        app.logger.warning(f"No contract code found at ACTION_LOGGER_CONTRACT_ADDRESS {contract_address}")
-    action_logger_contract = w3.eth.contract(address=Web3.to_checksum_address(contract_address), abi=action_logger_abi)
+    # Blueprints — only those the configured profiles need
+    profiles = parse_profiles(app.config.get('APP_PROFILES') or PROFILE_BLUEPRINTS.keys())
+    app.config['APP_PROFILES'] = profiles
+    register_profile_blueprints(app, profiles)
+    app.register_blueprint(health_bp)
+    app.logger.info(f"Serving profiles: {', '.join(profiles)}")
 
-    # Blueprints
-    from .routes import bp as main_bp
-    from .deploy.routes import deploy_bp
-    app.register_blueprint(main_bp)
-    app.register_blueprint(faucet_bp, url_prefix='/faucet')
-    app.register_blueprint(deploy_bp, url_prefix='/deploy')
+    # RPC reachability, contract code and db.create_all() run off the boot path
+    readiness.start(app, start_thread=start_checks)
 
-    # Create database tables if they don't exist
-    with app.app_context():
-        db.create_all()  # Ensure models are imported before this
+    if start_background:
+        from . import indexer_service
+        indexer_service.start(app)  # no-op unless INDEXER_ENABLED
 
     return app
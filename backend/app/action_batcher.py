@@ -0,0 +1,176 @@
+"""
+action_batcher.py — Coalesce ActionLogger writes into logActions batches.
+
+Every ``log_action_on_chain`` call used to be its own transaction: 21k
+intrinsic gas plus calldata and a nonce per action.  With
+ACTION_LOG_BATCHING on, calls are queued here and one flusher thread per
+process sends them as a single ``logActions(actions, details)`` tx once
+ACTION_LOG_BATCH_MAX_ITEMS are waiting or the oldest has waited
+ACTION_LOG_BATCH_MAX_WAIT_MS.  A batch of one goes out as plain
+``logAction``.
+
+The contract emits one ActionLogged per item, in order, so the indexer
+stores batched actions exactly like single ones (same tx hash, distinct
+log indexes).  Every caller in a batch gets the same TxHandle.
+
+  pending = get_batcher(app).add("document_uploaded", details_json)
+  handle = pending.wait_handle(timeout=5)     # TxHandle shared by the batch
+"""
+
+import logging
+import os
+import queue
+import threading
+import time
+
+from . import tx_sender
+
+logger = logging.getLogger(__name__)
+
+GAS_HEADROOM = 1.2           # multiplier on eth_estimateGas
+MAX_BATCH_BYTES = 64_000     # calldata cap per batch, well below node tx size limits
+# Fallback when estimateGas fails: call overhead + per-event LOG2/loop cost + calldata/log data per byte
+FALLBACK_BASE_GAS = 40_000
+FALLBACK_GAS_PER_ITEM = 8_000
+FALLBACK_GAS_PER_BYTE = 32
+
+
+class PendingAction:
+    """One queued action; resolves to the TxHandle of the batch it was sent in."""
+
+    __slots__ = ('action', 'details', 'size', 'handle', 'error', '_ready')
+
+    def __init__(self, action: str, details: str):
+        self.action = action
+        self.details = details
+        self.size = len(action.encode()) + len(details.encode())
+        self.handle = None
+        self.error = None
+        self._ready = threading.Event()
+
+    def wait_handle(self, timeout=None):
+        """Block until the batch is handed to the sender.  Returns the TxHandle or None."""
+        self._ready.wait(timeout)
+        return self.handle
+
+    def _resolve(self, handle=None, error=None):
+        self.handle, self.error = handle, error
+        self._ready.set()
+
+
+def fallback_gas(item_count: int, payload_bytes: int) -> int:
+    return FALLBACK_BASE_GAS + FALLBACK_GAS_PER_ITEM * item_count + FALLBACK_GAS_PER_BYTE * payload_bytes
+
+
+class ActionBatcher:
+
+    def __init__(self, sender, contract, max_items=50, max_wait_ms=200):
+        self.sender = sender
+        self.contract = contract
+        self.max_items = max(1, max_items)
+        self.max_wait = max(0, max_wait_ms) / 1000.0
+        self._queue = queue.Queue()
+        self._carry = None  # item that overflowed the last batch; heads the next one (flusher thread only)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._flush_loop, name="action-batcher", daemon=True)
+        self._thread.start()
+
+    def add(self, action: str, details: str) -> PendingAction:
+        pending = PendingAction(action, details)
+        self._queue.put(pending)
+        return pending
+
+    def stop(self):
+        self._stop.set()
+        self._queue.put(None)
+
+    # --- batching ---
+
+    def _collect(self, first: PendingAction) -> list:
+        """``first`` plus whatever arrives before the batch is full or its deadline passes."""
+        batch, size = [first], first.size
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_items:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                pending = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if pending is None:
+                break
+            if size + pending.size > MAX_BATCH_BYTES:
+                self._carry = pending  # starts the next batch, ahead of anything queued after it
+                break
+            batch.append(pending)
+            size += pending.size
+        return batch
+
+    def _encode(self, batch) -> str:
+        if len(batch) == 1:
+            return self.contract.encode_abi('logAction', args=[batch[0].action, batch[0].details])
+        return self.contract.encode_abi('logActions', args=[[p.action for p in batch], [p.details for p in batch]])
+
+    def _gas(self, data: str, batch) -> int:
+        try:
+            estimate = self.sender.web3.eth.estimate_gas(
+                {'from': self.sender.address, 'to': self.contract.address, 'data': data})
+            return int(estimate * GAS_HEADROOM)
+        except Exception as e:
+            logger.warning(f"logActions gas estimate failed ({e}); using formula")
+            return fallback_gas(len(batch), sum(p.size for p in batch))
+
+    def _flush(self, batch):
+        try:
+            data = self._encode(batch)
+            label = f"logAction:{batch[0].action}" if len(batch) == 1 else f"logActions:{len(batch)}"
+            handle = self.sender.submit({'to': self.contract.address, 'data': data, 'gas': self._gas(data, batch)},
+                                        label=label)
+        except Exception as e:
+            logger.error(f"Could not submit batch of {len(batch)} actions: {e}")
+            for pending in batch:
+                pending._resolve(error=str(e))
+            return
+        for pending in batch:
+            pending._resolve(handle)
+
+    def _flush_loop(self):
+        while not self._stop.is_set():
+            first, self._carry = self._carry, None
+            if first is None:
+                try:
+                    first = self._queue.get(timeout=1.0)
+                except queue.Empty:
+                    continue
+            if first is None:
+                continue
+            self._flush(self._collect(first))
+
+
+# --- per-process registry ---
+
+_batcher = None
+_batcher_lock = threading.Lock()
+
+
+def _reset_after_fork():
+    """The flusher thread and its queue belong to the parent process."""
+    global _batcher, _batcher_lock
+    _batcher = None
+    _batcher_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def get_batcher(app) -> ActionBatcher:
+    """This process's batcher, sending through the platform TxSender."""
+    global _batcher
+    with _batcher_lock:
+        if _batcher is None:
+            _batcher = ActionBatcher(tx_sender.get_sender(app), app.action_logger_contract,
+                                     max_items=app.config.get('ACTION_LOG_BATCH_MAX_ITEMS', 50),
+                                     max_wait_ms=app.config.get('ACTION_LOG_BATCH_MAX_WAIT_MS', 200))
+        return _batcher
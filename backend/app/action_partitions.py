@@ -0,0 +1,290 @@
+"""
+action_partitions.py — Monthly partitions and archival for ActionLog.
+
+ActionLog stays the hot table that the indexer writes and /admin/logs pages
+through, but only holds the last ACTION_LOG_HOT_MONTHS calendar months.
+``maintain()`` (run hourly by the indexer leader, or ``flask
+rotate-action-logs``) does two things:
+
+  rotate   older months move, one transaction per month, into
+           ``action_log_YYYY_MM`` tables with the same columns
+  archive  month tables older than ACTION_LOG_RETENTION_MONTHS are written
+           to ACTION_LOG_ARCHIVE_DIR/action_log_YYYY_MM.jsonl.gz and dropped
+
+ActionLogPartition records every month and where it lives.
+``query_range()`` routes a timestamp range to the hot table, the month
+tables it overlaps and, on request, the archive files.
+
+These are emulated partitions on every dialect.  Native Postgres
+partitioning would need timestamp in ActionLog's primary key and in the
+(tx_hash, log_index) conflict key.  That breaks SQLite's integer
+autoincrement and the indexer's idempotent inserts.
+
+Logs only reach a month table after ACTION_LOG_HOT_MONTHS.  By then they
+are far past INDEXER_CONFIRMATIONS, so the indexer never replays them into
+the hot table.
+"""
+
+import gzip
+import heapq
+import json
+import os
+from datetime import datetime, UTC
+from pathlib import Path
+
+from sqlalchemy import (MetaData, Table, Column, Integer, BigInteger, String, Text, DateTime, Index,
+                        insert, select, delete, func, inspect)
+
+from .models import ActionLog, ActionLogPartition
+
+_metadata = MetaData()
+_tables = {}
+
+ARCHIVE_ROW_BATCH = 5_000
+
+
+def utc_naive(value: datetime = None) -> datetime:
+    """``value`` (default: now) on ActionLog's clock: UTC without tzinfo.  Naive input is taken as UTC."""
+    if value is None:
+        value = datetime.now(UTC)
+    if value.tzinfo is not None:
+        value = value.astimezone(UTC).replace(tzinfo=None)
+    return value
+
+
+def month_start(value: datetime) -> datetime:
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def next_month(value: datetime) -> datetime:
+    return value.replace(year=value.year + 1, month=1) if value.month == 12 else value.replace(month=value.month + 1)
+
+
+def add_months(value: datetime, months: int) -> datetime:
+    index = value.year * 12 + value.month - 1 + months
+    return value.replace(year=index // 12, month=index % 12 + 1)
+
+
+def month_key(value: datetime) -> str:
+    return value.strftime('%Y-%m')
+
+
+def partition_table(key: str) -> Table:
+    """Table object for month ``key`` ('YYYY-MM'); same columns as ActionLog, suffixed index names."""
+    table = _tables.get(key)
+    if table is None:
+        name = f"action_log_{key.replace('-', '_')}"
+        table = Table(
+            name, _metadata,
+            Column('id', Integer, primary_key=True, autoincrement=False),  # ActionLog id, preserved
+            Column('log_id_onchain', BigInteger),
+            Column('user_address', String(42)),
+            Column('action', String(255)),
+            Column('details', Text),
+            Column('timestamp', DateTime),
+            Column('block_number', BigInteger),
+            Column('tx_hash', String(66)),
+            Column('log_index', Integer, nullable=False),
+            Index(f'ix_{name}_timestamp', 'timestamp'),
+            Index(f'ix_{name}_user_address', 'user_address'),
+        )
+        _tables[key] = table
+    return table
+
+
+_COLUMNS = ('id', 'log_id_onchain', 'user_address', 'action', 'details', 'timestamp',
+            'block_number', 'tx_hash', 'log_index')
+
+
+def _record(db_session, key, **values):
+    partition = db_session.query(ActionLogPartition).filter_by(month=key).first()
+    if partition is None:
+        partition = ActionLogPartition(month=key)
+        db_session.add(partition)
+    for name, value in values.items():
+        setattr(partition, name, value)
+    return partition
+
+
+# --- rotate / archive ---
+
+def rotate(db_session, now=None, hot_months=3) -> list:
+    """Move whole months older than ``hot_months`` out of ActionLog.  Returns the month keys moved."""
+    cutoff = add_months(month_start(now or utc_naive()), -(hot_months - 1))
+    hot = ActionLog.__table__
+    moved = []
+    while True:
+        oldest = db_session.query(func.min(ActionLog.timestamp)).filter(ActionLog.timestamp < cutoff).scalar()
+        if oldest is None:
+            return moved
+        start = month_start(oldest)
+        end = next_month(start)
+        key = month_key(start)
+        table = partition_table(key)
+        table.create(db_session.get_bind(), checkfirst=True)
+
+        in_month = (hot.c.timestamp >= start) & (hot.c.timestamp < end)
+        copied = db_session.execute(insert(table).from_select(
+            list(_COLUMNS), select(*(hot.c[name] for name in _COLUMNS)).where(in_month))).rowcount
+        db_session.execute(delete(hot).where(in_month))
+        existing = db_session.query(ActionLogPartition).filter_by(month=key).first()
+        _record(db_session, key, table_name=table.name, status='table', range_start=start, range_end=end,
+                row_count=(existing.row_count or 0) + copied if existing else copied)
+        db_session.commit()
+        moved.append(key)
+
+
+def archive(db_session, archive_dir, now=None, retention_months=12) -> list:
+    """Write month tables older than ``retention_months`` to gzip JSONL and drop them."""
+    cutoff = add_months(month_start(now or utc_naive()), -retention_months)
+    archive_dir = Path(archive_dir)
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    archived = []
+    for partition in db_session.query(ActionLogPartition).filter(
+            ActionLogPartition.status == 'table', ActionLogPartition.range_end <= cutoff).order_by(
+            ActionLogPartition.range_start).all():
+        table = partition_table(partition.month)
+        path = archive_dir / f"{table.name}.jsonl.gz"
+        tmp = path.with_suffix('.gz.tmp')
+        written = 0
+        with gzip.open(tmp, 'wt', encoding='utf-8') as out:
+            last_id = -1
+            while True:
+                rows = db_session.execute(select(table).where(table.c.id > last_id).order_by(table.c.id).limit(
+                    ARCHIVE_ROW_BATCH)).mappings().all()
+                if not rows:
+                    break
+                for row in rows:
+                    out.write(json.dumps(_row_dict(row), default=str) + "\n")
+                written += len(rows)
+                last_id = rows[-1]['id']
+        os.replace(tmp, path)  # only a complete file is ever visible
+
+        _record(db_session, partition.month, status='archived', archive_path=str(path), row_count=written)
+        db_session.commit()
+        table.drop(db_session.get_bind(), checkfirst=True)
+        archived.append(partition.month)
+    return archived
+
+
+def maintain(db_session, config) -> dict:
+    """Rotate then archive, using the ACTION_LOG_* settings in ``config`` (a mapping)."""
+    moved = rotate(db_session, hot_months=config.get('ACTION_LOG_HOT_MONTHS', 3))
+    archived = []
+    if config.get('ACTION_LOG_ARCHIVE_DIR'):
+        archived = archive(db_session, config['ACTION_LOG_ARCHIVE_DIR'],
+                           retention_months=config.get('ACTION_LOG_RETENTION_MONTHS', 12))
+    return {"rotated": moved, "archived": archived}
+
+
+# --- routed reads ---
+
+def _row_dict(row) -> dict:
+    return {name: row[name] for name in _COLUMNS}
+
+
+def _filters(table, start, end, user_address, action):
+    conditions = [table.c.timestamp >= start, table.c.timestamp < end]
+    if user_address:
+        conditions.append(func.lower(table.c.user_address) == user_address.lower())
+    if action:
+        conditions.append(table.c.action == action)
+    return conditions
+
+
+def _from_table(db_session, table, start, end, user_address, action, limit):
+    stmt = select(table).where(*_filters(table, start, end, user_address, action)).order_by(
+        table.c.timestamp.desc(), table.c.id.desc()).limit(limit)
+    return [_row_dict(row) for row in db_session.execute(stmt).mappings()]
+
+
+def _from_archive(path, start, end, user_address, action, limit):
+    rows = []
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            row = json.loads(line)
+            ts = datetime.fromisoformat(row['timestamp']) if row.get('timestamp') else None
+            if ts is None or not (start <= ts < end):
+                continue
+            if user_address and (row.get('user_address') or '').lower() != user_address.lower():
+                continue
+            if action and row.get('action') != action:
+                continue
+            row['timestamp'] = ts
+            rows.append(row)
+    rows.sort(key=lambda r: (r['timestamp'], r['id']), reverse=True)
+    return rows[:limit]
+
+
+def query_range(db_session, start, end, user_address=None, action=None, limit=100, include_archived=False):
+    """
+    ActionLog rows with start <= timestamp < end, newest first, from every
+    partition the range touches.  Returns (rows, sources).
+    """
+    partitions = db_session.query(ActionLogPartition).filter(
+        ActionLogPartition.range_start < end, ActionLogPartition.range_end > start).all()
+
+    sources, results = ['action_log'], [
+        _from_table(db_session, ActionLog.__table__, start, end, user_address, action, limit)]
+    existing_tables = None
+    for partition in partitions:
+        if partition.status == 'table':
+            if existing_tables is None:
+                existing_tables = set(inspect(db_session.get_bind()).get_table_names())
+            if partition.table_name not in existing_tables:
+                continue
+            sources.append(partition.table_name)
+            results.append(_from_table(db_session, partition_table(partition.month), start, end,
+                                       user_address, action, limit))
+        elif partition.status == 'archived' and include_archived and partition.archive_path:
+            sources.append(partition.archive_path)
+            results.append(_from_archive(partition.archive_path, start, end, user_address, action, limit))
+
+    merged = heapq.merge(*results, key=lambda r: (r['timestamp'], r['id']), reverse=True)
+    return [row for _, row in zip(range(limit), merged)], sources
+
+
+def stored_keys(db_session, rows) -> set:
+    """
+    (tx_hash, log_index) of the ``rows`` already stored anywhere: the hot
+    table, the month table their timestamp falls in, or that month's archive
+    file.  Lets a replayed window skip logs that were rotated out of ActionLog.
+    """
+    if not rows:
+        return set()
+    hot = ActionLog.__table__
+    found = set(db_session.execute(select(hot.c.tx_hash, hot.c.log_index).where(
+        hot.c.tx_hash.in_({row['tx_hash'] for row in rows}))).all())
+
+    by_month = {}
+    for row in rows:
+        if row['timestamp'] is not None:
+            by_month.setdefault(month_key(row['timestamp']), set()).add(row['tx_hash'])
+    if not by_month:
+        return found
+    existing_tables = None
+    for partition in db_session.query(ActionLogPartition).filter(ActionLogPartition.month.in_(by_month)).all():
+        tx_hashes = by_month[partition.month]
+        if partition.status == 'table':
+            if existing_tables is None:
+                existing_tables = set(inspect(db_session.get_bind()).get_table_names())
+            if partition.table_name not in existing_tables:
+                continue
+            table = partition_table(partition.month)
+            found.update(db_session.execute(select(table.c.tx_hash, table.c.log_index).where(
+                table.c.tx_hash.in_(tx_hashes))).all())
+        elif partition.status == 'archived' and partition.archive_path:
+            # Only a replay reaching past ACTION_LOG_RETENTION_MONTHS gets here
+            with gzip.open(partition.archive_path, 'rt', encoding='utf-8') as f:
+                for line in f:
+                    row = json.loads(line)
+                    if row['tx_hash'] in tx_hashes:
+                        found.add((row['tx_hash'], row['log_index']))
+    return found
+
+
+def all_tables(db_session) -> list:
+    """The hot table plus every month table still in the database."""
+    partitions = db_session.query(ActionLogPartition).filter_by(status='table').order_by(
+        ActionLogPartition.range_start).all()
+    return [ActionLog.__table__] + [partition_table(p.month) for p in partitions]
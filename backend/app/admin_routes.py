@@ -0,0 +1,488 @@
+# app/admin_routes.py
+# Admin console endpoints (login link flow, logs, users, waitlist, referrals).
+import json
+import secrets
+from datetime import datetime, UTC, timedelta
+from pathlib import Path
+
+from flask import Blueprint, request, jsonify, current_app, session, render_template, Response, stream_with_context
+from itsdangerous import URLSafeTimedSerializer
+from web3 import Web3
+
+from . import auth, models, db, live_feed, action_partitions
+from .action_partitions import utc_naive
+from .decorators import admin_required
+from .models import (User, ActionLog, AdminLoginToken, AllowedEmail, Waitlist, ReferralCode, UserReferral,
+                     ProvisionalLog, IndexerLease, IndexerState, ActionRollup, UserActivityRollup)
+
+
+admin_bp = Blueprint('admin', __name__)
+
+
+# --- ADMIN ROUTES ---
+@admin_bp.route('/admin/generate_login_url', methods=['GET'])  # Should be protected
+# @admin_required # Or some other form of initial admin auth to get this link
+def generate_admin_url_endpoint():
+    # Add strong authentication here if this endpoint is exposed.
+    # E.g. require "master" admin password or API key.
+    # For now, assuming it's called from a secure context or for setup.
+    return auth.get_admin_login_link()
+
+
+@admin_bp.route('/admin/login_page/<login_token>', methods=['GET'])  # The dynamic link
+def admin_login_page(login_token):
+    # This page would be a simple HTML form that then POSTs to /admin/login
+    # It should pre-fill the token. The user enters dynamic username, email, pass, OTP.
+    # For a true SPA, this might just validate the token and then show the login form components.
+    # For simplicity with Flask, can render a template.
+    s = URLSafeTimedSerializer(current_app.config['SECRET_KEY'], salt='admin-login-link')
+    try:
+        token_data = s.loads(login_token, max_age=current_app.config['ADMIN_LOGIN_TOKEN_MAX_AGE'])
+        db_token = AdminLoginToken.query.filter_by(token=login_token, used=False).first()
+        if not db_token or db_token.expires_at < datetime.now(UTC) or \
+                token_data.get("purpose") != "admin_login":
+            return "Invalid or expired admin login link.", 400
+
+        # The page can display the expected username challenge if you want, or have user generate it
+        # username_challenge = token_data.get("username_challenge")
+        return render_template('admin_login_form.html', login_token=login_token)  # Create this HTML template
+    except Exception as e:
+        return f"{e}", 400
+
+
+@admin_bp.route('/admin/login', methods=['POST'])
+def admin_login_endpoint():
+    return auth.admin_login()
+
+
+@admin_bp.route('/admin/logs', methods=['GET'])
+@admin_required
+def get_admin_logs():
+    page = request.args.get('page', 1, type=int)
+    per_page = request.args.get('per_page', 20, type=int)
+    search_query = request.args.get('q', None)  # For searching
+
+    query = ActionLog.query.order_by(ActionLog.timestamp.desc())
+    if search_query:
+        # Basic search across a few fields
+        search_term = f"%{search_query}%"
+        query = query.filter(
+            models.db.or_(
+                ActionLog.user_address.ilike(search_term),
+                ActionLog.action.ilike(search_term),
+                ActionLog.details.ilike(search_term)
+            )
+        )
+
+    paginated_logs = query.paginate(page=page, per_page=per_page, error_out=False)
+    logs_data = [{
+        "id": log.id, "log_id_onchain": log.log_id_onchain, "user_address": log.user_address,
+        "action": log.action, "details": log.details,
+        "timestamp": log.timestamp.isoformat(), "tx_hash": log.tx_hash
+    } for log in paginated_logs.items]
+
+    return jsonify({
+        "logs": logs_data,
+        "total": paginated_logs.total,
+        "pages": paginated_logs.pages,
+        "current_page": paginated_logs.page
+    })
+
+
+SSE_HEARTBEAT = 15  # seconds between keep-alive comments
+
+
+def _sse_default(value):
+    return value.isoformat() if isinstance(value, datetime) else str(value)
+
+
+@admin_bp.route('/admin/logs/history', methods=['GET'])
+@admin_required
+def get_admin_logs_history():
+    # Timestamp-range query routed across the hot ActionLog table, monthly
+    # partitions and (with include_archived=true) archived months.
+    # ?start=ISO&end=ISO&user_address=..&action=..&limit=..&include_archived=true
+    try:
+        end = _parse_stats_time(request.args.get('end')) or utc_naive()
+        start = _parse_stats_time(request.args.get('start')) or end - timedelta(days=30)
+    except ValueError:
+        return jsonify({"error": "start/end must be ISO 8601 timestamps"}), 400
+    limit = min(request.args.get('limit', 100, type=int), 1000)
+    include_archived = request.args.get('include_archived', 'false').lower() == 'true'
+
+    rows, sources = action_partitions.query_range(
+        db.session, start, end, user_address=request.args.get('user_address'),
+        action=request.args.get('action'), limit=limit, include_archived=include_archived)
+    return jsonify({
+        "logs": [{**row, "timestamp": row["timestamp"].isoformat() if row["timestamp"] else None} for row in rows],
+        "sources": sources,
+    })
+
+
+@admin_bp.route('/admin/logs/stream', methods=['GET'])
+@admin_required
+def stream_admin_logs():
+    # Server-sent events: one "action" event per newly indexed ActionLog row.
+    # Filters: ?user_address=0x..&action=...  Each open stream holds a worker thread.
+    subscription = live_feed.feed.subscribe(request.args.get('user_address'), request.args.get('action'))
+    live_feed.feed.ensure_tailer(current_app._get_current_object())
+
+    def generate():
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                row = subscription.get(timeout=SSE_HEARTBEAT)
+                if row is None:
+                    yield f": keep-alive dropped={subscription.dropped}\n\n"
+                    continue
+                yield f"event: action\ndata: {json.dumps(row, default=_sse_default)}\n\n"
+        finally:
+            live_feed.feed.unsubscribe(subscription)
+
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+@admin_bp.route('/admin/logs/pending', methods=['GET'])
+@admin_required
+def get_admin_pending_logs():
+    # ActionLogged events seen near head but not yet INDEXER_CONFIRMATIONS deep; may still be reorged out
+    limit = min(request.args.get('limit', 100, type=int), 500)
+    query = ProvisionalLog.query.filter_by(event='ActionLogged')
+    user_address = request.args.get('user_address')
+    if user_address:
+        query = query.filter(ProvisionalLog.user_address.ilike(user_address))
+
+    rows = query.order_by(ProvisionalLog.block_number.desc(), ProvisionalLog.log_index.desc()).limit(limit).all()
+    logs_data = []
+    for row in rows:
+        args = json.loads(row.args or '{}')
+        logs_data.append({
+            "user_address": row.user_address, "action": args.get('action'), "details": args.get('details'),
+            "timestamp": datetime.fromtimestamp(args['timestamp'], UTC).isoformat() if 'timestamp' in args else None,
+            "block_number": row.block_number, "block_hash": row.block_hash,
+            "tx_hash": row.tx_hash, "log_index": row.log_index, "provisional": True,
+        })
+    return jsonify({"logs": logs_data, "confirmations_required": current_app.config.get('INDEXER_CONFIRMATIONS')})
+
+
+@admin_bp.route('/admin/indexer', methods=['GET'])
+@admin_required
+def get_indexer_status():
+    lease = IndexerLease.query.filter_by(name='event-indexer').first()
+    service = current_app.extensions.get('indexer_service')
+    return jsonify({
+        "enabled_here": service is not None,
+        "this_instance": service.holder if service else None,
+        "is_leader_here": bool(service and service.is_leader),
+        "lease": {
+            "holder": lease.holder, "expires_at": lease.expires_at.isoformat() + "Z",
+        } if lease else None,
+        "streams": [{
+            "contract": state.contract, "events": state.event,
+            "last_block": state.last_block, "last_log_index": state.last_log_index,
+            "updated_at": state.updated_at.isoformat() if state.updated_at else None,
+        } for state in IndexerState.query.order_by(IndexerState.id).all()],
+    })
+
+
+STATS_DEFAULT_SPAN = {'hour': timedelta(hours=48), 'day': timedelta(days=30)}
+STATS_MAX_BUCKETS = 2000
+
+
+def _parse_stats_time(value):
+    if not value:
+        return None
+    # ActionLog.timestamp and rollup buckets are naive UTC; an offset is converted, a naive value is UTC
+    return utc_naive(datetime.fromisoformat(value.replace('Z', '+00:00')))
+
+
+@admin_bp.route('/admin/stats/actions', methods=['GET'])
+@admin_required
+def get_action_stats():
+    # Per-bucket ActionLog counts from the rollup tables kept by the indexer.
+    # ?granularity=hour|day&start=ISO&end=ISO&action=...&top_users=N
+    # distinct_users is exact per bucket; it cannot be summed across buckets.
+    granularity = request.args.get('granularity', 'day')
+    if granularity not in STATS_DEFAULT_SPAN:
+        return jsonify({"error": "granularity must be 'hour' or 'day'"}), 400
+    try:
+        end = _parse_stats_time(request.args.get('end')) or utc_naive()
+        start = _parse_stats_time(request.args.get('start')) or end - STATS_DEFAULT_SPAN[granularity]
+    except ValueError:
+        return jsonify({"error": "start/end must be ISO 8601 timestamps"}), 400
+    step = timedelta(hours=1) if granularity == 'hour' else timedelta(days=1)
+    if start > end or (end - start) / step > STATS_MAX_BUCKETS:
+        return jsonify({"error": f"Range must be ordered and span at most {STATS_MAX_BUCKETS} buckets"}), 400
+    action = request.args.get('action')
+
+    def in_range(model):
+        return model.granularity == granularity, model.bucket_start >= start, model.bucket_start <= end
+
+    action_query = db.session.query(ActionRollup.bucket_start, ActionRollup.action, ActionRollup.count).filter(
+        *in_range(ActionRollup))
+    if action:
+        action_query = action_query.filter(ActionRollup.action == action)
+
+    buckets = {}
+    for bucket, bucket_action, count in action_query.order_by(ActionRollup.bucket_start):
+        entry = buckets.setdefault(bucket, {"total": 0, "by_action": {}, "distinct_users": None})
+        entry["total"] += count
+        entry["by_action"][bucket_action] = count
+
+    if not action:  # user rollups are not split by action
+        distinct = db.session.query(UserActivityRollup.bucket_start, models.db.func.count(UserActivityRollup.id)).filter(
+            *in_range(UserActivityRollup)).group_by(UserActivityRollup.bucket_start)
+        for bucket, users in distinct:
+            if bucket in buckets:
+                buckets[bucket]["distinct_users"] = users
+
+    body = {
+        "granularity": granularity, "start": start.isoformat(), "end": end.isoformat(),
+        "buckets": [{"bucket_start": bucket.isoformat(), **entry} for bucket, entry in sorted(buckets.items())],
+    }
+
+    top_users = request.args.get('top_users', 0, type=int)
+    if top_users > 0 and not action:
+        total = models.db.func.sum(UserActivityRollup.count).label('total')
+        rows = db.session.query(UserActivityRollup.user_address, total).filter(
+            *in_range(UserActivityRollup)).group_by(UserActivityRollup.user_address).order_by(
+            total.desc()).limit(min(top_users, 100))
+        body["top_users"] = [{"user_address": address, "count": int(count)} for address, count in rows]
+
+    return jsonify(body)
+
+
+@admin_bp.route('/admin/users', methods=['GET'])
+@admin_required
+def get_admin_users():
+    # Similar pagination and search as logs for User model
+    # Exclude password_hash and otp_secret from response
+    page = request.args.get('page', 1, type=int)
+    per_page = request.args.get('per_page', 20, type=int)
+    search_query = request.args.get('q', None)
+
+    query = User.query
+    if search_query:
+        search_term = f"%{search_query}%"
+        query = query.filter(
+            models.db.or_(
+                User.email.ilike(search_term),
+                User.wallet_address.ilike(search_term)
+            )
+        )
+
+    paginated_users = query.paginate(page=page, per_page=per_page, error_out=False)
+    users_data = [{
+        "id": user.id, "email": user.email, "wallet_address": user.wallet_address, "is_admin": user.is_admin
+    } for user in paginated_users.items]
+
+    return jsonify({
+        "users": users_data,
+        "total": paginated_users.total,
+        "pages": paginated_users.pages,
+        "current_page": paginated_users.page
+    })
+
+
+@admin_bp.route('/admin/nfts_overview', methods=['GET'])
+@admin_required
+def get_admin_nfts_overview():
+    # This would ideally query an indexed database of all minted NFTs.
+    # If not, you'd have to iterate on-chain events (NFTMinted from NFTDoc)
+    # or rely on `totalSupply` and then query each token (very inefficient).
+    # Assume you have an `IndexedNFT` model populated by an indexer.
+    # For now, placeholder:
+    return jsonify({"message": "Admin NFTs overview. Implement with an indexed NFT database."})
+
+
+@admin_bp.route('/admin/contract_info', methods=['GET'])
+@admin_required
+def get_admin_contract_info():
+    return jsonify({
+        "nft_land_contract": {
+            "address": current_app.config.get('NFT_DOC_CONTRACT_ADDRESS'),
+            "abi_path": Path(__file__).parent / "abi" / current_app.config.get('NFT_LAND_CONTRACT_ABI_PATH'),
+            # Could add more details like owner, specific state variables if needed
+        },
+        "action_logger_contract": {
+            "address": current_app.config.get('ACTION_LOGGER_CONTRACT_ADDRESS'),
+            "abi_path": Path(__file__).parent / "abi" / current_app.config.get('ACTION_LOGGER_CONTRACT_ABI_PATH'),
+        },
+        "nft_marketplace_contract": {
+            "address": current_app.config.get('NFT_MARKETPLACE_CONTRACT_ADDRESS'),
+            "abi_path": Path(__file__).parent / "abi" / current_app.config.get('NFT_MARKETPLACE_CONTRACT_ABI_PATH'),
+        }
+    })
+
+
+# --- Admin Management Routes ---
+
+@admin_bp.route('/admin/waitlist', methods=['GET'])
+@admin_required
+def get_waitlist():
+    entries = Waitlist.query.filter_by(status='pending').order_by(Waitlist.created_at.desc()).all()
+    return jsonify([{
+        "id": e.id,
+        "email": e.email,
+        "contact_info": e.contact_info,
+        "platform": e.platform,
+        "created_at": e.created_at.isoformat()
+    } for e in entries]), 200
+
+@admin_bp.route('/admin/approve-waitlist', methods=['POST'])
+@admin_required
+def approve_waitlist_entry():
+    data = request.get_json()
+    entry_id = data.get('id')
+    
+    entry = Waitlist.query.get(entry_id)
+    if not entry:
+        return jsonify({"error": "Entry not found"}), 404
+        
+    # Move to AllowedEmail
+    # We need an email for AllowedEmail. If they only provided telegram handle, we can't really "Allow" an email.
+    # Assumption: The admin will manually contact them or we only allow approving entries WITH emails.
+    
+    if not entry.email:
+        return jsonify({"error": "Cannot approve entry without email. Contact user manually first."}), 400
+        
+    if not AllowedEmail.query.filter_by(email=entry.email).first():
+        allowed = AllowedEmail(email=entry.email, added_by="admin_approved_waitlist")
+        db.session.add(allowed)
+    
+    entry.status = 'approved'
+    db.session.commit()
+    
+    return jsonify({"message": f"Approved {entry.email}"}), 200
+
+@admin_bp.route('/admin/referrals', methods=['GET'])
+@admin_required
+def get_referral_codes():
+    codes = ReferralCode.query.order_by(ReferralCode.created_at.desc()).all()
+    return jsonify([{
+        "id": c.id,
+        "code": c.code,
+        "uses": f"{c.used_count}/{'∞' if c.max_uses == -1 else c.max_uses}",
+        "active": c.is_active,
+        "expires": c.expires_at.isoformat() if c.expires_at else "Never"
+    } for c in codes]), 200
+
+@admin_bp.route('/admin/generate-referral', methods=['POST'])
+@admin_required
+def generate_referral():
+    data = request.get_json()
+    max_uses = data.get('max_uses', 1)
+    custom_code = data.get('code')
+    days_valid = data.get('days_valid', 7)
+    
+    code_str = custom_code if custom_code else secrets.token_urlsafe(8)
+    
+    if ReferralCode.query.filter_by(code=code_str).first():
+        return jsonify({"error": "Code already exists"}), 400
+        
+    expires = datetime.now(UTC) + timedelta(days=days_valid) if days_valid else None
+    
+    new_code = ReferralCode(
+        code=code_str,
+        max_uses=max_uses,
+        expires_at=expires,
+        created_by=session['user_id']
+    )
+    db.session.add(new_code)
+    db.session.commit()
+    
+    return jsonify({
+        "code": code_str, 
+        "message": "Referral code generated"
+    }), 201
+
+
+@admin_bp.route('/admin/user-referrals', methods=['GET'])
+@admin_required
+def get_admin_user_referrals():
+    referrals = db.session.query(UserReferral, User).join(User, UserReferral.user_id == User.id).all()
+    
+    result = []
+    for ref, user in referrals:
+        try:
+            signup_emails = json.loads(ref.signup_list or '[]')
+        except (json.JSONDecodeError, TypeError):
+            signup_emails = []
+        
+        result.append({
+            "id": ref.id,
+            "user_email": user.email,
+            "user_wallet": user.wallet_address,
+            "referral_code": ref.referral_code,
+            "landing_count": ref.landing_count,
+            "waitlist_count": ref.waitlist_count,
+            "signup_list": signup_emails,
+            "created_at": ref.created_at.isoformat() if ref.created_at else None
+        })
+    
+    return jsonify(result), 200
+
+
+BULK_CLAIM_MAX_VALID_MINUTES = 7 * 24 * 60
+
+
+@admin_bp.route('/admin/faucet/claim-signatures', methods=['POST'])
+@admin_required
+def issue_bulk_claim_signatures():
+    # EIP-712 claim signatures for an approved cohort, streamed as NDJSON (one line per recipient).
+    # Body: {"recipients": ["0x..", ...], "valid_minutes": 10}
+    # Nonces come from the claim index + Multicall3; signing runs in a process pool (app/faucet_signer.py).
+    # Lines: a signed claim (same fields as /faucet/claim-signature) or {"recipient", "error"}.
+    # The faucet stack (sender, batcher, claim index) loads only when this endpoint is used
+    from . import faucet, faucet_signer
+
+    data = request.get_json() or {}
+    recipients = data.get('recipients')
+    if not recipients or not isinstance(recipients, list):
+        return jsonify({"error": "recipients must be a non-empty list"}), 400
+    max_recipients = current_app.config.get('FAUCET_BULK_MAX_RECIPIENTS', 10000)
+    if len(recipients) > max_recipients:
+        return jsonify({"error": f"At most {max_recipients} recipients per request"}), 400
+    valid_minutes = data.get('valid_minutes', 10)
+    if not isinstance(valid_minutes, int) or not 0 < valid_minutes <= BULK_CLAIM_MAX_VALID_MINUTES:
+        return jsonify({"error": f"valid_minutes must be 1-{BULK_CLAIM_MAX_VALID_MINUTES}"}), 400
+
+    errors, addresses, seen = [], [], set()
+    for recipient in recipients:
+        if not isinstance(recipient, str) or not Web3.is_address(recipient):
+            errors.append({"recipient": recipient, "error": "Invalid address"})
+            continue
+        address = Web3.to_checksum_address(recipient)
+        if address not in seen:
+            seen.add(address)
+            addresses.append(address)
+
+    try:
+        nonces = faucet.get_nonces(addresses)
+        chain_id = str(faucet.get_chain_id())
+    except Exception as e:
+        return jsonify({"error": f"Could not read nonces: {e}"}), 502
+
+    amount_wei = Web3.to_wei(faucet.PAYOUT_AMOUNT_ETH, 'ether')
+    claims = []
+    for address in addresses:
+        if nonces[address] > 0:
+            errors.append({"recipient": address, "error": "Address has already claimed"})
+        else:
+            claims.append((address, amount_wei, nonces[address]))
+    deadline = int(datetime.now(UTC).timestamp()) + valid_minutes * 60
+    workers = current_app.config.get('FAUCET_SIGN_WORKERS', 1)
+    extra = {"contractAddress": faucet.FAUCET_CONTRACT_ADDRESS, "chainId": chain_id}
+
+    def generate():
+        for line in errors:
+            yield json.dumps(line) + "\n"
+        try:
+            for signed in faucet_signer.sign_claims_bulk(claims, deadline, workers):
+                yield "".join(json.dumps({**claim, **extra}) + "\n" for claim in signed)
+        except Exception as e:
+            yield json.dumps({"error": f"Signing failed: {e}"}) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson',
+                    headers={'X-Accel-Buffering': 'no'})
@@ -0,0 +1,96 @@
+"""
+aio.py — Long-lived asyncio loop and AsyncWeb3 clients for read fan-out.
+
+Flask views are synchronous, so async work is submitted to a single event
+loop that runs forever on a daemon thread instead of paying for a fresh
+``asyncio.run()`` loop (and a thread per RPC) on every request.
+
+AsyncWeb3 providers hold an aiohttp session bound to the loop that created
+them, so clients are cached per running loop.  Code running on the
+background loop and code running under an ASGI server each get their own.
+"""
+
+import asyncio
+import os
+import threading
+import weakref
+from typing import Any, Awaitable, Optional
+
+from web3 import AsyncWeb3
+
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_thread: Optional[threading.Thread] = None
+_lock = threading.Lock()
+
+# loop -> {rpc_url: AsyncWeb3}
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict]" = weakref.WeakKeyDictionary()
+# loop -> {(rpc_url, address): AsyncContract}
+_contracts: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict]" = weakref.WeakKeyDictionary()
+
+DEFAULT_TIMEOUT = 60  # seconds a request thread waits for a submitted coroutine
+
+
+def _reset_after_fork():
+    """The loop thread does not survive fork(); make the child start its own."""
+    global _loop, _thread, _lock, _clients, _contracts
+    _loop = None
+    _thread = None
+    _lock = threading.Lock()
+    _clients = weakref.WeakKeyDictionary()
+    _contracts = weakref.WeakKeyDictionary()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def _run_forever(loop: asyncio.AbstractEventLoop):
+    asyncio.set_event_loop(loop)
+    loop.run_forever()
+
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    """Return the shared background loop, starting it on first use."""
+    global _loop, _thread
+    if _loop is not None and _loop.is_running():
+        return _loop
+    with _lock:
+        if _loop is None or not _loop.is_running():
+            _loop = asyncio.new_event_loop()
+            _thread = threading.Thread(target=_run_forever, args=(_loop,), name="aio-loop", daemon=True)
+            _thread.start()
+    return _loop
+
+
+def run(coro: Awaitable, timeout: float = DEFAULT_TIMEOUT) -> Any:
+    """Run ``coro`` on the shared loop and block the calling thread for its result."""
+    future = asyncio.run_coroutine_threadsafe(coro, get_loop())
+    try:
+        return future.result(timeout)
+    except TimeoutError:
+        future.cancel()
+        raise
+
+
+def get_async_w3(rpc_url: str) -> AsyncWeb3:
+    """Return the AsyncWeb3 client for ``rpc_url`` on the running loop."""
+    loop = asyncio.get_running_loop()
+    per_loop = _clients.setdefault(loop, {})
+    client = per_loop.get(rpc_url)
+    if client is None:
+        client = AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(rpc_url))
+        per_loop[rpc_url] = client
+    return client
+
+
+def get_async_contract(rpc_url: str, address: str, abi: list):
+    """Return a cached AsyncContract for ``address`` on the running loop."""
+    loop = asyncio.get_running_loop()
+    per_loop = _contracts.setdefault(loop, {})
+    key = (rpc_url, address)
+    contract = per_loop.get(key)
+    if contract is None:
+        contract = get_async_w3(rpc_url).eth.contract(address=address, abi=abi)
+        per_loop[key] = contract
+    return contract
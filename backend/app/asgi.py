@@ -0,0 +1,203 @@
+"""
+asgi.py — ASGI deployment mode for the I/O-bound read endpoints.
+
+The IPFS proxy, /doc/stream_batch and /user/docs spend nearly all their time
+waiting on the gateway or the RPC.  Under WSGI each one pins a worker thread
+for the whole download.  Here they are served natively on the event loop
+(httpx for IPFS, AsyncWeb3 for RPC), so one process can hold thousands of
+concurrent downloads.  Every other route falls through to the regular Flask
+app via a WSGI adapter, sharing its config, models and services.
+
+Served endpoints (same paths and payloads as the Flask versions):
+  GET  /ipfs/<hash>        streaming gateway proxy with fallback
+  POST /doc/stream_batch   NDJSON, tokens fetched concurrently, emitted in order
+  GET  /user/docs          Flask session cookie auth, AsyncWeb3 fan-out
+
+Run:
+  uvicorn asgi:app --host 0.0.0.0 --port 8080 --workers 4
+"""
+
+import asyncio
+import json
+from contextlib import asynccontextmanager
+
+import httpx
+from a2wsgi import WSGIMiddleware
+from flask.sessions import SecureCookieSessionInterface
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+from . import create_app, services, ipfs
+from .reads import prepare_my_nfts, _get_my_nfts_async
+
+
+BATCH_CONCURRENCY = 32     # concurrent token lookups per /doc/stream_batch request
+WSGI_THREADS = 64          # threadpool for routes that fall through to Flask
+IPFS_TIMEOUT = httpx.Timeout(30.0, read=3600.0)
+IPFS_LIMITS = httpx.Limits(max_connections=4096, max_keepalive_connections=256)
+
+_PASSTHROUGH_HEADERS = ("Content-Type", "Content-Length", "Content-Disposition")
+
+
+def _flask_session(flask_app, request: Request) -> dict:
+    """Decode the Flask session cookie without a Flask request context."""
+    cookie = request.cookies.get(flask_app.config.get("SESSION_COOKIE_NAME", "session"))
+    if not cookie:
+        return {}
+    serializer = SecureCookieSessionInterface().get_signing_serializer(flask_app)
+    if serializer is None:
+        return {}
+    try:
+        max_age = int(flask_app.permanent_session_lifetime.total_seconds())
+        return serializer.loads(cookie, max_age=max_age)
+    except Exception:
+        return {}
+
+
+def _build_native_app(flask_app) -> Starlette:
+
+    @asynccontextmanager
+    async def lifespan(app):
+        app.state.http = httpx.AsyncClient(timeout=IPFS_TIMEOUT, limits=IPFS_LIMITS, follow_redirects=True)
+        try:
+            yield
+        finally:
+            await app.state.http.aclose()
+
+    async def ipfs_proxy(request: Request):
+        ipfs_hash = request.path_params["ipfs_hash"]
+        client: httpx.AsyncClient = request.app.state.http
+
+        upstream = None
+        for gateway in (ipfs.PRIMARY_GATEWAY, ipfs.FALLBACK_GATEWAY):
+            try:
+                response = await client.send(client.build_request("GET", f"{gateway}/{ipfs_hash}"), stream=True)
+            except httpx.HTTPError as e:
+                flask_app.logger.warning(f"IPFS gateway {gateway} failed for {ipfs_hash}: {e}")
+                continue
+            if response.is_success:
+                upstream = response
+                break
+            await response.aclose()
+        if upstream is None:
+            return JSONResponse({"error": "Content not available from IPFS gateways"}, status_code=502)
+
+        headers = {k: upstream.headers[k] for k in _PASSTHROUGH_HEADERS if k in upstream.headers}
+        headers.setdefault("Content-Type", "application/octet-stream")
+
+        async def body():
+            try:
+                async for chunk in upstream.aiter_bytes(ipfs.STREAM_CHUNK_SIZE):
+                    yield chunk
+            finally:
+                await upstream.aclose()
+
+        return StreamingResponse(body(), headers=headers)
+
+    async def stream_docs_batch(request: Request):
+        try:
+            data = await request.json()
+        except Exception:
+            data = None
+        token_ids = (data or {}).get("token_ids", [])
+        if not token_ids or not isinstance(token_ids, list):
+            return JSONResponse({"error": "Invalid token_ids provided"}, status_code=400)
+
+        semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+        async def _one(token_id):
+            async with semaphore:
+                try:
+                    details, status = await services.get_nft_details_async(flask_app, int(token_id))
+                    if status == 200:
+                        return json.dumps(details) + "\n"
+                    return json.dumps({"token_id": token_id, "error": "Failed to fetch", "details": details}) + "\n"
+                except Exception as e:
+                    return json.dumps({"token_id": token_id, "error": str(e)}) + "\n"
+
+        async def body():
+            # Fetch concurrently, emit in request order
+            tasks = [asyncio.ensure_future(_one(t)) for t in token_ids]
+            try:
+                for task in tasks:
+                    yield await task
+            finally:
+                for task in tasks:
+                    task.cancel()
+
+        return StreamingResponse(body(), media_type="application/x-ndjson")
+
+    async def get_my_nfts(request: Request):
+        user_id = _flask_session(flask_app, request).get("user_id")
+        if not user_id:
+            return JSONResponse({"error": "Authentication required"}, status_code=401)
+
+        try:
+            page = int(request.query_params.get("page", 1))
+        except ValueError:
+            page = 1
+        try:
+            limit = int(request.query_params.get("limit", 10))
+        except ValueError:
+            limit = 10
+        ids_only = request.query_params.get("ids_only", "false").lower() == "true"
+
+        def _prepare():
+            with flask_app.app_context():
+                return prepare_my_nfts(user_id)
+
+        try:
+            resolved, error = await run_in_threadpool(_prepare)
+            if error:
+                return JSONResponse(error[0], status_code=error[1])
+            body, status = await _get_my_nfts_async(flask_app, *resolved, page, limit, ids_only)
+        except Exception as e:
+            flask_app.logger.error(f"Error fetching NFTs: {e}")
+            body, status = {"error": f"Error fetching NFTs: {e}"}, 500
+        return JSONResponse(body, status_code=status)
+
+    return Starlette(
+        routes=[
+            Route("/ipfs/{ipfs_hash:path}", ipfs_proxy, methods=["GET"]),
+            Route("/doc/stream_batch", stream_docs_batch, methods=["POST"]),
+            Route("/user/docs", get_my_nfts, methods=["GET"]),
+        ],
+        # Same policy as flask_cors with supports_credentials=True
+        middleware=[Middleware(CORSMiddleware, allow_origin_regex=".*", allow_credentials=True,
+                               allow_methods=["*"], allow_headers=["*"])],
+        lifespan=lifespan,
+    )
+
+
+def _is_native(method: str, path: str) -> bool:
+    if path.startswith("/ipfs/"):
+        return method in ("GET", "HEAD", "OPTIONS")
+    if path == "/doc/stream_batch":
+        return method in ("POST", "OPTIONS")
+    if path == "/user/docs":
+        return method in ("GET", "OPTIONS")
+    return False
+
+
+class _Dispatcher:
+    """Route the async endpoints to Starlette and everything else to Flask."""
+
+    def __init__(self, native, fallback):
+        self.native = native
+        self.fallback = fallback
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or _is_native(scope["method"], scope["path"]):
+            await self.native(scope, receive, send)
+        else:
+            await self.fallback(scope, receive, send)
+
+
+def create_asgi_app(flask_app=None):
+    flask_app = flask_app or create_app()
+    return _Dispatcher(_build_native_app(flask_app), WSGIMiddleware(flask_app, workers=WSGI_THREADS))
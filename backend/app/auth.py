@@ -3,7 +3,6 @@ from flask import request, jsonify, session, current_app, url_for
 from web3 import Web3  # IMPORT Web3
 from web3.auto import w3 as w3_auto  # For signature verification (this w3_auto is a local instance)
 from eth_account.messages import encode_defunct
-from erc6492_signature_verifier.signature_verifier import SignatureVerifier
 import time
 import os
 from datetime import datetime, timedelta, UTC
@@ -126,6 +125,9 @@ def metamask_login_verify():
             rpc_url = os.getenv('RPC_URL', 'https://mainnet.base.org')
 
             try:
+                # Imported lazily: only smart-account logins need the verifier stack
+                from erc6492_signature_verifier.signature_verifier import SignatureVerifier
+
                 # ✅ Correct usage with SignatureVerifier class
                 verifier = SignatureVerifier()
 
@@ -243,7 +245,7 @@ def get_admin_login_link():
     db.session.commit()
 
     # The dynamic link
-    dynamic_link = url_for('main.admin_login_page', login_token=login_token_str, _external=True)
+    dynamic_link = url_for('admin.admin_login_page', login_token=login_token_str, _external=True)
     return jsonify(
         {"dynamic_admin_login_link": dynamic_link, "admin_username_hint": "Use your generator for current username."})
 
@@ -0,0 +1,304 @@
+"""
+claim_batcher.py — Group relayed faucet claims into EssentialisPayout.claimBatch txs.
+
+During onboarding waves the relay sent one claim tx per recipient.  Claims
+are now queued here and one flusher thread per process sends them as a
+single owner-only ``claimBatch(recipients, amounts, expectedNonces,
+pubEncryptionKeys)`` once FAUCET_BATCH_MAX_ITEMS are waiting or the oldest
+has waited FAUCET_BATCH_MAX_WAIT_MS.  Batches go through the faucet's
+TxSender, so nonces, fees and receipts work as for any other relayed tx.
+
+The contract re-checks each recipient's nonce and skips (ClaimSkipped)
+instead of reverting, so a stale or duplicate entry costs one batch slot,
+not the whole batch.  A recipient already in the open batch is not added
+twice; its caller gets the pending claim already queued.
+
+Every claim also gets a FaucetClaim row, written before it is queued and
+pointed at its batch's OutboundTx request id once sent, so any worker can
+answer claim-status (see stored_claim()) while the PendingClaim itself
+lives only in the process that queued it.
+
+  pending = get_batcher(app, contract, sender).add(recipient, amount_wei, nonce, pub_key)
+  pending.status, pending.tx_hash          # "batching" until the batch is sent
+  stored_claim(session, recipient)         # the same, from any worker
+"""
+
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+
+from web3 import Web3
+
+logger = logging.getLogger(__name__)
+
+GAS_HEADROOM = 1.2
+# Fallback when estimateGas fails: call overhead + per-claim nonce write, transfer and events + key storage
+FALLBACK_BASE_GAS = 60_000
+FALLBACK_GAS_PER_CLAIM = 90_000
+FALLBACK_GAS_PER_KEY_BYTE = 700
+MAX_GAS_PER_BATCH = 15_000_000
+
+PAYOUT_TOPIC = Web3.to_hex(Web3.keccak(text="Payout(address,uint256,uint256)"))
+
+
+def paid_in(receipt, recipient: str) -> bool:
+    """A Payout log for ``recipient`` is in the batch ``receipt``."""
+    if not receipt:
+        return False
+    recipient = recipient.lower()[2:]
+    for log in receipt.get("logs") or []:
+        topics = [Web3.to_hex(t) if not isinstance(t, str) else t for t in log.get("topics") or []]
+        if len(topics) == 2 and topics[0] == PAYOUT_TOPIC and topics[1].lower().endswith(recipient):
+            return True
+    return False
+
+
+class PendingClaim:
+    """One queued claim.  Reads through to the batch's TxHandle once sent."""
+
+    def __init__(self, recipient: str, amount: int, nonce: int, pub_key: str):
+        self.id = uuid.uuid4().hex
+        self.recipient = recipient
+        self.amount = amount
+        self.nonce = nonce
+        self.pub_key = pub_key or ""
+        self.handle = None
+        self._error = None
+        self._sent = threading.Event()
+
+    def wait_handle(self, timeout=None):
+        self._sent.wait(timeout)
+        return self.handle
+
+    def _resolve(self, handle=None, error=None):
+        self.handle, self._error = handle, error
+        self._sent.set()
+
+    @property
+    def status(self) -> str:
+        if self._error:
+            return "error"
+        if self.handle is None:
+            return "batching"
+        if self.handle.status == "mined" and not self.paid:
+            return "skipped"  # the batch mined but the contract emitted ClaimSkipped for this recipient
+        return self.handle.status
+
+    @property
+    def paid(self) -> bool:
+        """A Payout log for this recipient is in the batch receipt."""
+        return paid_in(self.receipt, self.recipient)
+
+    @property
+    def tx_hash(self):
+        return self.handle.tx_hash if self.handle else None
+
+    @property
+    def receipt(self):
+        return self.handle.receipt if self.handle else None
+
+    @property
+    def error(self):
+        return self._error or (self.handle.error if self.handle else None)
+
+    @property
+    def done(self) -> bool:
+        return bool(self._error) or (self.handle is not None and self.handle.done)
+
+
+def fallback_gas(batch) -> int:
+    return (FALLBACK_BASE_GAS + FALLBACK_GAS_PER_CLAIM * len(batch)
+            + FALLBACK_GAS_PER_KEY_BYTE * sum(len(p.pub_key) for p in batch))
+
+
+def stored_claim(session, recipient: str):
+    """
+    The latest FaucetClaim of ``recipient`` as a claim-status dict (claimId,
+    status, txHash, blockNumber, error), read through to its OutboundTx
+    row.  None if there is no row, or its tx is not in the outbox (sent by
+    a TX_SENDER_MODE=local sender).
+    """
+    from .models import FaucetClaim, OutboundTx
+
+    claim = session.query(FaucetClaim).filter_by(recipient=recipient.lower()).order_by(FaucetClaim.id.desc()).first()
+    if claim is None:
+        return None
+    result = {"claimId": claim.claim_id, "status": claim.status, "txHash": None, "blockNumber": None,
+              "error": claim.error}
+    if claim.status != "sent":
+        return result
+    tx = session.query(OutboundTx).filter_by(request_id=claim.request_id).first()
+    if tx is None:
+        return None
+    receipt = json.loads(tx.receipt) if tx.receipt else None
+    status = "queued" if tx.status == "sending" else tx.status
+    if status == "mined" and not paid_in(receipt, recipient):
+        status = "skipped"
+    result.update(status=status, txHash=tx.tx_hash, blockNumber=receipt["blockNumber"] if receipt else None,
+                  error=tx.error)
+    return result
+
+
+class ClaimBatcher:
+
+    def __init__(self, sender, contract, max_items=50, max_wait_ms=500, session_factory=None):
+        self.sender = sender
+        self.contract = contract
+        self.session_factory = session_factory  # FaucetClaim rows; None keeps claims in memory only
+        self.max_items = max(1, max_items)
+        self.max_wait = max(0, max_wait_ms) / 1000.0
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._open = {}    # recipient (lowercase) -> PendingClaim not yet sent
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._flush_loop, name="claim-batcher", daemon=True)
+        self._thread.start()
+
+    def add(self, recipient: str, amount: int, nonce: int, pub_key: str = "") -> PendingClaim:
+        key = recipient.lower()
+        with self._lock:
+            pending = self._open.get(key)
+            if pending is not None:
+                return pending
+            pending = self._open[key] = PendingClaim(recipient, amount, nonce, pub_key)
+        try:
+            self._record_added(pending)
+        except Exception:
+            with self._lock:
+                self._open.pop(key, None)
+            raise
+        self._queue.put(pending)
+        return pending
+
+    def stop(self):
+        self._stop.set()
+        self._queue.put(None)
+
+    # --- FaucetClaim rows ---
+
+    def _record_added(self, pending: PendingClaim):
+        from .models import FaucetClaim
+
+        if self.session_factory is None:
+            return
+        session = self.session_factory()
+        try:
+            session.add(FaucetClaim(claim_id=pending.id, recipient=pending.recipient.lower(), status="batching"))
+            session.commit()
+        finally:
+            session.close()
+
+    def _record_sent(self, batch, handle=None, error=None):
+        from .models import FaucetClaim
+
+        if self.session_factory is None:
+            return
+        session = self.session_factory()
+        try:
+            values = {"status": "error", "error": error} if error else {"status": "sent", "request_id": handle.id}
+            session.query(FaucetClaim).filter(FaucetClaim.claim_id.in_([p.id for p in batch])).update(
+                values, synchronize_session=False)
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.warning(f"Could not record batch of {len(batch)} claims: {e}")
+        finally:
+            session.close()
+
+    # --- batching ---
+
+    def _collect(self, first: PendingClaim) -> list:
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_items:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                pending = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if pending is None:
+                break
+            batch.append(pending)
+        with self._lock:
+            for pending in batch:
+                self._open.pop(pending.recipient.lower(), None)
+        return batch
+
+    def _encode(self, batch) -> str:
+        return self.contract.encode_abi('claimBatch', args=[
+            [p.recipient for p in batch], [p.amount for p in batch],
+            [p.nonce for p in batch], [p.pub_key for p in batch]])
+
+    def _gas(self, data: str, batch) -> int:
+        try:
+            estimate = self.sender.web3.eth.estimate_gas(
+                {'from': self.sender.address, 'to': self.contract.address, 'data': data})
+            return min(int(estimate * GAS_HEADROOM), MAX_GAS_PER_BATCH)
+        except Exception as e:
+            logger.warning(f"claimBatch gas estimate failed ({e}); using formula")
+            return min(fallback_gas(batch), MAX_GAS_PER_BATCH)
+
+    def _flush(self, batch):
+        try:
+            data = self._encode(batch)
+            handle = self.sender.submit({'to': self.contract.address, 'data': data, 'gas': self._gas(data, batch)},
+                                        label=f"faucet-claim-batch:{len(batch)}")
+        except Exception as e:
+            logger.error(f"Could not submit batch of {len(batch)} claims: {e}")
+            self._record_sent(batch, error=str(e))
+            for pending in batch:
+                pending._resolve(error=str(e))
+            return
+        self._record_sent(batch, handle)
+        for pending in batch:
+            pending._resolve(handle)
+
+    def _flush_loop(self):
+        while not self._stop.is_set():
+            try:
+                first = self._queue.get(timeout=1.0)
+            except queue.Empty:
+                continue
+            if first is None:
+                continue
+            self._flush(self._collect(first))
+
+
+# --- per-process registry ---
+
+_batcher = None
+_batcher_lock = threading.Lock()
+
+
+def _reset_after_fork():
+    """The flusher thread and its queue belong to the parent process."""
+    global _batcher, _batcher_lock
+    _batcher = None
+    _batcher_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def get_batcher(app, contract, sender) -> ClaimBatcher:
+    """This process's claim batcher for the faucet ``contract``, sending through ``sender``."""
+    global _batcher
+    with _batcher_lock:
+        if _batcher is None:
+            from sqlalchemy.orm import sessionmaker
+
+            from . import db
+            with app.app_context():
+                engine = db.engine
+            _batcher = ClaimBatcher(sender, contract,
+                                    max_items=app.config.get('FAUCET_BATCH_MAX_ITEMS', 50),
+                                    max_wait_ms=app.config.get('FAUCET_BATCH_MAX_WAIT_MS', 500),
+                                    session_factory=sessionmaker(bind=engine, autoflush=False))
+        return _batcher
@@ -11,24 +11,78 @@ class Config:
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
     RPC_URL = os.environ.get('RPC_URL')
+    # How create_app validates RPC/contracts/DB: 'background' (default), 'blocking' or 'off'
+    STARTUP_VALIDATION = os.environ.get('STARTUP_VALIDATION', 'background')
+    # Comma-separated blueprint profiles this worker serves: read, write, deploy, admin.
+    # e.g. APP_PROFILES=read for slim document-read / IPFS-proxy workers.
+    APP_PROFILES = os.environ.get('APP_PROFILES', 'read,write,deploy,admin')
+
+    # Etherscan v2 txlist, used by /pubkey only for addresses not yet in the key directory
+    ETHERSCAN_API_KEY = os.environ.get('ETHERSCAN_API_KEY')
+    ETHERSCAN_CHAIN_ID = os.environ.get('ETHERSCAN_CHAIN_ID', '11155420')
 
     # Contract Addresses
     NFT_DOC_CONTRACT_ADDRESS = os.getenv('NFT_DOC_CONTRACT_ADDRESS')
     ACTION_LOGGER_CONTRACT_ADDRESS = os.getenv('ACTION_LOGGER_CONTRACT_ADDRESS')
+    NFT_MARKETPLACE_CONTRACT_ADDRESS = os.getenv('NFT_MARKETPLACE_CONTRACT_ADDRESS')
+    FAUCET_CONTRACT_ADDRESS = os.getenv('FAUCET_CONTRACT_ADDRESS')  # EssentialisPayout
+
+    # Run the leader-elected event indexer inside app processes (see app/indexer_service.py)
+    INDEXER_ENABLED = os.getenv('INDEXER_ENABLED', 'false').lower() in ('1', 'true', 'yes')
+    INDEXER_LEASE_TTL = int(os.getenv('INDEXER_LEASE_TTL', '20'))  # seconds a dead leader blocks failover
+
+    # Event indexer: first block to scan on a cold start (contract deployment block)
+    INDEXER_START_BLOCK = int(os.getenv('INDEXER_START_BLOCK', '0'))
+    # Blocks below head before a log is final; newer logs are held in ProvisionalLog (0 disables)
+    INDEXER_CONFIRMATIONS = int(os.getenv('INDEXER_CONFIRMATIONS', '32'))
+    INDEXER_BACKFILL_WORKERS = int(os.getenv('INDEXER_BACKFILL_WORKERS', '8'))
+    INDEXER_BACKFILL_RANGE = int(os.getenv('INDEXER_BACKFILL_RANGE', '10000'))  # blocks per backfill task
+
+    # ActionLog partitioning (app/action_partitions.py): months kept in the hot table, months kept
+    # as tables before archiving, and where gzip archives go (unset: never archive)
+    ACTION_LOG_HOT_MONTHS = int(os.getenv('ACTION_LOG_HOT_MONTHS', '3'))
+    ACTION_LOG_RETENTION_MONTHS = int(os.getenv('ACTION_LOG_RETENTION_MONTHS', '12'))
+    ACTION_LOG_ARCHIVE_DIR = os.getenv('ACTION_LOG_ARCHIVE_DIR')
+
+    # Send on-chain action logs as ActionLogger.logActions batches (app/action_batcher.py): a batch
+    # goes out when it has MAX_ITEMS actions or its oldest action has waited MAX_WAIT_MS
+    ACTION_LOG_BATCHING = os.getenv('ACTION_LOG_BATCHING', 'false').lower() in ('1', 'true', 'yes')
+    ACTION_LOG_BATCH_MAX_ITEMS = int(os.getenv('ACTION_LOG_BATCH_MAX_ITEMS', '50'))
+    ACTION_LOG_BATCH_MAX_WAIT_MS = int(os.getenv('ACTION_LOG_BATCH_MAX_WAIT_MS', '200'))
 
     # ABI Paths - construct full paths
     BASE_DIR = Path(__file__).parent
     NFT_LAND_CONTRACT_ABI_PATH = str(BASE_DIR / 'abi' / os.getenv('NFT_LAND_CONTRACT_ABI_PATH', 'NFTDoc.json'))
     ACTION_LOGGER_CONTRACT_ABI_PATH = str(BASE_DIR / 'abi' / os.getenv('ACTION_LOGGER_CONTRACT_ABI_PATH', 'ActionLogger.json'))
+    NFT_MARKETPLACE_CONTRACT_ABI_PATH = str(BASE_DIR / 'abi' / os.getenv('NFT_MARKETPLACE_CONTRACT_ABI_PATH', 'NFTMarketplace.json'))
+    FAUCET_CONTRACT_ABI_PATH = str(BASE_DIR / 'abi' / os.getenv('FAUCET_CONTRACT_ABI_PATH', 'DocToken.json'))
 
     WEB3AUTH_CLIENT_ID = os.environ.get('WEB3AUTH_CLIENT_ID')
     GOOGLE_CLIENT_ID = os.environ.get('GOOGLE_CLIENT_ID')
     GOOGLE_CLIENT_SECRET = os.environ.get('GOOGLE_CLIENT_SECRET')
 
+    # INR per native token (MATIC/POL) for fee estimates until a price feed is integrated
+    NATIVE_TOKEN_INR_RATE = float(os.getenv('NATIVE_TOKEN_INR_RATE', '80'))
+
     PLATFORM_COMMISSION_WALLET_ADDRESS = os.environ.get('PLATFORM_COMMISSION_WALLET_ADDRESS')
     # This private key is for the backend to potentially sign transactions (e.g., deploying contracts, admin actions).
     # Handle with extreme care. Consider using a hardware wallet or KMS for production.
     PLATFORM_OPERATIONAL_WALLET_PRIVATE_KEY = os.environ.get('PLATFORM_OPERATIONAL_WALLET_PRIVATE_KEY')
+    # Faucet owner: signs EIP-712 claims and relays claim txs (app/faucet.py)
+    OWNER_PRIVATE_KEY = os.environ.get('OWNER_PRIVATE_KEY')
+    # How platform/faucet txs are sent (app/tx_sender.py).  'outbox' (default): queued in
+    # OutboundTx and sent by the one process holding the wallet's relay lease, so nonces
+    # stay unique across gunicorn workers and hosts.  'local': each process signs with its
+    # own nonce counter -- only safe with a single worker (run.py, benchmarks); with
+    # serve.py's cpu*2+1 workers two processes reuse nonces and replace each other's txs.
+    TX_SENDER_MODE = os.getenv('TX_SENDER_MODE', 'outbox')
+    TX_SENDER_LEASE_TTL = int(os.getenv('TX_SENDER_LEASE_TTL', '20'))  # seconds a dead relay blocks failover
+    # Relayed faucet claims are sent as EssentialisPayout.claimBatch txs (app/claim_batcher.py)
+    FAUCET_BATCH_MAX_ITEMS = int(os.getenv('FAUCET_BATCH_MAX_ITEMS', '50'))
+    FAUCET_BATCH_MAX_WAIT_MS = int(os.getenv('FAUCET_BATCH_MAX_WAIT_MS', '500'))
+    # Admin bulk claim signatures (POST /admin/faucet/claim-signatures)
+    FAUCET_BULK_MAX_RECIPIENTS = int(os.getenv('FAUCET_BULK_MAX_RECIPIENTS', '10000'))
+    FAUCET_SIGN_WORKERS = int(os.getenv('FAUCET_SIGN_WORKERS', str(min(os.cpu_count() or 1, 4))))
 
     ADMIN_EMAIL = os.environ.get('ADMIN_EMAIL')
     ADMIN_PASSWORD_HASH = ""  # Store hashed admin password, set during setup
@@ -0,0 +1,33 @@
+# app/decorators.py
+# Session guards shared by every blueprint.  Kept dependency-light so slim
+# worker profiles can import them without pulling in the auth stack.
+from functools import wraps
+
+from flask import jsonify, session
+
+from .dbretry import safe_query_get
+from .models import User
+
+
+def login_required(f):
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if 'user_id' not in session:
+            return jsonify({"error": "Authentication required"}), 401
+        return f(*args, **kwargs)
+
+    return decorated_function
+
+
+def admin_required(f):
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if 'user_id' not in session or not session.get('is_admin'):
+            return jsonify({"error": "Admin privileges required"}), 403
+        # Optionally, re-verify against DB for extra security
+        user = safe_query_get(User, session['user_id'])
+        if not user or not user.is_admin:
+            return jsonify({"error": "Admin privileges required"}), 403
+        return f(*args, **kwargs)
+
+    return decorated_function
@@ -125,9 +125,12 @@ def deploy_local_endpoint():
         constructor_args: [...] (optional)
         solc_version: "0.8.24" (optional)
         dry_run: false (optional)
+        wait: false (optional; true blocks until the receipt)
 
     Returns:
-        { address, tx_hash, block_number, contract_name, gas_used, abi }
+        { address, tx_hash, block_number, contract_name, gas_used, abi, is_pending }
+        Without "wait", block_number/gas_used are null and the deployment
+        is followed through GET /tx/<tx_hash>.
     """
     allowed, msg = _rate_check("deploy", RATE_MAX_DEPLOY)
     if not allowed:
@@ -230,6 +233,15 @@ def deploy_network_endpoint():
     constructor_args = data.get("constructor_args", [])
     solc_version = data.get("solc_version", "0.8.24")
     dry_run = data.get("dry_run", False)
+    wait = bool(data.get("wait", False))
+
+    # The shared receipt tracker polls the app's RPC; deployments elsewhere wait inline
+    tracker = None
+    if rpc_url == current_app.config.get("RPC_URL"):
+        from ..receipt_tracker import get_tracker
+        tracker = get_tracker(current_app)
+    else:
+        wait = True
 
     try:
         result = deploy_to_network(
@@ -240,6 +252,8 @@ def deploy_network_endpoint():
             constructor_args=constructor_args,
             solc_version=solc_version,
             dry_run=dry_run,
+            wait=wait,
+            tracker=tracker,
         )
         return jsonify(result.to_dict()), 200
 
@@ -20,7 +20,10 @@ from pathlib import Path
 from web3 import Web3
 from web3.types import TxReceipt
 from eth_account import Account
+from eth_utils import keccak, to_checksum_address
+import rlp
 
+from ... import fee_oracle
 from .compiler import compile_sources, compile_file, CompilationError
 from .chain import get_local_w3, get_dev_account, deploy_contract_local
 
@@ -47,6 +50,7 @@ class DeployResult:
         contract_name: str,
         gas_used: int,
         is_dry_run: bool = False,
+        is_pending: bool = False,
     ):
         self.address = address
         self.tx_hash = tx_hash
@@ -56,6 +60,7 @@ class DeployResult:
         self.contract_name = contract_name
         self.gas_used = gas_used
         self.is_dry_run = is_dry_run
+        self.is_pending = is_pending  # sent, receipt not awaited (block_number/gas_used unknown)
 
     def to_dict(self) -> dict:
         return {
@@ -66,10 +71,11 @@ class DeployResult:
             "gas_used": self.gas_used,
             "abi": self.abi,
             "is_dry_run": self.is_dry_run,
+            "is_pending": self.is_pending,
         }
 
     def __repr__(self):
-        tag = " [DRY RUN]" if self.is_dry_run else ""
+        tag = " [DRY RUN]" if self.is_dry_run else " [PENDING]" if self.is_pending else ""
         return (
             f"DeployResult({self.contract_name} @ {self.address}"
             f" | tx={self.tx_hash[:18]}..."
@@ -78,6 +84,12 @@ class DeployResult:
 
 
 GAS_MULTIPLIER = 1.2  # Safety margin on estimated gas
+RECEIPT_TIMEOUT = 120
+
+
+def contract_address_for(deployer: str, nonce: int) -> str:
+    """CREATE address: keccak(rlp([sender, nonce]))[12:], known before the tx is mined."""
+    return to_checksum_address(keccak(rlp.encode([bytes.fromhex(deployer[2:]), nonce]))[12:])
 
 
 def deploy_contract(
@@ -90,6 +102,8 @@ def deploy_contract(
     gas_multiplier: float = GAS_MULTIPLIER,
     dry_run: bool = False,
     contract_name: str = "Unknown",
+    wait: bool = True,
+    tracker=None,
 ) -> DeployResult:
     """
     Deploy a single compiled contract.
@@ -104,6 +118,10 @@ def deploy_contract(
         gas_multiplier: Safety factor on estimated gas (default 1.2×).
         dry_run: If True, build the tx but don't send it.
         contract_name: Human label for logging.
+        wait: If False, return right after sending (address precomputed,
+              is_pending=True).
+        tracker: Optional ReceiptTracker; the tx is registered there and,
+                 when waiting, the receipt comes from its shared poll.
 
     Returns:
         DeployResult with address, tx_hash, etc.
@@ -153,31 +171,14 @@ def deploy_contract(
         # --- Build transaction -------------------------------------------------
         nonce = w3.eth.get_transaction_count(account.address)
 
-        # Try EIP-1559 first, fall back to legacy gasPrice
-        try:
-            base_fee = w3.eth.get_block("latest").get("baseFeePerGas")
-        except Exception:
-            base_fee = None
-
-        if base_fee is not None:
-            # EIP-1559 transaction
-            tx = constructor.build_transaction({
-                "from": account.address,
-                "nonce": nonce,
-                "gas": gas_limit,
-                "chainId": chain_id,
-                "maxFeePerGas": base_fee * 2,
-                "maxPriorityFeePerGas": w3.to_wei(1, "gwei"),
-            })
-        else:
-            # Legacy transaction
-            tx = constructor.build_transaction({
-                "from": account.address,
-                "nonce": nonce,
-                "gas": gas_limit,
-                "chainId": chain_id,
-                "gasPrice": w3.eth.gas_price,
-            })
+        # Fees from the shared per-block oracle: EIP-1559 fields, or legacy gasPrice
+        tx = constructor.build_transaction({
+            "from": account.address,
+            "nonce": nonce,
+            "gas": gas_limit,
+            "chainId": chain_id,
+            **fee_oracle.tx_fields(w3),
+        })
 
         # --- Dry run: return without sending -----------------------------------
         if dry_run:
@@ -195,7 +196,27 @@ def deploy_contract(
         # --- Sign & send -------------------------------------------------------
         signed_tx = w3.eth.account.sign_transaction(tx, deployer_private_key)
         tx_hash = w3.eth.send_raw_transaction(signed_tx.raw_transaction)
-        receipt: TxReceipt = w3.eth.wait_for_transaction_receipt(tx_hash, timeout=120)
+        if tracker is not None:
+            tracker.track(tx_hash, label=f"deploy:{contract_name}")
+
+        if not wait:
+            return DeployResult(
+                address=contract_address_for(account.address, nonce),
+                tx_hash=tx_hash.hex(),
+                block_number=None,
+                abi=abi,
+                bytecode=bytecode,
+                contract_name=contract_name,
+                gas_used=None,
+                is_pending=True,
+            )
+
+        if tracker is not None:
+            receipt = tracker.wait(tx_hash, timeout=RECEIPT_TIMEOUT)
+            if receipt is None:
+                raise DeploymentError(f"No receipt within {RECEIPT_TIMEOUT}s. tx_hash={tx_hash.hex()}")
+        else:
+            receipt: TxReceipt = w3.eth.wait_for_transaction_receipt(tx_hash, timeout=RECEIPT_TIMEOUT)
 
         if receipt["status"] != 1:
             raise DeploymentError(
@@ -243,6 +264,7 @@ def deploy_to_local(
         constructor_args: Constructor arguments.
         solc_version: Compiler version.
         dry_run: Build tx without sending.
+        wait, tracker: See deploy_contract().
 
     Returns:
         DeployResult.
@@ -293,6 +315,8 @@ def deploy_to_network(
     constructor_args: Optional[List[Any]] = None,
     solc_version: str = "0.8.24",
     dry_run: bool = False,
+    wait: bool = True,
+    tracker=None,
 ) -> DeployResult:
     """
     Compile + deploy to any live network.
@@ -324,6 +348,8 @@ def deploy_to_network(
         constructor_args=constructor_args,
         dry_run=dry_run,
         contract_name=name,
+        wait=wait,
+        tracker=tracker,
     )
 
 
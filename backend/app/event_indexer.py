@@ -1,31 +1,33 @@
 # app/event_indexer.py
 import time
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from web3 import Web3
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from .models import ActionLog  # Add other models for NFTMinted, NFTListed events
-from backend.app.config import Config
-from datetime import datetime
+from sqlalchemy.orm.attributes import set_committed_value
+from requests.exceptions import Timeout as RequestsTimeout
+from .models import IndexerState
+from . import claim_index, live_feed
+from .indexer_store import (action_log_row, store_action_logged, store_nft_events, store_market_events,
+                            store_faucet_events, replace_provisional, drop_provisional)
+from .config import Config
+from .log_decoders import DecoderRegistry
 import logging
-from pathlib import Path
 
-# Setup basic logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+# Nothing here touches the network or the database at import time: the
+# indexer is built by EventIndexer (embedded via indexer_service, or run
+# standalone with ``python -m app.event_indexer``).
 
-# --- Database Setup ---
-engine = create_engine(Config.SQLALCHEMY_DATABASE_URI)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-# --- Web3 Setup ---
-w3 = Web3(Web3.HTTPProvider(Config.POLYGON_RPC_URL))
-if not w3.is_connected():
-    logging.error("Failed to connect to Polygon RPC for indexer.")
-    exit(1)
+def _cfg(config, key, default=None):
+    """Read a setting from a Flask app.config mapping or the Config class."""
+    if isinstance(config, dict):
+        return config.get(key, default)
+    return getattr(config, key, default)
 
 
-def get_contract_abi(abi_path_key):
-    abi_path = getattr(Config, abi_path_key)
+def get_contract_abi(abi_path_key, config=Config):
+    abi_path = _cfg(config, abi_path_key)
     if not abi_path:
         logging.error(f"{abi_path_key} not configured.")
         return None
@@ -37,138 +39,456 @@ def get_contract_abi(abi_path_key):
         return None
 
 
-# Load ABIs
-action_logger_abi = Path(__file__).parent / "abi" / get_contract_abi('ACTION_LOGGER_CONTRACT_ABI_PATH')
-# nft_land_abi = get_contract_abi('NFT_LAND_CONTRACT_ABI_PATH')
-# nft_marketplace_abi = get_contract_abi('NFT_MARKETPLACE_CONTRACT_ABI_PATH')
+def _contract(web3, config, address_key, abi_path_key, label, required=False):
+    """Contract instance for an indexed stream, or None if it is not configured."""
+    address = _cfg(config, address_key)
+    abi = get_contract_abi(abi_path_key, config) if address else None
+    if not address or not abi:
+        if required:
+            raise RuntimeError(f"{label} contract address/ABI not configured; cannot index it.")
+        logging.warning(f"{label} contract not configured; its events will not be indexed.")
+        return None
+    return web3.eth.contract(address=Web3.to_checksum_address(address), abi=abi)
 
-if not action_logger_abi:  # Add checks for other ABIs if indexing them
-    logging.error("Failed to load ActionLogger ABI. Exiting.")
-    exit(1)
 
-action_logger_address = Config.ACTION_LOGGER_CONTRACT_ADDRESS
-# nft_land_address = Config.NFT_DOC_CONTRACT_ADDRESS
-# nft_marketplace_address = Config.NFT_MARKETPLACE_CONTRACT_ADDRESS
+# --- eth_getLogs range scanning ---
+# Installed filters (eth_newFilter / get_new_entries) are silently dropped by
+# most hosted providers, so the indexer scans explicit block windows instead.
 
-if not action_logger_address:  # Add checks for other addresses
-    logging.error("ActionLogger contract address not configured. Exiting.")
-    exit(1)
+POLL_INTERVAL = 15        # seconds between polls once caught up with head
+INITIAL_WINDOW = 2_000    # blocks per eth_getLogs call on start-up
+MIN_WINDOW = 1
+MAX_WINDOW = 100_000
+WINDOW_GROWTH = 1.5
 
-action_logger_contract_instance = w3.eth.contract(address=Web3.to_checksum_address(action_logger_address),
-                                                  abi=action_logger_abi)
+# Substrings providers use when a range returns too many logs or takes too long
+_RANGE_ERROR_HINTS = (
+    "too many",
+    "more than",
+    "limit exceeded",
+    "response size",
+    "range is too large",
+    "block range",
+    "query timeout",
+    "timed out",
+    "timeout",
+)
 
 
-# Similarly for other contracts if you index their events:
-# nft_land_contract_instance = w3.eth.contract(address=Web3.to_checksum_address(nft_land_address), abi=nft_land_abi)
-# nft_marketplace_contract_instance = w3.eth.contract(address=Web3.to_checksum_address(nft_marketplace_address),
-# abi=nft_marketplace_abi)
+class AdaptiveWindow:
+    """
+    Block-range size for eth_getLogs.  Grows after every successful call and
+    halves when the provider rejects a range as too large or times out, so a
+    backfill runs as close to the provider's limits as it can without erroring.
+    """
 
+    def __init__(self, initial=INITIAL_WINDOW, minimum=MIN_WINDOW, maximum=MAX_WINDOW, growth=WINDOW_GROWTH):
+        self.size = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.growth = growth
 
-def get_last_processed_block(db_session):
-    # Store the last processed block number in DB to resume from there
-    # Create a simple model for this if needed: e.g., IndexerState(event_name, last_block)
-    # For simplicity, querying the latest block from the ActionLog table
-    latest_log = db_session.query(ActionLog).order_by(ActionLog.block_number.desc()).first()
-    if latest_log and latest_log.block_number:
-        return latest_log.block_number
-    return 0  # Or deployment block of the contract
+    def grow(self):
+        self.size = min(self.maximum, max(self.size + 1, int(self.size * self.growth)))
 
+    def shrink(self):
+        self.size = max(self.minimum, self.size // 2)
 
-def process_action_logged_event(event, db_session):
-    args = event['args']
-    tx_hash = event['transactionHash'].hex()
+    @property
+    def at_minimum(self):
+        return self.size <= self.minimum
 
-    # Avoid duplicates
-    existing_log = db_session.query(ActionLog).filter_by(tx_hash=tx_hash, log_id_onchain=args.get(
-        'logId')).first()  # Assuming logId is part of event
-    if existing_log:
-        logging.info(f"Log for tx {tx_hash} and logId {args.get('logId')} already processed.")
-        return
 
-    log_entry = ActionLog(
-        log_id_onchain=args.get('logId'),  # If your event has a logId field
-        user_address=args.user,
-        action=args.action,
-        details=args.details,
-        timestamp=datetime.fromtimestamp(args.timestamp),  # Ensure this matches your event's timestamp format
-        block_number=event['blockNumber'],
-        tx_hash=tx_hash
-    )
-    db_session.add(log_entry)
-    db_session.commit()
-    logging.info(f"Indexed ActionLogged: User {args.user}, Action {args.action}, Block {event['blockNumber']}")
+def is_range_error(exc) -> bool:
+    """True if ``exc`` means "ask for a smaller block range", not a hard failure."""
+    if isinstance(exc, (RequestsTimeout, TimeoutError)):
+        return True
+    message = str(exc).lower()
+    return any(hint in message for hint in _RANGE_ERROR_HINTS)
 
 
-# You would create similar process_event functions for NFTMinted, NFTListed, NFTSold, etc.
-# and store them in their respective database tables (e.g., IndexedNFT, IndexedListing).
+def scan_logs(web3, address, topics, start_block, end_block, window: AdaptiveWindow):
+    """
+    Yield (from_block, to_block, raw_logs) windows that cover
+    [start_block, end_block] contiguously and in order.  The window size
+    adapts to the provider; a range error at the minimum size is re-raised.
+    """
+    cursor = start_block
+    while cursor <= end_block:
+        to_block = min(cursor + window.size - 1, end_block)
+        try:
+            logs = web3.eth.get_logs({
+                "address": address,
+                "topics": topics,
+                "fromBlock": cursor,
+                "toBlock": to_block,
+            })
+        except Exception as e:
+            if is_range_error(e) and not window.at_minimum:
+                window.shrink()
+                logging.info(f"eth_getLogs {cursor}-{to_block} rejected ({e}); window -> {window.size} blocks")
+                continue
+            raise
+        window.grow()
+        yield cursor, to_block, logs
+        cursor = to_block + 1
 
-def listen_for_events():
-    db_session = SessionLocal()
-    try:
-        # For ActionLogger events
-        last_block_action_logger = get_last_processed_block(db_session)  # Adjust starting block
-        # You might want to start from a contract deployment block or a known recent block for the first run
-        # For robust production, store the last processed block PER CONTRACT/EVENT in a dedicated table.
-        # If the last_block_action_logger is 0, you might want to set it to a recent block or contract deployment block.
-        # For this example, if it's 0, it means it will scan from block 0, which is very slow.
-        # Better to initialize `last_block_action_logger` to `w3.eth.block_number - N` or contract deployment block.
-        if last_block_action_logger == 0:
-            # Heuristic: start from a recent block or contract deployment if known
-            # contract_deployment_block = 12 34 56 # Replace with actual
-            # last_block_action_logger = max(contract_deployment_block, w3.eth.block_number - 1000)
-            pass  # For this example, will proceed, but be aware of scanning from genesis.
-
-        logging.info(f"Starting event listener for ActionLogger from block {last_block_action_logger + 1}")
-        # Add similar logic for other contracts/events (NFTDoc, NFTMarketplace)
-
-        action_logged_event_filter = action_logger_contract_instance.events.ActionLogged.create_filter(
-            fromBlock=last_block_action_logger + 1
+
+def load_checkpoint(db_session, contract_address, event_name, config=Config) -> IndexerState:
+    """
+    Return the IndexerState row for a contract/event stream (O(1) lookup on
+    the unique key).  A new stream starts just before ``config``'s
+    INDEXER_START_BLOCK.
+    """
+    state = db_session.query(IndexerState).filter_by(contract=contract_address, event=event_name).first()
+    if state is None:
+        state = IndexerState(
+            contract=contract_address,
+            event=event_name,
+            last_block=_cfg(config, 'INDEXER_START_BLOCK', 0) - 1,
+            last_log_index=-1,
         )
-        # nft_minted_filter = nft_land_contract_instance.events.NFTMinted.create_filter(...)
-        # nft_listed_filter = nft_marketplace_contract_instance.events.NFTListed.create_filter(...)
+        db_session.add(state)
+        db_session.flush()
+    return state
+
+
+def resume_block(state: IndexerState) -> int:
+    """First block to scan.  The checkpoint block is rescanned unless it was fully committed."""
+    return state.last_block if state.last_log_index >= 0 else state.last_block + 1
+
+
+def is_after_checkpoint(raw_log, state: IndexerState) -> bool:
+    return (raw_log['blockNumber'], raw_log['logIndex']) > (state.last_block, state.last_log_index)
+
+
+def advance_checkpoint(db_session, state: IndexerState, to_block, logs) -> bool:
+    """
+    Move the checkpoint to the end of a fully processed window, forward only:
+    a conditional UPDATE that matches nothing if another indexer has already
+    committed this position or a later one.  Returns False in that case and
+    leaves ``state`` untouched (the caller rolls the window back).
+    """
+    last = logs[-1] if logs else None
+    # -1: nothing for this stream left in to_block, it is complete (sorts after any log index)
+    log_index = last['logIndex'] if last is not None and last['blockNumber'] == to_block else -1
+    same_block_behind = IndexerState.last_log_index >= 0
+    if log_index >= 0:
+        same_block_behind &= IndexerState.last_log_index < log_index
+    moved = db_session.query(IndexerState).filter(
+        IndexerState.id == state.id,
+        (IndexerState.last_block < to_block) | ((IndexerState.last_block == to_block) & same_block_behind),
+    ).update({"last_block": to_block, "last_log_index": log_index}, synchronize_session=False)
+    if not moved:
+        return False
+    set_committed_value(state, "last_block", to_block)
+    set_committed_value(state, "last_log_index", log_index)
+    return True
+
+
+class Stream:
+    """
+    One indexed contract and the events it emits.  All of a stream's events
+    come back from a single eth_getLogs call (topic0 OR-list), are decoded in
+    log order by precompiled log_decoders and passed as plain dicts to
+    ``handler(db_session, events)`` from indexer_store.  The checkpoint key
+    is the event names joined with "+".
+    """
+
+    def __init__(self, contract, event_names, handler, on_commit=None):
+        self.contract = contract
+        self.address = contract.address
+        self.event_names = tuple(event_names)
+        self.key = "+".join(self.event_names)
+        self.handler = handler
+        self.on_commit = on_commit  # called with the decoded events after each committed window
+        self.decoders = DecoderRegistry.from_abi(
+            [e for e in contract.abi if e.get("type") == "event" and e.get("name") in self.event_names])
+        self.topics = [[self.decoders.topic(name) for name in self.event_names]]
+        self.window = AdaptiveWindow()
+        self.state = None
+
+    def decode(self, raw_logs):
+        decode = self.decoders.decode
+        return [event for event in map(decode, raw_logs) if event is not None]
+
+
+def build_streams(web3, config=Config):
+    action_logger = _contract(web3, config, 'ACTION_LOGGER_CONTRACT_ADDRESS', 'ACTION_LOGGER_CONTRACT_ABI_PATH',
+                              "ActionLogger", required=True)
+    nft_land = _contract(web3, config, 'NFT_DOC_CONTRACT_ADDRESS', 'NFT_LAND_CONTRACT_ABI_PATH', "NFTDoc")
+    nft_marketplace = _contract(web3, config, 'NFT_MARKETPLACE_CONTRACT_ADDRESS',
+                                'NFT_MARKETPLACE_CONTRACT_ABI_PATH', "NFTMarketplace")
+    faucet = _contract(web3, config, 'FAUCET_CONTRACT_ADDRESS', 'FAUCET_CONTRACT_ABI_PATH', "EssentialisPayout")
+
+    streams = [Stream(action_logger, ["ActionLogged"], store_action_logged, on_commit=_publish_action_logs)]
+    if nft_land is not None:
+        streams.append(Stream(nft_land, ["NFTMinted", "NFTUpdated"], store_nft_events))
+    if nft_marketplace is not None:
+        streams.append(Stream(nft_marketplace, ["NFTListed", "NFTSold", "NFTUnlisted"], store_market_events))
+    if faucet is not None:
+        streams.append(Stream(faucet, ["Payout", "KeyRegistered"], store_faucet_events,
+                              on_commit=_record_payouts))
+    return streams
+
+
+class IndexerStopped(Exception):
+    """
+    Raised between windows when the caller's keep_going() says stop (e.g.
+    leadership lost), or inside one when its fence fails (see process_window).
+    """
+
+
+def _check(keep_going):
+    if keep_going is not None and not keep_going():
+        raise IndexerStopped()
+
+
+def _fenced(db_session, fence, what):
+    """Raise IndexerStopped (after rolling back) unless ``fence(db_session)`` says this indexer may still write."""
+    if fence is not None and not fence(db_session):
+        db_session.rollback()
+        raise IndexerStopped(f"lease lost before {what}")
+
+
+def process_window(db_session, stream, to_block, raw_logs, fence=None) -> int:
+    """
+    Decode and store one window's (confirmed) logs, advance the stream's
+    checkpoint and promote its provisional rows, committing all together.
+    Returns the number of rows written.
+
+    The transaction first re-checks the lease (``fence``) and moves the
+    checkpoint forward, so an ex-leader still processing the same window
+    writes nothing: it rolls back and raises IndexerStopped.
+    """
+    raw_logs = sorted((log for log in raw_logs if is_after_checkpoint(log, stream.state)),
+                      key=lambda log: (log['blockNumber'], log['logIndex']))
+    _fenced(db_session, fence, f"{stream.key} window to {to_block}")
+    if not advance_checkpoint(db_session, stream.state, to_block, raw_logs):
+        db_session.rollback()
+        raise IndexerStopped(f"{stream.key} checkpoint already past block {to_block}")
+    events = stream.decode(raw_logs)
+    written = stream.handler(db_session, events)
+    drop_provisional(db_session, stream.address, stream.key, to_block)
+    db_session.commit()
+    if events and stream.on_commit is not None:
+        try:
+            stream.on_commit(events)
+        except Exception as e:
+            logging.warning(f"{stream.key} on_commit hook failed: {e}")
+    return written
+
+
+def _publish_action_logs(events):
+    live_feed.feed.publish([action_log_row(event) for event in events])
+
+
+def _record_payouts(events):
+    claim_index.get_index().add_events(events)
+
 
-        while True:
+def refresh_provisional(db_session, web3, stream, head, fence=None):
+    """
+    Re-read the unconfirmed tail (checkpoint, head] and make ProvisionalLog
+    match it.  Logs are keyed by block hash, so anything a reorg orphaned
+    since the last poll disappears here, and new-chain logs replace it.
+    """
+    from_block = stream.state.last_block + 1
+    if from_block > head:
+        return
+    logs = []
+    for _, _, chunk in scan_logs(web3, stream.address, stream.topics, from_block, head, stream.window):
+        logs.extend(log for log in chunk if not log.get('removed'))
+    _fenced(db_session, fence, f"{stream.key} provisional refresh")
+    added, rolled_back = replace_provisional(db_session, stream.address, stream.key, from_block, stream.decode(logs))
+    db_session.commit()
+    if rolled_back:
+        logging.warning(f"{stream.key}: reorg rolled back {rolled_back} provisional logs above block {from_block - 1}")
+    if added:
+        logging.info(f"{stream.key}: {added} provisional logs in blocks {from_block}-{head}")
+
+
+def poll_stream(db_session, web3, stream, head, confirmations=None, keep_going=None, config=Config, fence=None):
+    """
+    Index one stream: logs at least ``confirmations`` (default: ``config``'s
+    INDEXER_CONFIRMATIONS) blocks deep go through the confirmed pipeline,
+    newer ones into ProvisionalLog.
+    """
+    confirmations = _cfg(config, 'INDEXER_CONFIRMATIONS', 0) if confirmations is None else confirmations
+    safe_head = head - confirmations
+    for from_block, to_block, logs in scan_logs(
+            web3, stream.address, stream.topics, resume_block(stream.state), safe_head, stream.window):
+        _check(keep_going)
+        t0 = time.perf_counter()
+        written = process_window(db_session, stream, to_block, logs, fence)
+        if logs:
+            elapsed = time.perf_counter() - t0
+            logging.info(f"{stream.key} blocks {from_block}-{to_block}: {written} rows from {len(logs)} logs "
+                         f"in {elapsed:.3f}s ({len(logs) / max(elapsed, 1e-9):.0f} logs/s, "
+                         f"window {stream.window.size})")
+
+    if confirmations > 0:
+        _check(keep_going)
+        refresh_provisional(db_session, web3, stream, head, fence)
+
+
+# --- Parallel historical backfill ---
+# Ranges are fetched concurrently but committed strictly in block order, each
+# together with the checkpoint, so a crash leaves a gap-free prefix behind.
+
+_thread_local = threading.local()
+
+
+def _thread_web3(rpc_url):
+    """One Web3 (and HTTP session) per backfill thread and RPC URL."""
+    clients = getattr(_thread_local, "clients", None)
+    if clients is None:
+        clients = _thread_local.clients = {}
+    web3 = clients.get(rpc_url)
+    if web3 is None:
+        web3 = clients[rpc_url] = Web3(Web3.HTTPProvider(rpc_url))
+    return web3
+
+
+def split_ranges(start_block, end_block, range_size):
+    """[(from, to), ...] covering [start_block, end_block] in order."""
+    return [(b, min(b + range_size - 1, end_block)) for b in range(start_block, end_block + 1, range_size)]
+
+
+def fetch_range(rpc_url, address, topics, from_block, to_block):
+    """All logs in [from_block, to_block], using an adaptive window within the range."""
+    logs = []
+    window = AdaptiveWindow(initial=min(INITIAL_WINDOW, to_block - from_block + 1))
+    for _, _, chunk in scan_logs(_thread_web3(rpc_url), address, topics, from_block, to_block, window):
+        logs.extend(chunk)
+    return logs
+
+
+def backfill(db_session, stream, end_block, workers=None, range_size=None, keep_going=None, config=Config,
+             fence=None):
+    """
+    Index [resume_block(stream.state), end_block] with ``workers`` fetch threads
+    on ``config``'s RPC_URL.  At most 2 * workers ranges are in flight;
+    results are committed in order.
+    """
+    workers = workers or _cfg(config, 'INDEXER_BACKFILL_WORKERS', 1)
+    range_size = range_size or _cfg(config, 'INDEXER_BACKFILL_RANGE')
+    rpc_url = _cfg(config, 'RPC_URL')
+    ranges = split_ranges(resume_block(stream.state), end_block, range_size)
+    if not ranges:
+        return
+
+    logging.info(f"Backfilling {stream.key} blocks {ranges[0][0]}-{end_block} in {len(ranges)} ranges "
+                 f"with {workers} workers")
+    t_start, total = time.perf_counter(), 0
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="indexer-backfill") as pool:
+        pending = {}
+        next_submit = 0
+        for i, (from_block, to_block) in enumerate(ranges):
+            while next_submit < len(ranges) and next_submit < i + 2 * workers:
+                pending[next_submit] = pool.submit(fetch_range, rpc_url, stream.address, stream.topics, *ranges[next_submit])
+                next_submit += 1
             try:
-                for event in action_logged_event_filter.get_new_entries():
-                    process_action_logged_event(event, db_session)
+                _check(keep_going)
+                logs = pending.pop(i).result()
+            except Exception:
+                for future in pending.values():
+                    future.cancel()
+                raise
+
+            process_window(db_session, stream, to_block, logs, fence)
+            total += len(logs)
+
+            if logs or i % 50 == 0:
+                elapsed = time.perf_counter() - t_start
+                logging.info(f"Backfill {stream.key} {i + 1}/{len(ranges)} through block {to_block}: "
+                             f"{total} logs, {total / max(elapsed, 1e-9):.0f} logs/s")
+
+
+class EventIndexer:
+    """
+    All configured streams plus the session that writes them.  ``resume``
+    reloads checkpoints (another instance may have advanced them) and
+    backfills to the confirmed head; ``poll_once`` brings every stream up
+    to date.  ``keep_going`` is checked between windows; ``fence(session)``
+    (e.g. Lease.held) inside every window's transaction.
+    """
+
+    def __init__(self, web3, session_factory, config=Config, fence=None):
+        self.web3 = web3
+        self.session_factory = session_factory
+        self.config = config
+        self.fence = fence
+        self.streams = build_streams(web3, config)
+        self.db_session = None
+
+    def _reload_state(self, stream):
+        stream.state = load_checkpoint(self.db_session, stream.address, stream.key, self.config)
 
-                # for event in nft_minted_filter.get_new_entries():
-                #     process_nft_minted_event(event, db_session) # Implement this
-                # for event in nft_listed_filter.get_new_entries():
-                #     process_nft_listed_event(event, db_session) # Implement this
+    def close(self):
+        if self.db_session is not None:
+            self.db_session.close()
+            self.db_session = None
 
-                # Update last processed block periodically, not necessarily after each event batch
-                # current_highest_block_processed = max([e['blockNumber'] for e in new_action_logs],
-                # default=last_block_action_logger)
-                # if current_highest_block_processed > last_block_action_logger:
-                #    last_block_action_logger = current_highest_block_processed
-                #    # Persist this new last_block_action_logger
+    def resume(self, backfill_workers=None, keep_going=None):
+        self.close()
+        self.db_session = self.session_factory()
+        for stream in self.streams:
+            self._reload_state(stream)
+            logging.info(f"Indexing {stream.key} on {stream.address} from block {resume_block(stream.state)} "
+                         f"(checkpoint {stream.state.last_block}:{stream.state.last_log_index})")
+        self.db_session.commit()
 
+        workers = _cfg(self.config, 'INDEXER_BACKFILL_WORKERS', 1) if backfill_workers is None else backfill_workers
+        if workers <= 1:
+            return
+        head = self.web3.eth.block_number - _cfg(self.config, 'INDEXER_CONFIRMATIONS', 0)  # only final history
+        for stream in self.streams:
+            try:
+                backfill(self.db_session, stream, head, workers=workers,
+                         range_size=_cfg(self.config, 'INDEXER_BACKFILL_RANGE'), keep_going=keep_going,
+                         config=self.config, fence=self.fence)
+            except IndexerStopped:
+                self.db_session.rollback()
+                raise
+            except Exception as e:
+                # Committed ranges are kept; polling carries on from the checkpoint
+                logging.error(f"Backfill of {stream.key} stopped after block {stream.state.last_block}: {e}")
+                self.db_session.rollback()
+                self._reload_state(stream)
+
+    def poll_once(self, keep_going=None):
+        try:
+            head = self.web3.eth.block_number
+        except Exception as e:
+            logging.error(f"Failed to read block number: {e}")
+            return
+        for stream in self.streams:
+            try:
+                poll_stream(self.db_session, self.web3, stream, head,
+                            keep_going=keep_going, config=self.config, fence=self.fence)
+            except IndexerStopped:
+                self.db_session.rollback()
+                raise
             except Exception as e:
-                logging.error(f"Error in event polling loop: {e}")
-                # Recreate a filter if it becomes invalid due to RPC issues, etc.
-                time.sleep(10)  # Wait before retrying
-                # Re-initialize filter (careful with fromBlock to avoid missing events or reprocessing)
-                # A robust solution might need to re-check connection and re-create the filter
-                # from the last successfully processed block number.
-                db_session.rollback()  # Roll back any partial commits from this iteration
-                # Reconnect or re-initialize if necessary
-                w3_check = Web3(Web3.HTTPProvider(Config.POLYGON_RPC_URL))
-                if not w3_check.is_connected():
-                    logging.error("Indexer lost RPC connection. Attempting to reconnect...")
-                    # Recreate filters based on the last known processed block
-                    action_logged_event_filter = action_logger_contract_instance.events.ActionLogged.create_filter(
-                        fromBlock=get_last_processed_block(db_session) + 1  # Ensure this is correct
-                    )
-
-            time.sleep(15)  # Poll every 15 seconds
-    finally:
-        db_session.close()
+                logging.error(f"Error indexing {stream.key} after block {stream.state.last_block}: {e}")
+                self.db_session.rollback()  # Drops the partial window; the checkpoint marks the last commit
+                self._reload_state(stream)
 
 
 if __name__ == "__main__":
+    import argparse
+
+    from .indexer_service import run_standalone
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description="Essentialis blockchain event indexer")
+    parser.add_argument("--backfill-workers", type=int, default=None,
+                        help="Fetch threads for catching up to head first (1 disables; "
+                             "default INDEXER_BACKFILL_WORKERS)")
+    cli_args = parser.parse_args()
+
     logging.info("Starting blockchain event indexer...")
-    # Ensure DB schema is created (Flask app does this, but indexer might run standalone)
-    # from app.models import Base # if using declarative base for SQLAlchemy
-    # Base.metadata.create_all(bind=engine) # If needed
-    listen_for_events()
+    # Takes the same leader lease as embedded indexers, so it is safe to run alongside them
+    run_standalone(backfill_workers=cli_args.backfill_workers)
@@ -1,9 +1,15 @@
-from flask import Blueprint, request, jsonify, session
+from functools import lru_cache
+
+import requests
+from flask import Blueprint, request, jsonify, session, current_app
 from web3 import Web3
 from web3.exceptions import ContractLogicError
 import os
+import threading
 from dotenv import load_dotenv
+from . import claim_batcher, claim_index, db, tx_sender
 from .faucet_signer import create_claim_signature
+from .models import FaucetPayout
 
 load_dotenv()
 
@@ -14,9 +20,13 @@ faucet_bp = Blueprint('faucet', __name__)
 RPC_URL = os.getenv('RPC_URL')
 FAUCET_CONTRACT_ADDRESS = os.getenv('FAUCET_CONTRACT_ADDRESS')
 PAYOUT_AMOUNT_ETH = "0.00002"  # 0.00002 ETH
+# Multicall3 is deployed at the same address on Polygon, Amoy and most EVM chains
+MULTICALL3_ADDRESS = os.getenv('MULTICALL3_ADDRESS', '0xcA11bde05977b3631167028862bE2a3f36Ac1be2')
+MULTICALL_CHUNK = 500  # nonces() calls per aggregate3 eth_call
 
-# Initialize Web3
-web3 = Web3(Web3.HTTPProvider(RPC_URL))
+# recipient (lowercase) -> PendingClaim of its latest relayed claim in this process
+_active_claims = {}
+_claims_lock = threading.Lock()
 
 # Contract ABI (minimal - only what we need)
 FAUCET_ABI = [
@@ -39,27 +49,148 @@ FAUCET_ABI = [
         "outputs": [],
         "stateMutability": "nonpayable",
         "type": "function"
+    },
+    {
+        "inputs": [
+            {"name": "recipients", "type": "address[]"},
+            {"name": "amounts", "type": "uint256[]"},
+            {"name": "expectedNonces", "type": "uint256[]"},
+            {"name": "pubEncryptionKeys", "type": "string[]"}
+        ],
+        "name": "claimBatch",
+        "outputs": [],
+        "stateMutability": "nonpayable",
+        "type": "function"
     }
 ]
 
-# Get contract instance
-faucet_contract = web3.eth.contract(
-    address=Web3.to_checksum_address(FAUCET_CONTRACT_ADDRESS),
-    abi=FAUCET_ABI
-)
+MULTICALL3_ABI = [
+    {
+        "inputs": [{"components": [
+            {"name": "target", "type": "address"},
+            {"name": "allowFailure", "type": "bool"},
+            {"name": "callData", "type": "bytes"}
+        ], "name": "calls", "type": "tuple[]"}],
+        "name": "aggregate3",
+        "outputs": [{"components": [
+            {"name": "success", "type": "bool"},
+            {"name": "returnData", "type": "bytes"}
+        ], "name": "returnData", "type": "tuple[]"}],
+        "stateMutability": "payable",
+        "type": "function"
+    }
+]
+
+
+# Web3 client and contract are built on first use so importing the blueprint
+# costs nothing and a missing FAUCET_CONTRACT_ADDRESS only fails faucet requests.
+@lru_cache(maxsize=1)
+def get_web3() -> Web3:
+    return Web3(Web3.HTTPProvider(RPC_URL, session=requests.Session()))
+
+
+@lru_cache(maxsize=1)
+def get_faucet_contract():
+    return get_web3().eth.contract(
+        address=Web3.to_checksum_address(FAUCET_CONTRACT_ADDRESS),
+        abi=FAUCET_ABI
+    )
+
+
+@lru_cache(maxsize=1)
+def get_multicall():
+    return get_web3().eth.contract(address=Web3.to_checksum_address(MULTICALL3_ADDRESS), abi=MULTICALL3_ABI)
+
+
+@lru_cache(maxsize=1)
+def get_chain_id() -> int:
+    """Chain id never changes for a given RPC, so fetch it once per process."""
+    return get_web3().eth.chain_id
+
+
+def reset_clients():
+    """Drop the cached client/contract so the next call builds fresh ones (after fork)."""
+    get_web3.cache_clear()
+    get_faucet_contract.cache_clear()
+    get_multicall.cache_clear()
+    with _claims_lock:
+        _active_claims.clear()  # the parent's sender threads did not survive the fork
+
+
+def get_relay_sender():
+    """This process's queued sender for the faucet owner wallet (see app/tx_sender.py)."""
+    return tx_sender.get_sender(current_app, private_key_key='OWNER_PRIVATE_KEY', name="faucet")
+
+
+def get_claim_batcher():
+    """This process's claimBatch batcher (see app/claim_batcher.py)."""
+    return claim_batcher.get_batcher(current_app, get_faucet_contract(), get_relay_sender())
+
+
+def _claim_response(handle) -> dict:
+    return {
+        "success": handle.status not in ("error", "failed", "skipped"),
+        "claimId": handle.id,
+        "txHash": handle.tx_hash,
+        "status": handle.status,
+        "blockNumber": handle.receipt["blockNumber"] if handle.receipt else None,
+        "error": handle.error,
+    }
 
 
 def get_nonce(recipient_address: str) -> int:
-    """Get the current nonce for a recipient from the smart contract."""
+    """
+    Current contract nonce for a recipient: from the local Payout index
+    (app/claim_index.py), or ``nonces()`` on-chain on a miss.
+    """
     try:
         checksum_address = Web3.to_checksum_address(recipient_address)
-        nonce = faucet_contract.functions.nonces(checksum_address).call()
+        nonce = claim_index.get_index().next_nonce(checksum_address)
+        if nonce is not None:
+            return nonce
+        nonce = get_faucet_contract().functions.nonces(checksum_address).call()
+        claim_index.get_index().remember(checksum_address, nonce)
         return nonce
     except Exception as e:
         print(f"Error getting nonce: {e}")
         raise
 
 
+def get_nonces(recipient_addresses: list) -> dict:
+    """
+    Contract nonces for many recipients (checksum address -> nonce).
+
+    Index hits cost nothing; the misses are read with Multicall3
+    ``aggregate3`` in MULTICALL_CHUNK-call eth_calls instead of one
+    ``nonces()`` RPC each.  If Multicall3 is unavailable the misses fall
+    back to individual calls.
+    """
+    index = claim_index.get_index()
+    contract = get_faucet_contract()
+    nonces, misses = {}, []
+    for address in recipient_addresses:
+        nonce = index.next_nonce(address)
+        if nonce is not None:
+            nonces[address] = nonce
+        else:
+            misses.append(address)
+
+    for start in range(0, len(misses), MULTICALL_CHUNK):
+        chunk = misses[start:start + MULTICALL_CHUNK]
+        try:
+            results = get_multicall().functions.aggregate3([
+                (contract.address, False, contract.encode_abi('nonces', args=[address])) for address in chunk
+            ]).call()
+            values = [int.from_bytes(return_data[:32], 'big') for _, return_data in results]
+        except Exception as e:
+            current_app.logger.warning(f"Multicall3 aggregate3 failed ({e}); reading {len(chunk)} nonces one by one")
+            values = [contract.functions.nonces(address).call() for address in chunk]
+        for address, nonce in zip(chunk, values):
+            index.remember(address, nonce)
+            nonces[address] = nonce
+    return nonces
+
+
 @faucet_bp.route('/address', methods=['GET'])
 def get_faucet_address():
     """Return the faucet contract address."""
@@ -107,8 +238,16 @@ def get_claim_signature():
         recipient = Web3.to_checksum_address(recipient)
         normalized = recipient.lower()
 
-        # 5. Get current nonce from contract
+        # 4. Reject repeat claimers from the local index (no RPC)
+        if claim_index.get_index().has_claimed(normalized):
+            return jsonify({"error": "Address has already claimed"}), 409
+
+        # 5. Get current nonce (index, else contract); non-zero means a claim the index has not seen yet
         nonce = get_nonce(recipient)
+        if nonce > 0:
+            return jsonify({"error": "Address has already claimed"}), 409
+
+        web3 = get_web3()
 
         # 6. Convert payout amount to wei
         amount_wei = web3.to_wei(PAYOUT_AMOUNT_ETH, 'ether')
@@ -120,7 +259,7 @@ def get_claim_signature():
         return jsonify({
             **signature_data,
             "contractAddress": FAUCET_CONTRACT_ADDRESS,
-            "chainId": str(web3.eth.chain_id),
+            "chainId": str(get_chain_id()),
         }), 200
 
     except Exception as e:
@@ -133,6 +272,13 @@ def relay_claim():
     """
     Backend submits the claim transaction on behalf of the user (for MetaMask/EOAs).
 
+    The claim is queued on the claim batcher, which sends pending claims as
+    one owner-relayed claimBatch tx through the faucet's sender, and the
+    request returns at once with status "batching".  Its FaucetClaim row
+    lets GET /faucet/claim-status/<recipient> follow it on any worker.  A
+    request for a recipient whose claim is still in flight (on any worker)
+    returns that claim instead of queueing a second one.
+
     Expected body:
     {
         "recipient": "0x...",
@@ -142,8 +288,11 @@ def relay_claim():
     Returns:
     {
         "success": true,
-        "txHash": "0x..."
+        "claimId": "...",
+        "txHash": null,
+        "status": "batching"
     }
+    Follow up with GET /faucet/claim-status/<recipient>.
     """
     try:
         # 1. Check authentication
@@ -167,47 +316,37 @@ def relay_claim():
         recipient = Web3.to_checksum_address(recipient)
         normalized = recipient.lower()
 
-        # 5. Get nonce
+        # 4. One in-flight claim per recipient: a second would reuse the same contract nonce and be skipped
+        with _claims_lock:
+            handle = _active_claims.get(normalized)
+        if handle is not None and not handle.done:
+            return jsonify(_claim_response(handle)), 200
+        stored = claim_batcher.stored_claim(db.session, normalized)
+        if stored is not None and stored["status"] in ("batching", "queued", "submitted"):
+            return jsonify({"success": True, **stored}), 200
+        if claim_index.get_index().has_claimed(normalized):
+            return jsonify({"error": "Address has already claimed"}), 409
+
+        # 5. Get nonce (index, else contract); non-zero means a claim the index has not seen yet
         nonce = get_nonce(recipient)
+        if nonce > 0:
+            return jsonify({"error": "Address has already claimed"}), 409
+
+        web3 = get_web3()
 
         # 6. Convert amount to wei
         amount_wei = web3.to_wei(PAYOUT_AMOUNT_ETH, 'ether')
 
-        # 7. Create signature
-        signature_data = create_claim_signature(recipient, amount_wei, nonce)
+        # 7-8. Queue for the next claimBatch tx (owner-only, so no per-claim signature is needed)
+        handle = get_claim_batcher().add(recipient, amount_wei, nonce, str(pub_key))
+        with _claims_lock:
+            _active_claims[normalized] = handle
+            if len(_active_claims) > 10_000:
+                for key in [k for k, h in _active_claims.items() if h.done][:1000]:
+                    _active_claims.pop(key, None)
 
-        # 8. Prepare transaction (backend submits)
-        owner_account = web3.eth.account.from_key(os.getenv('OWNER_PRIVATE_KEY'))
-
-        # Build transaction
-        tx = faucet_contract.functions.claim(
-            Web3.to_checksum_address(signature_data['recipient']),
-            int(signature_data['amount']),
-            int(signature_data['deadline']),
-            bytes.fromhex(signature_data['signature'][2:]),  # Remove '0x' prefix
-            str(pub_key)
-        ).build_transaction({
-            'from': owner_account.address,
-            'nonce': web3.eth.get_transaction_count(owner_account.address),
-            'gas': 200000,  # Increased gas for storage
-            'gasPrice': web3.eth.gas_price,
-        })
-
-        # Sign transaction
-        signed_tx = web3.eth.account.sign_transaction(tx, os.getenv('OWNER_PRIVATE_KEY'))
-
-        # Send transaction
-        tx_hash = web3.eth.send_raw_transaction(signed_tx.rawTransaction)
-
-        # Wait for receipt (optional - remove if you want async)
-        receipt = web3.eth.wait_for_transaction_receipt(tx_hash, timeout=120)
-
-        # 10. Return success
-        return jsonify({
-            "success": True,
-            "txHash": tx_hash.hex(),
-            "blockNumber": receipt['blockNumber'],
-        }), 200
+        # 9. Return without waiting for the batch: claim-status follows it
+        return jsonify(_claim_response(handle)), 200
 
     except ContractLogicError as e:
         print(f"Contract error in relay_claim: {e}")
@@ -217,25 +356,65 @@ def relay_claim():
         return jsonify({"error": str(e)}), 500
 
 
-# @faucet_bp.route('/check-claimed/<address>', methods=['GET'])
-# def check_claimed(address):
-#     """
-#     Check if an address has already claimed.
-#
-#     Returns:
-#     {
-#         "hasClaimed": true/false
-#     }
-#     """
-#     try:
-#         if not Web3.is_address(address):
-#             return jsonify({"error": "Invalid address"}), 400
-#
-#         normalized = Web3.to_checksum_address(address).lower()
-#
-#         return jsonify({
-#             "hasClaimed": normalized in claimed_users
-#         }), 200
-#
-#     except Exception as e:
-#         return jsonify({"error": str(e)}), 500
+@faucet_bp.route('/claim-status/<address>', methods=['GET'])
+def claim_status(address):
+    """
+    Status of the latest claim for ``address``.
+
+    Claims relayed by this worker are answered from memory, those relayed
+    by another from their FaucetClaim row and its batch's OutboundTx row.
+    Otherwise the indexed Payout (FaucetPayout) gives the paying tx, and a
+    non-zero contract nonce means paid but not indexed yet.
+    """
+    if not Web3.is_address(address):
+        return jsonify({"error": "Invalid address"}), 400
+    recipient = Web3.to_checksum_address(address)
+
+    with _claims_lock:
+        handle = _active_claims.get(recipient.lower())
+    if handle is not None:
+        return jsonify(_claim_response(handle)), 200
+
+    try:
+        stored = claim_batcher.stored_claim(db.session, recipient)
+        if stored is not None:
+            return jsonify({"success": stored["status"] not in ("error", "failed", "skipped"), **stored}), 200
+        payout = FaucetPayout.query.filter_by(user_address=recipient).order_by(
+            FaucetPayout.block_number.desc()).first()
+        if payout is not None or get_nonce(recipient) > 0:
+            return jsonify({
+                "success": True, "claimId": None, "status": "mined",
+                "txHash": payout.tx_hash if payout else None,
+                "blockNumber": payout.block_number if payout else None,
+                "error": None,
+            }), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+    return jsonify({"error": "No claim found for this address"}), 404
+
+
+@faucet_bp.route('/check-claimed/<address>', methods=['GET'])
+def check_claimed(address):
+    """
+    Check if an address has already claimed.
+
+    Answered from the local Payout index; only addresses it has not seen
+    cost a ``nonces()`` call.
+
+    Returns:
+    {
+        "hasClaimed": true/false
+    }
+    """
+    try:
+        if not Web3.is_address(address):
+            return jsonify({"error": "Invalid address"}), 400
+
+        normalized = Web3.to_checksum_address(address).lower()
+
+        return jsonify({
+            "hasClaimed": claim_index.get_index().has_claimed(normalized) or get_nonce(normalized) > 0
+        }), 200
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
@@ -1,18 +1,31 @@
+import multiprocessing
 import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from eth_abi import encode
 from eth_account import Account
 from eth_account.messages import encode_typed_data
+from eth_keys import keys
+from eth_utils import keccak, to_checksum_address
 from dotenv import load_dotenv
 import time
 
 load_dotenv()
 
-# Load configuration from environment
-OWNER_PRIVATE_KEY = os.getenv('OWNER_PRIVATE_KEY')
-CHAIN_ID = int(os.getenv('CHAIN_ID'))
+# Configuration is read and the signing account derived on first use,
+# not at import time, so workers that never sign claims never touch the key.
 CONTRACT_ADDRESS = os.getenv('FAUCET_CONTRACT_ADDRESS')
 
-# Create an account from private key
-owner_account = Account.from_key(OWNER_PRIVATE_KEY)
+
+@lru_cache(maxsize=1)
+def get_chain_id() -> int:
+    return int(os.getenv('CHAIN_ID'))
+
+
+@lru_cache(maxsize=1)
+def get_owner_account():
+    return Account.from_key(os.getenv('OWNER_PRIVATE_KEY'))
 
 
 # EIP-712 Domain (must match smart contract)
@@ -20,7 +33,7 @@ def get_domain():
     return {
         "name": "EssentialisPayout",
         "version": "1",
-        "chainId": CHAIN_ID,
+        "chainId": get_chain_id(),
         "verifyingContract": CONTRACT_ADDRESS,
     }
 
@@ -70,7 +83,7 @@ def create_claim_signature(recipient: str, amount_wei: int, nonce: int):
 
     # Encode and sign
     encoded_data = encode_typed_data(full_message=structured_data)
-    signed_message = owner_account.sign_message(encoded_data)
+    signed_message = get_owner_account().sign_message(encoded_data)
 
     # Return signature and claim details
     return {
@@ -82,6 +95,102 @@ def create_claim_signature(recipient: str, amount_wei: int, nonce: int):
     }
 
 
+# --- Bulk signing ---
+# encode_typed_data re-hashes the domain and type strings for every message.
+# For cohorts the domain separator is computed once and each claim costs one
+# struct hash, one keccak and one secp256k1 signature, spread over a process
+# pool (signing is CPU-bound, so threads would serialize on the GIL).
+
+EIP712_DOMAIN_TYPEHASH = keccak(text="EIP712Domain(string name,string version,uint256 chainId,address verifyingContract)")
+CLAIM_TYPEHASH = keccak(text="Claim(address recipient,uint256 amount,uint256 nonce,uint256 deadline)")
+
+_worker_key = None
+_worker_domain_separator = None
+
+
+def get_domain_separator() -> bytes:
+    domain = get_domain()
+    return keccak(encode(
+        ["bytes32", "bytes32", "bytes32", "uint256", "address"],
+        [EIP712_DOMAIN_TYPEHASH, keccak(text=domain["name"]), keccak(text=domain["version"]),
+         domain["chainId"], to_checksum_address(domain["verifyingContract"])]))
+
+
+def claim_digest(domain_separator: bytes, recipient: str, amount_wei: int, nonce: int, deadline: int) -> bytes:
+    """The EIP-712 digest ``encode_typed_data`` + ``sign_message`` would sign for this claim."""
+    struct_hash = keccak(encode(["bytes32", "address", "uint256", "uint256", "uint256"],
+                                [CLAIM_TYPEHASH, recipient, amount_wei, nonce, deadline]))
+    return keccak(b"\x19\x01" + domain_separator + struct_hash)
+
+
+def init_worker(domain_separator: bytes):
+    """ProcessPoolExecutor initializer: load the owner key once per worker."""
+    global _worker_key, _worker_domain_separator
+    _worker_key = keys.PrivateKey(get_owner_account().key)
+    _worker_domain_separator = domain_separator
+
+
+def sign_claims(claims, deadline: int) -> list:
+    """
+    Sign ``(recipient, amount_wei, nonce)`` tuples in a pool worker.
+
+    Returns dicts shaped like create_claim_signature's.
+    """
+    signed = []
+    for recipient, amount_wei, nonce in claims:
+        sig = _worker_key.sign_msg_hash(claim_digest(_worker_domain_separator, recipient, amount_wei, nonce, deadline))
+        signature = sig.r.to_bytes(32, "big") + sig.s.to_bytes(32, "big") + bytes([sig.v + 27])
+        signed.append({
+            "recipient": recipient,
+            "amount": str(amount_wei),
+            "nonce": str(nonce),
+            "deadline": str(deadline),
+            "signature": "0x" + signature.hex(),
+        })
+    return signed
+
+
+SIGN_CHUNK = 250  # claims per pool task; amortizes pickling/IPC against ~1 ms of signing each
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _reset_after_fork():
+    """The pool's worker processes and management thread belong to the parent."""
+    global _pool, _pool_lock
+    _pool = None
+    _pool_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def get_sign_pool(workers: int) -> ProcessPoolExecutor:
+    """This process's signing pool.  Workers are spawned, not forked, so they
+    do not inherit the web worker's sender/tracker threads or DB connections."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=max(1, workers), mp_context=multiprocessing.get_context("spawn"),
+                                        initializer=init_worker, initargs=(get_domain_separator(),))
+        return _pool
+
+
+def sign_claims_bulk(claims: list, deadline: int, workers: int):
+    """
+    Sign ``(recipient, amount_wei, nonce)`` tuples across the process pool.
+
+    Yields lists of signed claims, SIGN_CHUNK at a time, in input order, as
+    soon as each chunk is done.
+    """
+    chunks = [claims[i:i + SIGN_CHUNK] for i in range(0, len(claims), SIGN_CHUNK)]
+    if not chunks:
+        return
+    yield from get_sign_pool(workers).map(sign_claims, chunks, [deadline] * len(chunks))
+
+
 # Example usage (for testing)
 if __name__ == "__main__":
     test_recipient = "0x5B38Da6a701c568545dCfcB03FcB875f56beddC4"
@@ -0,0 +1,192 @@
+"""
+fee_oracle.py — Cached EIP-1559 fee data shared by every sender in a process.
+
+The log sender, faucet relay and deployer each priced their own tx with
+``eth.gas_price`` or ``get_block('latest')``, i.e. one or two RPC round
+trips per transaction for a value that only changes once a block.  A
+FeeOracle keys its snapshot on the block: at most once per REFRESH_SECONDS
+it asks for ``eth_blockNumber`` and only calls ``eth_feeHistory`` when a new
+block has arrived, serving the cached snapshot in between.  (Polling the
+head is the cheapest way to learn of a new block without a websocket
+subscription, which the HTTP providers used here don't offer.)
+
+  base_fee      next block's base fee (last entry of baseFeePerGas)
+  priority_fee  median of the REWARD_PERCENTILE tip over FEE_HISTORY_BLOCKS,
+                floored at MIN_PRIORITY_FEE
+  max_fee       2 * base_fee + priority_fee: stays valid through several
+                full blocks of base-fee growth
+
+Chains without EIP-1559 (no baseFeePerGas, or no feeHistory method) fall
+back to a cached ``eth.gas_price`` and legacy ``gasPrice`` fields.  Any
+other refresh error (timeout, 5xx) keeps serving the previous snapshot and
+is retried on the next refresh.
+
+  fees = get_oracle(web3).tx_fields()       # {"maxFeePerGas": ..., "maxPriorityFeePerGas": ...}
+  wei = get_oracle(web3).estimate_cost(200_000)
+"""
+
+import logging
+import os
+import statistics
+import threading
+import time
+
+from web3 import Web3
+from web3.exceptions import MethodNotSupported, MethodUnavailable
+
+logger = logging.getLogger(__name__)
+
+REFRESH_SECONDS = 1.0          # how often to check for a new block (eth_blockNumber)
+FEE_HISTORY_BLOCKS = 10
+REWARD_PERCENTILE = 50
+MIN_PRIORITY_FEE = Web3.to_wei(1, 'gwei')
+METHOD_NOT_FOUND = -32601      # JSON-RPC error code
+
+
+def _is_method_missing(exc) -> bool:
+    """True if ``exc`` says the node has no such RPC method (not a transient failure)."""
+    if isinstance(exc, (MethodUnavailable, MethodNotSupported)):
+        return True
+    error = (getattr(exc, 'rpc_response', None) or {}).get('error')
+    if isinstance(error, dict) and error.get('code') == METHOD_NOT_FOUND:
+        return True
+    message = str(exc).lower()
+    return "method not found" in message or "does not exist/is not available" in message
+
+
+class FeeSnapshot:
+    __slots__ = ('block', 'base_fee', 'priority_fee', 'gas_price', 'fetched_at')
+
+    def __init__(self, block=None, base_fee=None, priority_fee=None, gas_price=None):
+        self.block = block
+        self.base_fee = base_fee
+        self.priority_fee = priority_fee
+        self.gas_price = gas_price        # legacy chains only
+        self.fetched_at = time.monotonic()
+
+    @property
+    def eip1559(self) -> bool:
+        return self.base_fee is not None
+
+    @property
+    def max_fee(self):
+        return 2 * self.base_fee + self.priority_fee if self.eip1559 else self.gas_price
+
+    def to_dict(self) -> dict:
+        return {
+            "block": self.block, "eip1559": self.eip1559,
+            "base_fee_wei": self.base_fee, "priority_fee_wei": self.priority_fee,
+            "max_fee_wei": self.max_fee, "gas_price_wei": self.gas_price,
+        }
+
+
+class FeeOracle:
+
+    def __init__(self, web3: Web3):
+        self.web3 = web3
+        self._snapshot = None
+        self._lock = threading.Lock()            # guards _snapshot
+        self._refresh_lock = threading.Lock()    # one refresh in flight; others serve the old snapshot
+        self._eip1559 = True
+
+    def _fetch(self, head=None) -> FeeSnapshot:
+        """Fees as of block ``head``.  Raises on RPC failures; only a node without EIP-1559 switches to legacy."""
+        if self._eip1559:
+            try:
+                history = self.web3.eth.fee_history(FEE_HISTORY_BLOCKS, 'latest', [REWARD_PERCENTILE])
+            except Exception as e:
+                if not _is_method_missing(e):
+                    raise
+                logger.info(f"eth_feeHistory unavailable ({e}); using legacy gasPrice")
+                self._eip1559 = False
+            else:
+                base_fees = history.get('baseFeePerGas') or []
+                if base_fees and base_fees[-1] is not None:
+                    tips = [reward[0] for reward in history.get('reward') or [] if reward and reward[0]]
+                    priority = max(int(statistics.median(tips)) if tips else 0, MIN_PRIORITY_FEE)
+                    newest = history['oldestBlock'] + len(base_fees) - 2
+                    return FeeSnapshot(block=newest, base_fee=base_fees[-1], priority_fee=priority)
+                logger.info("eth_feeHistory returned no baseFeePerGas; using legacy gasPrice")
+                self._eip1559 = False
+        return FeeSnapshot(block=head, gas_price=self.web3.eth.gas_price)
+
+    def snapshot(self) -> FeeSnapshot:
+        """
+        The cached snapshot.  Once it is REFRESH_SECONDS old, the head is
+        checked and fees are re-read only if it has moved past the snapshot's
+        block.
+        """
+        with self._lock:
+            current = self._snapshot
+        if current is not None and time.monotonic() - current.fetched_at < REFRESH_SECONDS:
+            return current
+        if not self._refresh_lock.acquire(blocking=current is None):
+            return current  # another thread is refreshing
+        try:
+            with self._lock:
+                if self._snapshot is not current:  # refreshed while we waited for the lock
+                    return self._snapshot
+            head = self.web3.eth.block_number
+            if current is not None and current.block is not None and head <= current.block:
+                with self._lock:
+                    current.fetched_at = time.monotonic()  # same block: same fees, check again later
+                return current
+            fresh = self._fetch(head)
+        except Exception as e:
+            if current is None:
+                raise
+            logger.warning(f"Fee refresh failed ({e}); serving snapshot from block {current.block}")
+            return current
+        finally:
+            self._refresh_lock.release()
+        with self._lock:
+            self._snapshot = fresh
+        return fresh
+
+    def tx_fields(self) -> dict:
+        """Fee fields for a transaction dict."""
+        snap = self.snapshot()
+        if snap.eip1559:
+            return {"maxFeePerGas": snap.max_fee, "maxPriorityFeePerGas": snap.priority_fee}
+        return {"gasPrice": snap.gas_price}
+
+    def estimate_cost(self, gas_units: int) -> int:
+        """Expected wei for ``gas_units`` at the next block's fees (not the max-fee ceiling)."""
+        snap = self.snapshot()
+        price = snap.base_fee + snap.priority_fee if snap.eip1559 else snap.gas_price
+        return gas_units * price
+
+
+# --- per-process registry ---
+
+_oracles = {}
+_oracles_lock = threading.Lock()
+
+
+def _reset_after_fork():
+    global _oracles, _oracles_lock
+    _oracles = {}
+    _oracles_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def _provider_key(web3: Web3):
+    return getattr(web3.provider, 'endpoint_uri', None) or id(web3.provider)
+
+
+def get_oracle(web3: Web3) -> FeeOracle:
+    """The oracle for ``web3``'s node; every Web3 on the same RPC URL shares one."""
+    key = _provider_key(web3)
+    with _oracles_lock:
+        oracle = _oracles.get(key)
+        if oracle is None:
+            oracle = _oracles[key] = FeeOracle(web3)
+        return oracle
+
+
+def tx_fields(web3: Web3) -> dict:
+    """Shorthand for ``get_oracle(web3).tx_fields()``; matches TxSender's fee_fn signature."""
+    return get_oracle(web3).tx_fields()
@@ -0,0 +1,188 @@
+"""
+indexer_service.py — Leader-elected background event indexer.
+
+Any process may start the service (every app worker with INDEXER_ENABLED,
+or ``python -m app.event_indexer``).  They coordinate through a single
+IndexerLease row: only the holder of an unexpired lease indexes, renewing
+it every TTL/4 seconds between windows.  Followers retry on the same
+cadence, so when the leader dies another process takes over within about
+INDEXER_LEASE_TTL seconds.  The lease itself is app/leases.py.
+
+If a leader stalls past its TTL mid-window, two processes may briefly index
+the same range.  Every window's transaction is fenced: it re-checks the
+lease (row-locked until commit) and moves the checkpoint with a conditional
+UPDATE that only goes forward, before writing any rows.  An ex-leader's
+late window therefore rolls back instead of committing; rollups are also
+only incremented for rows the insert itself reports as new.
+
+  start(app)        — start (or keep) this process's service thread
+  run_standalone()  — blocking loop for the CLI entry point
+"""
+
+import logging
+import os
+import threading
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from web3 import Web3
+
+from .config import Config
+from .event_indexer import EventIndexer, IndexerStopped, POLL_INTERVAL, _cfg
+from .leases import Lease
+
+LEASE_NAME = "event-indexer"
+MAINTENANCE_INTERVAL = 3600  # seconds between ActionLog partition rotation/archival runs
+
+logger = logging.getLogger(__name__)
+
+
+class IndexerService:
+
+    def __init__(self, web3, session_factory, config=Config, name=LEASE_NAME, backfill_workers=None):
+        self.session_factory = session_factory
+        self.name = name
+        self.ttl = _cfg(config, 'INDEXER_LEASE_TTL', 20)
+        self.renew_every = max(self.ttl / 4, 1)
+        self.backfill_workers = backfill_workers
+        self.lease = Lease(session_factory, name, self.ttl)
+        self.indexer = EventIndexer(web3, session_factory, config, fence=self.lease.held)
+        self.holder = self.lease.holder
+        self.pid = os.getpid()
+        self.is_leader = False
+        self._next_renew = 0.0
+        self._next_maintenance = 0.0
+        self._stop = threading.Event()
+        self.thread = None
+
+    # --- lease ---
+
+    def _acquire(self) -> bool:
+        """Take or renew the lease.  True if this process holds it afterwards."""
+        try:
+            return self.lease.acquire()
+        finally:
+            self._next_renew = time.monotonic() + self.renew_every
+
+    def _release(self):
+        self.lease.release()
+
+    def _keep_going(self) -> bool:
+        """Checked by the indexer between windows; renews the lease when due."""
+        if self._stop.is_set():
+            return False
+        if time.monotonic() >= self._next_renew:
+            self.is_leader = self._acquire()
+        return self.is_leader
+
+    # --- loop ---
+
+    def _wait(self, seconds):
+        """Sleep up to ``seconds`` while keeping the lease fresh.  False once stopped or demoted."""
+        deadline = time.monotonic() + seconds
+        while not self._stop.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return True
+            self._stop.wait(min(remaining, max(self._next_renew - time.monotonic(), 0.1)))
+            if self.is_leader and not self._keep_going():
+                return False
+        return False
+
+    def run(self):
+        logger.info(f"Event indexer service started as {self.holder}")
+        try:
+            while not self._stop.is_set():
+                if not self._acquire():
+                    if self.is_leader:
+                        logger.warning("Event indexer lease lost; following")
+                        self.is_leader = False
+                    self._stop.wait(self.renew_every)
+                    continue
+
+                try:
+                    if not self.is_leader:
+                        self.is_leader = True
+                        logger.info(f"Event indexer lease acquired by {self.holder}")
+                        self.indexer.resume(self.backfill_workers, keep_going=self._keep_going)
+                    self.indexer.poll_once(keep_going=self._keep_going)
+                    self._maintain()
+                    self._wait(POLL_INTERVAL)
+                except IndexerStopped:
+                    if not self._stop.is_set():
+                        logger.warning("Event indexer lease lost mid-window; following")
+                    self.is_leader = False
+                except Exception as e:
+                    logger.error(f"Event indexer iteration failed: {e}")
+                    self.is_leader = False  # resume() reloads checkpoints next time round
+                    self._stop.wait(self.renew_every)
+        finally:
+            if self.is_leader:
+                self._release()
+            self.indexer.close()
+
+    def _maintain(self):
+        """Leader-only housekeeping: ActionLog partition rotation and archival, hourly."""
+        if time.monotonic() < self._next_maintenance:
+            return
+        self._next_maintenance = time.monotonic() + MAINTENANCE_INTERVAL
+        from . import action_partitions
+
+        session = self.session_factory()
+        try:
+            config = self.indexer.config
+            result = action_partitions.maintain(session, config if isinstance(config, dict) else vars(Config))
+            if result["rotated"] or result["archived"]:
+                logger.info(f"ActionLog partitions: {result}")
+        except Exception as e:
+            session.rollback()
+            logger.error(f"ActionLog partition maintenance failed: {e}")
+        finally:
+            session.close()
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, name="event-indexer", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self.thread is not None:
+            self.thread.join(timeout)
+
+
+def start(app):
+    """
+    Start this process's indexer service if INDEXER_ENABLED.  Safe to call
+    again after fork: a service owned by another pid is replaced.
+    """
+    if not app.config.get('INDEXER_ENABLED'):
+        return None
+    service = app.extensions.get("indexer_service")
+    if service is not None and service.pid == os.getpid() and service.thread and service.thread.is_alive():
+        return service
+
+    from . import db
+    with app.app_context():
+        engine = db.engine
+    # Own Web3 session: the indexer's long eth_getLogs calls never queue behind request traffic
+    web3 = Web3(Web3.HTTPProvider(app.config['RPC_URL']))
+    service = IndexerService(web3, sessionmaker(bind=engine, autoflush=False), app.config).start()
+    app.extensions["indexer_service"] = service
+    return service
+
+
+def run_standalone(backfill_workers=None):
+    """Blocking indexer loop outside Flask (CLI)."""
+    from . import db
+
+    engine = create_engine(Config.SQLALCHEMY_DATABASE_URI)
+    db.metadata.create_all(engine)  # The app normally does this on its startup-check thread
+    web3 = Web3(Web3.HTTPProvider(Config.RPC_URL))
+    service = IndexerService(web3, sessionmaker(bind=engine, autoflush=False), Config,
+                             backfill_workers=backfill_workers)
+    try:
+        service.run()
+    except KeyboardInterrupt:
+        service._stop.set()
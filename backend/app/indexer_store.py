@@ -0,0 +1,367 @@
+"""
+indexer_store.py — Database side of the event indexer.
+
+Rows for a whole eth_getLogs window are written with one multi-row
+INSERT ... ON CONFLICT DO NOTHING (INSERT IGNORE on MySQL), keyed on each
+table's natural unique key, so re-processing a window after a crash or
+overlap is a no-op instead of an IntegrityError.  The caller commits the
+rows together with the stream's IndexerState checkpoint.
+
+ActionLog timestamps and rollup buckets are naive UTC
+(action_partitions.utc_naive()).
+"""
+
+import json
+from collections import Counter
+from datetime import datetime, UTC
+
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+
+from .action_partitions import utc_naive
+from .models import (ActionLog, IndexedNFT, NFTUpdate, MarketListing, ProvisionalLog,
+                     ActionRollup, UserActivityRollup, FaucetPayout, EncryptionKey)
+
+INSERT_CHUNK = 500  # rows per statement; stays under SQLite's bound-parameter limit
+
+
+def _dialect_insert(dialect_name, table, index_elements):
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as pg_insert
+        return pg_insert(table).on_conflict_do_nothing(index_elements=index_elements)
+    if dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+        return sqlite_insert(table).on_conflict_do_nothing(index_elements=index_elements)
+    if dialect_name in ("mysql", "mariadb"):
+        return insert(table).prefix_with("IGNORE")
+    return None
+
+
+def insert_ignore(db_session, model, rows, index_elements) -> int:
+    """
+    Insert ``rows`` (list of column dicts) into ``model``'s table, skipping
+    any that collide on ``index_elements``.  Returns the number inserted.
+    Does not commit.
+    """
+    if not rows:
+        return 0
+    table = model.__table__
+    stmt = _dialect_insert(db_session.get_bind().dialect.name, table, index_elements)
+
+    if stmt is None:
+        # Unknown dialect: per-row savepoints, still one outer transaction
+        inserted = 0
+        for row in rows:
+            try:
+                with db_session.begin_nested():
+                    db_session.execute(insert(table).values(**row))
+                inserted += 1
+            except IntegrityError:
+                pass
+        return inserted
+
+    inserted = 0
+    for i in range(0, len(rows), INSERT_CHUNK):
+        result = db_session.execute(stmt.values(rows[i:i + INSERT_CHUNK]))
+        inserted += max(result.rowcount or 0, 0)
+    return inserted
+
+
+def insert_ignore_returning(db_session, model, rows, index_elements) -> list:
+    """
+    Like insert_ignore, but returns the rows that were actually inserted, so
+    derived counters only count what this transaction wrote.  Uses
+    RETURNING where the dialect has it (Postgres, SQLite), otherwise one
+    statement per row and its rowcount.  Does not commit.
+    """
+    if not rows:
+        return []
+    table = model.__table__
+    dialect = db_session.get_bind().dialect
+    stmt = _dialect_insert(dialect.name, table, index_elements)
+
+    if stmt is not None and dialect.name in ("postgresql", "sqlite"):
+        keys = set()
+        returning = stmt.returning(*(table.c[name] for name in index_elements))
+        for i in range(0, len(rows), INSERT_CHUNK):
+            keys.update(tuple(key) for key in db_session.execute(returning.values(rows[i:i + INSERT_CHUNK])))
+        return [row for row in rows if tuple(row[name] for name in index_elements) in keys]
+
+    return [row for row in rows if insert_ignore(db_session, model, [row], index_elements)]
+
+
+def action_log_row(event) -> dict:
+    """Column dict for a decoded ActionLogged event (see log_decoders)."""
+    args = event['args']
+    return {
+        "log_id_onchain": args.get('logId'),  # If your event has a logId field
+        "user_address": args['user'],
+        "action": args['action'],
+        "details": args['details'],
+        "timestamp": utc_naive(datetime.fromtimestamp(args['timestamp'], UTC)),
+        "block_number": event['blockNumber'],
+        "tx_hash": event['transactionHash'],
+        "log_index": event['logIndex'],
+    }
+
+
+def insert_action_logs(db_session, rows) -> int:
+    return insert_ignore(db_session, ActionLog, rows, ["tx_hash", "log_index"])
+
+
+def _unseen_action_logs(db_session, rows):
+    """
+    Rows not stored yet, in ActionLog or in the month tables and archives it
+    rotates into (app/action_partitions.py), so replays never re-count rollups.
+    """
+    from .action_partitions import stored_keys
+
+    existing = stored_keys(db_session, rows)
+    return [row for row in rows if (row["tx_hash"], row["log_index"]) not in existing]
+
+
+def store_action_logged(db_session, events) -> int:
+    rows = _unseen_action_logs(db_session, [action_log_row(event) for event in events])
+    # Rollups follow the rows this transaction inserted, not the pre-check: a row another
+    # writer inserted in between is skipped by the insert and must not be counted twice
+    inserted = insert_ignore_returning(db_session, ActionLog, rows, ["tx_hash", "log_index"])
+    update_action_rollups(db_session, inserted)
+    return len(inserted)
+
+
+# --- ActionLog rollups ---
+
+ROLLUP_GRANULARITIES = ("hour", "day")
+
+
+def bucket_start(timestamp, granularity):
+    if granularity == "hour":
+        return timestamp.replace(minute=0, second=0, microsecond=0)
+    return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def upsert_increment(db_session, model, rows, index_elements, counter="count"):
+    """
+    Add each row's ``counter`` to the existing row with the same key, or
+    insert it.  ON CONFLICT DO UPDATE / ON DUPLICATE KEY UPDATE where the
+    dialect has it, otherwise update-then-insert.  Does not commit.
+    """
+    if not rows:
+        return
+    table = model.__table__
+    dialect = db_session.get_bind().dialect.name
+    column = table.c[counter]
+
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        for i in range(0, len(rows), INSERT_CHUNK):
+            stmt = dialect_insert(table).values(rows[i:i + INSERT_CHUNK])
+            db_session.execute(stmt.on_conflict_do_update(
+                index_elements=index_elements, set_={counter: column + stmt.excluded[counter]}))
+        return
+    if dialect in ("mysql", "mariadb"):
+        from sqlalchemy.dialects.mysql import insert as mysql_insert
+        for i in range(0, len(rows), INSERT_CHUNK):
+            stmt = mysql_insert(table).values(rows[i:i + INSERT_CHUNK])
+            db_session.execute(stmt.on_duplicate_key_update({counter: column + stmt.inserted[counter]}))
+        return
+
+    for row in rows:
+        key = {name: row[name] for name in index_elements}
+        updated = db_session.query(model).filter_by(**key).update(
+            {counter: getattr(model, counter) + row[counter]}, synchronize_session=False)
+        if not updated:
+            db_session.execute(insert(table).values(**row))
+
+
+def update_action_rollups(db_session, rows):
+    """Fold newly inserted ActionLog rows into the hour/day rollups.  Does not commit."""
+    by_action, by_user = Counter(), Counter()
+    for row in rows:
+        if row["timestamp"] is None:
+            continue
+        for granularity in ROLLUP_GRANULARITIES:
+            start = bucket_start(row["timestamp"], granularity)
+            by_action[granularity, start, row["action"] or ""] += 1
+            if row["user_address"]:
+                by_user[granularity, start, row["user_address"]] += 1
+
+    upsert_increment(db_session, ActionRollup, [
+        {"granularity": g, "bucket_start": b, "action": a, "count": n} for (g, b, a), n in by_action.items()
+    ], ["granularity", "bucket_start", "action"])
+    upsert_increment(db_session, UserActivityRollup, [
+        {"granularity": g, "bucket_start": b, "user_address": u, "count": n} for (g, b, u), n in by_user.items()
+    ], ["granularity", "bucket_start", "user_address"])
+
+
+def rebuild_action_rollups(db_session, batch_size=10_000) -> int:
+    """
+    Recompute both rollup tables from ActionLog and its month tables (for
+    existing data; archived months are not re-read).  Commits.
+    """
+    from sqlalchemy import select
+
+    from .action_partitions import all_tables
+
+    db_session.query(ActionRollup).delete(synchronize_session=False)
+    db_session.query(UserActivityRollup).delete(synchronize_session=False)
+    total = 0
+    for table in all_tables(db_session):
+        last_id = -1
+        while True:
+            batch = db_session.execute(
+                select(table.c.id, table.c.timestamp, table.c.action, table.c.user_address).where(
+                    table.c.id > last_id).order_by(table.c.id).limit(batch_size)).all()
+            if not batch:
+                break
+            update_action_rollups(db_session, [
+                {"timestamp": r.timestamp, "action": r.action, "user_address": r.user_address} for r in batch])
+            last_id, total = batch[-1].id, total + len(batch)
+    db_session.commit()
+    return total
+
+
+def _log_meta(event) -> dict:
+    return {
+        "block_number": event['blockNumber'],
+        "tx_hash": event['transactionHash'],
+        "log_index": event['logIndex'],
+    }
+
+
+def store_nft_events(db_session, events) -> int:
+    """NFTMinted -> IndexedNFT, NFTUpdated -> NFTUpdate."""
+    minted, updates = [], []
+    for event in events:
+        args = event['args']
+        if event['event'] == 'NFTMinted':
+            minted.append({"token_id": args['tokenId'], "owner": args['owner'], "token_uri": args['data'],
+                           **_log_meta(event)})
+        elif event['event'] == 'NFTUpdated':
+            updates.append({"genesis_token_id": args['genesisTokenId'], "update_index": args['updateIndex'],
+                            "updated_data": args['updatedData'], **_log_meta(event)})
+    return (insert_ignore(db_session, IndexedNFT, minted, ["token_id"])
+            + insert_ignore(db_session, NFTUpdate, updates, ["genesis_token_id", "update_index"]))
+
+
+def store_market_events(db_session, events) -> int:
+    """
+    NFTListed inserts a MarketListing; NFTSold / NFTUnlisted close it.  A
+    listing's close always follows its NFTListed, so inserting the window's
+    listings first and then applying closes in log order is correct, and
+    replaying a window changes nothing.
+    """
+    listed = []
+    for event in events:
+        if event['event'] == 'NFTListed':
+            args = event['args']
+            listed.append({
+                "listing_id": args['listingId'],
+                "seller": args['seller'],
+                "nft_contract": args['nftContract'],
+                "token_id": args['tokenId'],
+                "price": args['price'],
+                "status": "active",
+                "listed_block": event['blockNumber'],
+                "listed_tx_hash": event['transactionHash'],
+            })
+    written = insert_ignore(db_session, MarketListing, listed, ["listing_id"])
+
+    for event in events:
+        if event['event'] not in ('NFTSold', 'NFTUnlisted'):
+            continue
+        args = event['args']
+        changes = {
+            "status": "sold" if event['event'] == 'NFTSold' else "unlisted",
+            "closed_block": event['blockNumber'],
+            "closed_tx_hash": event['transactionHash'],
+        }
+        if event['event'] == 'NFTSold':
+            changes.update(buyer=args['buyer'], commission=args['commission'])
+        written += db_session.query(MarketListing).filter_by(listing_id=args['listingId']).update(
+            changes, synchronize_session=False)
+    return written
+
+
+def store_faucet_events(db_session, events) -> int:
+    """
+    Payout -> FaucetPayout (one row per log).  KeyRegistered -> EncryptionKey
+    (source 'event'), one row per address holding the latest key: a window's
+    last event per address wins unless the stored row is from a later log.
+    """
+    payouts, keys = [], {}
+    for event in events:
+        args = event['args']
+        if event['event'] == 'Payout':
+            payouts.append({"user_address": args['user'], "amount": args['amount'], "nonce": args['nonce'],
+                            **_log_meta(event)})
+        elif event['event'] == 'KeyRegistered':
+            keys[args['user']] = {"pub_key": args['pubKey'], "source": "event", **_log_meta(event)}
+    written = insert_ignore(db_session, FaucetPayout, payouts, ["tx_hash", "log_index"])
+
+    if keys:
+        existing = {row.user_address: row for row in
+                    db_session.query(EncryptionKey).filter(
+                        EncryptionKey.source == 'event', EncryptionKey.user_address.in_(list(keys))).all()}
+        for address, values in keys.items():
+            row = existing.get(address)
+            if row is None:
+                db_session.add(EncryptionKey(user_address=address, **values))
+            elif (row.block_number or -1, row.log_index or -1) < (values["block_number"], values["log_index"]):
+                for name, value in values.items():
+                    setattr(row, name, value)
+            else:
+                continue
+            written += 1
+    return written
+
+
+# --- Provisional (unconfirmed) logs ---
+
+def _json_default(value):
+    if isinstance(value, (bytes, bytearray)):
+        return "0x" + bytes(value).hex()
+    raise TypeError(f"Not JSON serializable: {type(value).__name__}")
+
+
+def replace_provisional(db_session, contract, stream_key, from_block, events):
+    """
+    Make the provisional rows for [from_block, head] of a stream match
+    ``events`` (the current canonical view).  Rows whose (block_hash,
+    log_index) is no longer present were orphaned by a reorg and are
+    deleted.  Returns (added, rolled_back).  Does not commit.
+    """
+    fresh = {(event['blockHash'], event['logIndex']) for event in events}
+    existing = db_session.query(ProvisionalLog.id, ProvisionalLog.block_hash, ProvisionalLog.log_index).filter(
+        ProvisionalLog.contract == contract,
+        ProvisionalLog.stream == stream_key,
+        ProvisionalLog.block_number >= from_block,
+    ).all()
+    stale = [row.id for row in existing if (row.block_hash, row.log_index) not in fresh]
+    if stale:
+        db_session.query(ProvisionalLog).filter(ProvisionalLog.id.in_(stale)).delete(synchronize_session=False)
+
+    rows = [{
+        "contract": contract,
+        "stream": stream_key,
+        "event": event['event'],
+        "block_number": event['blockNumber'],
+        "block_hash": event['blockHash'],
+        "tx_hash": event['transactionHash'],
+        "log_index": event['logIndex'],
+        "user_address": event['args'].get('user') if event['event'] == 'ActionLogged' else None,
+        "args": json.dumps(event['args'], default=_json_default),
+    } for event in events]
+    return insert_ignore(db_session, ProvisionalLog, rows, ["block_hash", "log_index"]), len(stale)
+
+
+def drop_provisional(db_session, contract, stream_key, through_block) -> int:
+    """Remove provisional rows the confirmed pipeline now covers.  Does not commit."""
+    return db_session.query(ProvisionalLog).filter(
+        ProvisionalLog.contract == contract,
+        ProvisionalLog.stream == stream_key,
+        ProvisionalLog.block_number <= through_block,
+    ).delete(synchronize_session=False)
@@ -11,6 +11,11 @@ load_dotenv()
 PINATA_API_KEY = os.environ.get('PINATA_API_KEY')
 PINATA_SECRET_API_KEY = os.environ.get('PINATA_SECRET_API_KEY')
 
+# Read gateways, tried in order (also used by the ASGI proxy in asgi.py)
+PRIMARY_GATEWAY = "https://pink-total-bison-673.mypinata.cloud/ipfs"
+FALLBACK_GATEWAY = "https://ipfs.io/ipfs"
+STREAM_CHUNK_SIZE = 8192
+
 
 def upload_json(data: dict) -> str:
     # Set request headers
@@ -58,12 +63,12 @@ def upload_file(file: FileStorage) -> str:
 def download_json(ipfs_hash: str) -> dict:
     # Uses an IPFS gateway to retrieve the JSON.
     try:
-        gateway_url = f"https://pink-total-bison-673.mypinata.cloud/ipfs/{ipfs_hash}"
+        gateway_url = f"{PRIMARY_GATEWAY}/{ipfs_hash}"
         response = requests.get(gateway_url)
         response.raise_for_status()
         return response.json()
     except HTTPError:
-        gateway_url = f"https://ipfs.io/ipfs/{ipfs_hash}"
+        gateway_url = f"{FALLBACK_GATEWAY}/{ipfs_hash}"
         response = requests.get(gateway_url)
         response.raise_for_status()
         return response.json()
@@ -76,7 +81,7 @@ def stream_file_from_ipfs(ipfs_hash: str) -> Tuple[Iterator[bytes], dict]:
     :return: (byte iterator, response headers)
     """
     try:
-        gateway_url = f"https://pink-total-bison-673.mypinata.cloud/ipfs/{ipfs_hash}"
+        gateway_url = f"{PRIMARY_GATEWAY}/{ipfs_hash}"
         response = requests.get(gateway_url, stream=True)
         response.raise_for_status()
 
@@ -86,9 +91,9 @@ def stream_file_from_ipfs(ipfs_hash: str) -> Tuple[Iterator[bytes], dict]:
             "Content-Disposition": response.headers.get("Content-Disposition"),
         }
 
-        return response.iter_content(chunk_size=8192), headers
+        return response.iter_content(chunk_size=STREAM_CHUNK_SIZE), headers
     except HTTPError:
-        gateway_url = f"https://ipfs.io/ipfs/{ipfs_hash}"
+        gateway_url = f"{FALLBACK_GATEWAY}/{ipfs_hash}"
         response = requests.get(gateway_url, stream=True)
         response.raise_for_status()
 
@@ -98,4 +103,4 @@ def stream_file_from_ipfs(ipfs_hash: str) -> Tuple[Iterator[bytes], dict]:
             "Content-Disposition": response.headers.get("Content-Disposition"),
         }
 
-        return response.iter_content(chunk_size=8192), headers
+        return response.iter_content(chunk_size=STREAM_CHUNK_SIZE), headers
@@ -0,0 +1,106 @@
+"""
+leases.py — Named, expiring leader leases on the IndexerLease table.
+
+Used wherever exactly one process across every worker and host may do a
+job: the event indexer (app/indexer_service.py) and each wallet's
+transaction relay (app/tx_outbox.py).  A lease row is held by whoever last
+renewed it before ``expires_at``; anyone may take over an expired one.  A
+portable row rather than a Postgres advisory lock so the same code runs on
+SQLite in development.
+
+  lease = Lease(session_factory, "event-indexer", ttl=20)
+  if lease.acquire(): ...      # take or renew; call at least every ttl/2
+  lease.held(session)          # fence: still ours, checked inside the caller's transaction
+  lease.valid()                # fence without a query: renewed less than ttl/2 ago
+  lease.release()
+"""
+
+import logging
+import os
+import socket
+import time
+import uuid
+from datetime import datetime, UTC, timedelta
+
+from sqlalchemy import or_
+
+from .indexer_store import insert_ignore
+from .models import IndexerLease
+
+logger = logging.getLogger(__name__)
+
+
+def _utcnow():
+    return datetime.now(UTC).replace(tzinfo=None)
+
+
+def new_holder() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class Lease:
+
+    def __init__(self, session_factory, name: str, ttl: float, holder: str = None):
+        self.session_factory = session_factory
+        self.name = name
+        self.ttl = ttl
+        self.holder = holder or new_holder()
+        self.valid_until = 0.0  # monotonic; see valid()
+
+    def acquire(self) -> bool:
+        """Take or renew the lease.  True if this holder has it afterwards."""
+        started = time.monotonic()
+        session = self.session_factory()
+        try:
+            now = _utcnow()
+            values = {"holder": self.holder, "expires_at": now + timedelta(seconds=self.ttl)}
+            held = session.query(IndexerLease).filter(
+                IndexerLease.name == self.name,
+                or_(IndexerLease.holder == self.holder, IndexerLease.expires_at < now),
+            ).update(values, synchronize_session=False)
+            if not held:
+                held = insert_ignore(session, IndexerLease, [{"name": self.name, **values}], ["name"])
+            session.commit()
+            if held:
+                self.valid_until = started + self.ttl / 2
+            return bool(held)
+        except Exception as e:
+            session.rollback()
+            logger.warning(f"Lease '{self.name}' check failed: {e}")
+            return False
+        finally:
+            session.close()
+
+    def held(self, session) -> bool:
+        """
+        True if this holder's lease is unexpired, read inside ``session``'s
+        open transaction.  The row is locked (FOR UPDATE, where the dialect
+        has it) until that transaction ends, so a takeover cannot commit in
+        between this check and the caller's commit.
+        """
+        return session.query(IndexerLease.id).filter(
+            IndexerLease.name == self.name, IndexerLease.holder == self.holder,
+            IndexerLease.expires_at > _utcnow(),
+        ).with_for_update().first() is not None
+
+    def valid(self) -> bool:
+        """
+        True while no other holder can have taken the lease: less than ttl/2
+        since the start of the last successful acquire() (the other half of
+        the TTL absorbs clock skew between hosts).  No database round trip,
+        so it can gate every send; a stalled holder fails it on its own.
+        """
+        return time.monotonic() < self.valid_until
+
+    def release(self):
+        self.valid_until = 0.0
+        session = self.session_factory()
+        try:
+            session.query(IndexerLease).filter_by(name=self.name, holder=self.holder).update(
+                {"expires_at": _utcnow()}, synchronize_session=False)
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.warning(f"Lease '{self.name}' release failed: {e}")
+        finally:
+            session.close()
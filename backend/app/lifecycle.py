@@ -0,0 +1,119 @@
+"""
+lifecycle.py — Per-worker process hooks for production serving.
+
+serve.py preloads the app in the gunicorn master and forks workers from it.
+Anything holding a socket (Web3 HTTP sessions, the SQLAlchemy pool) must not
+be shared across that fork, and each worker should do its first round-trips
+before it is put in rotation rather than on a user's request.
+
+  reinit_after_fork(app) — give the worker its own network clients
+  warm(app)              — prime ABI/contract registry, chain id, DB pool,
+                           then start the wallet tx relays and the event
+                           indexer service if enabled
+"""
+
+import time
+
+from sqlalchemy import text
+
+
+def reinit_after_fork(app):
+    """Rebuild every client that may hold a socket inherited from the parent."""
+    from . import db, init_chain_clients
+
+    init_chain_clients(app)
+
+    # Drop inherited pool connections without closing the parent's sockets
+    with app.app_context():
+        db.engine.dispose(close=False)
+
+    if 'write' in app.config.get('APP_PROFILES', []):
+        from . import faucet
+        faucet.reset_clients()
+
+    # app.aio resets its loop via os.register_at_fork.
+
+
+def _warm_db_pool(app) -> int:
+    """Open up to pool_size connections concurrently, then return them to the pool."""
+    from . import db
+
+    size = (app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {}).get('pool_size', 1)
+    with app.app_context():
+        conns = []
+        try:
+            for _ in range(size):
+                conn = db.engine.connect()
+                conn.execute(text("SELECT 1"))
+                conns.append(conn)
+        finally:
+            for conn in conns:
+                conn.close()
+    return len(conns)
+
+
+def warm(app) -> dict:
+    """
+    Do a worker's first round-trips before it accepts traffic.  Returns
+    {step: seconds} for logging.  Failures are logged, not raised: the
+    worker still starts and /health/ready reports what is missing.
+    """
+    from . import readiness
+
+    timings = {}
+
+    def _step(name, fn):
+        t0 = time.perf_counter()
+        try:
+            fn()
+        except Exception as e:
+            app.logger.warning(f"Worker warm-up step '{name}' failed: {e}")
+        timings[name] = round(time.perf_counter() - t0, 4)
+
+    profiles = app.config.get('APP_PROFILES', [])
+
+    # ABI/contract registry: reads keeps its own parsed-ABI cache for the async path
+    if 'read' in profiles:
+        def _warm_abi():
+            from .reads import _load_contract_abi, _resolve_abi_path
+            _load_contract_abi(str(_resolve_abi_path(app.config['NFT_LAND_CONTRACT_ABI_PATH'])))
+        _step("abi_registry", _warm_abi)
+
+    def _warm_chain_id():
+        app.chain_id = app.w3.eth.chain_id
+    _step("chain_id", _warm_chain_id)
+
+    if 'write' in profiles:
+        def _warm_faucet():
+            from . import faucet
+            faucet.get_faucet_contract()
+            faucet.get_chain_id()
+        _step("faucet", _warm_faucet)
+
+    _step("db_pool", lambda: _warm_db_pool(app))
+
+    # The master starts no startup-check thread (create_app(start_checks=False)) and a parent's
+    # would not survive fork anyway; retry in this worker until the checks pass
+    state = app.extensions.get("startup_state")
+    if state is None:
+        _step("startup_checks", lambda: readiness.start(app))
+    elif not state.ready:
+        _step("startup_checks", lambda: readiness.start_checker(app))
+
+    # Every worker is a relay candidate for each configured wallet, so queued txs are sent
+    # even if the worker that queued them has exited; only the lease holder sends
+    if 'write' in profiles and app.config.get('TX_SENDER_MODE', 'outbox') == 'outbox':
+        def _relays():
+            from . import tx_sender
+            for key, name in (('PLATFORM_OPERATIONAL_WALLET_PRIVATE_KEY', 'platform'), ('OWNER_PRIVATE_KEY', 'faucet')):
+                if app.config.get(key):
+                    tx_sender.get_sender(app, private_key_key=key, name=name)
+        _step("tx_relays", _relays)
+
+    # Every worker competes for the indexer lease; only the leader indexes
+    def _indexer():
+        from . import indexer_service
+        indexer_service.start(app)
+    _step("indexer_service", _indexer)
+
+    return timings
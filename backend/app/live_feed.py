@@ -0,0 +1,157 @@
+"""
+live_feed.py — In-process fan-out of newly indexed ActionLog rows.
+
+SSE clients subscribe here instead of polling /admin/logs.  Rows arrive
+from two places:
+
+  * the event indexer, right after it commits a window (leader process)
+  * one DB tailer thread per process (``WHERE id > last_id``, every
+    TAIL_INTERVAL seconds), so workers that are not the indexer leader see
+    the same rows; it only runs while that process has subscribers
+
+Both may deliver the same row; it is de-duplicated on (tx_hash, log_index).
+Each subscriber has a bounded queue; a slow consumer drops rows (counted)
+rather than holding up the indexer.
+"""
+
+import os
+import queue
+import threading
+import time
+from collections import deque
+
+TAIL_INTERVAL = 1.0       # seconds between tailer queries while subscribers exist
+TAIL_BATCH = 500
+SUBSCRIBER_QUEUE = 1000   # rows buffered per subscriber
+RECENT_KEYS = 10_000      # (tx_hash, log_index) remembered for de-duplication
+
+
+def _row_key(row):
+    return row.get("tx_hash"), row.get("log_index")
+
+
+class Subscription:
+    def __init__(self, user_address=None, action=None, maxsize=SUBSCRIBER_QUEUE):
+        self.user_address = user_address.lower() if user_address else None
+        self.action = action
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def matches(self, row) -> bool:
+        if self.user_address and (row.get("user_address") or "").lower() != self.user_address:
+            return False
+        if self.action and row.get("action") != self.action:
+            return False
+        return True
+
+    def offer(self, row):
+        try:
+            self.queue.put_nowait(row)
+        except queue.Full:
+            self.dropped += 1
+
+    def get(self, timeout):
+        """Next row, or None after ``timeout`` seconds."""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class ActionFeed:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._recent = deque(maxlen=RECENT_KEYS)
+        self._recent_set = set()
+        self._tailer = None
+
+    def subscribe(self, user_address=None, action=None) -> Subscription:
+        subscription = Subscription(user_address, action)
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    @property
+    def has_subscribers(self) -> bool:
+        return bool(self._subscribers)
+
+    def publish(self, rows):
+        """Fan ``rows`` (ActionLog column dicts) out to matching subscribers."""
+        with self._lock:
+            if not self._subscribers:
+                return
+            fresh = []
+            for row in rows:
+                key = _row_key(row)
+                if key in self._recent_set:
+                    continue
+                if len(self._recent) == self._recent.maxlen:
+                    self._recent_set.discard(self._recent[0])
+                self._recent.append(key)
+                self._recent_set.add(key)
+                fresh.append(row)
+            subscribers = list(self._subscribers)
+        for row in fresh:
+            for subscription in subscribers:
+                if subscription.matches(row):
+                    subscription.offer(row)
+
+    def ensure_tailer(self, app):
+        """Start this process's DB tailer if it is not running."""
+        with self._lock:
+            if self._tailer is not None:
+                return
+            self._tailer = threading.Thread(target=self._tail, args=(app,), name="action-feed-tailer", daemon=True)
+            self._tailer.start()
+
+    def _tail(self, app):
+        from sqlalchemy import func
+
+        from . import db
+        from .models import ActionLog
+
+        with app.app_context():
+            last_id = db.session.query(func.max(ActionLog.id)).scalar() or 0
+            db.session.remove()
+            while True:
+                with self._lock:
+                    if not self._subscribers:
+                        self._tailer = None  # the next subscribe() starts a new one
+                        return
+                try:
+                    rows = ActionLog.query.filter(ActionLog.id > last_id).order_by(ActionLog.id).limit(TAIL_BATCH).all()
+                    if rows:
+                        last_id = rows[-1].id
+                        self.publish([action_log_dict(row) for row in rows])
+                except Exception as e:
+                    app.logger.warning(f"Action feed tailer query failed: {e}")
+                finally:
+                    db.session.remove()
+                time.sleep(TAIL_INTERVAL)
+
+
+def action_log_dict(log) -> dict:
+    return {
+        "user_address": log.user_address, "action": log.action, "details": log.details,
+        "timestamp": log.timestamp, "block_number": log.block_number,
+        "tx_hash": log.tx_hash, "log_index": log.log_index,
+    }
+
+
+feed = ActionFeed()
+
+
+def _reset_after_fork():
+    """Subscribers and the tailer thread belong to the parent."""
+    global feed
+    feed = ActionFeed()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
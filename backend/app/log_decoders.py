@@ -0,0 +1,148 @@
+"""
+log_decoders.py — Precompiled event-log decoders for the indexer.
+
+web3's ``contract.events.X().process_log`` looks the ABI up, re-derives the
+types and builds nested AttributeDicts for every log.  Here each event ABI
+is compiled once into an eth_abi TupleDecoder for its data and one for its
+static indexed topics, keyed by (topic0, topic count) so ERC-20/ERC-721
+style events sharing a signature but not an indexed layout stay distinct.
+Decoding a log is then two decoder calls and a plain dict.
+
+  registry = DecoderRegistry.from_abi(contract.abi)   # or default_registry()
+  event = registry.decode(raw_log)
+  event['event'], event['args']['user'], event['transactionHash'], ...
+
+Indexed dynamic values (string, bytes, arrays, tuples) are only present as
+their keccak hash on-chain, so they come back as the 0x-prefixed topic.
+"""
+
+import json
+from functools import lru_cache
+from pathlib import Path
+
+from eth_abi.decoding import ContextFramesBytesIO, TupleDecoder
+from eth_abi.registry import registry as abi_registry
+from eth_utils import event_abi_to_log_topic, to_checksum_address, to_hex
+from eth_utils.abi import collapse_if_tuple
+
+ABI_DIR = Path(__file__).parent / 'abi'
+
+_DYNAMIC_BASES = ('string', 'bytes', 'tuple')
+
+
+def _is_dynamic_topic(abi_type: str) -> bool:
+    # Fixed-size bytesN is static; bare "bytes", strings, arrays and tuples are hashed
+    if abi_type.endswith(']') or abi_type.startswith('('):
+        return True
+    return abi_type in _DYNAMIC_BASES
+
+
+def _tuple_decoder(types):
+    return TupleDecoder(decoders=tuple(abi_registry.get_decoder(t) for t in types))
+
+
+def _converter(abi_type):
+    return to_checksum_address if abi_type == 'address' else None
+
+
+class EventDecoder:
+    """One event ABI compiled to eth_abi decoders.  ``decode`` returns a plain dict."""
+
+    __slots__ = ('name', 'topic0', 'topic_count', 'names',
+                 '_data_decoder', '_data_fields', '_topic_decoder', '_topic_fields', '_hashed_topics')
+
+    def __init__(self, event_abi: dict):
+        self.name = event_abi['name']
+        self.topic0 = bytes(event_abi_to_log_topic(event_abi))
+        inputs = event_abi.get('inputs', [])
+        self.names = tuple(i['name'] for i in inputs)
+
+        indexed = [(i['name'], collapse_if_tuple(i)) for i in inputs if i.get('indexed')]
+        data = [(i['name'], collapse_if_tuple(i)) for i in inputs if not i.get('indexed')]
+        self.topic_count = 1 + len(indexed)
+
+        self._data_decoder = _tuple_decoder([t for _, t in data])
+        self._data_fields = tuple((name, _converter(t)) for name, t in data)
+
+        # Static indexed values decode from the concatenated topics in one call
+        static = [(pos, name, t) for pos, (name, t) in enumerate(indexed, start=1) if not _is_dynamic_topic(t)]
+        self._topic_decoder = _tuple_decoder([t for _, _, t in static])
+        self._topic_fields = tuple((pos, name, _converter(t)) for pos, name, t in static)
+        self._hashed_topics = tuple((pos, name) for pos, (name, t) in enumerate(indexed, start=1)
+                                    if _is_dynamic_topic(t))
+
+    def decode_args(self, topics, data) -> dict:
+        args = {}
+        if self._topic_fields:
+            values = self._topic_decoder(ContextFramesBytesIO(b''.join(bytes(topics[pos])
+                                                                       for pos, _, _ in self._topic_fields)))
+            for (_, name, convert), value in zip(self._topic_fields, values):
+                args[name] = convert(value) if convert else value
+        for pos, name in self._hashed_topics:
+            args[name] = to_hex(topics[pos])
+        if self._data_fields:
+            values = self._data_decoder(ContextFramesBytesIO(bytes(data)))
+            for (name, convert), value in zip(self._data_fields, values):
+                args[name] = convert(value) if convert else value
+        return args
+
+    def decode(self, raw_log) -> dict:
+        return {
+            'event': self.name,
+            'args': self.decode_args(raw_log['topics'], raw_log['data']),
+            'address': raw_log['address'],
+            'blockNumber': raw_log['blockNumber'],
+            'blockHash': to_hex(raw_log['blockHash']),
+            'transactionHash': to_hex(raw_log['transactionHash']),
+            'logIndex': raw_log['logIndex'],
+        }
+
+
+class DecoderRegistry:
+    """(topic0, topic count) -> EventDecoder, built once from one or more ABIs."""
+
+    def __init__(self):
+        self._decoders = {}
+        self._by_name = {}
+
+    @classmethod
+    def from_abi(cls, abi):
+        registry = cls()
+        registry.add_abi(abi)
+        return registry
+
+    def add_abi(self, abi):
+        for item in abi:
+            if item.get('type') != 'event' or item.get('anonymous'):
+                continue
+            decoder = EventDecoder(item)
+            self._decoders.setdefault((decoder.topic0, decoder.topic_count), decoder)
+            self._by_name.setdefault(decoder.name, decoder)
+
+    def event(self, name) -> EventDecoder:
+        return self._by_name[name]
+
+    def topic(self, name) -> str:
+        """0x-prefixed topic0 for an event name, as eth_getLogs filters expect."""
+        return to_hex(self._by_name[name].topic0)
+
+    def decoder_for(self, raw_log):
+        topics = raw_log['topics']
+        if not topics:
+            return None
+        return self._decoders.get((bytes(topics[0]), len(topics)))
+
+    def decode(self, raw_log):
+        """Decoded dict, or None for logs no registered event matches."""
+        decoder = self.decoder_for(raw_log)
+        return decoder.decode(raw_log) if decoder is not None else None
+
+
+@lru_cache(maxsize=1)
+def default_registry() -> DecoderRegistry:
+    """Every event in app/abi/*.json."""
+    registry = DecoderRegistry()
+    for path in sorted(ABI_DIR.glob('*.json')):
+        abi = json.loads(path.read_text())
+        registry.add_abi(abi['abi'] if isinstance(abi, dict) else abi)
+    return registry
@@ -56,6 +56,10 @@ class User(db.Model):
 
 
 class ActionLog(db.Model):  # For indexed action logger events
+    # One row per log; a tx may emit several ActionLogged events.  Tables created before
+    # log_index existed are upgraded in place by app/schema_upgrades.py
+    __table_args__ = (db.UniqueConstraint('tx_hash', 'log_index', name='uq_action_log_tx_log'),)
+
     id = db.Column(db.Integer, primary_key=True)
     log_id_onchain = db.Column(db.BigInteger, index=True, nullable=True)  # If your contract emits a logId
     user_address = db.Column(db.String(42), index=True)
@@ -63,7 +67,222 @@ class ActionLog(db.Model):  # For indexed action logger events
     details = db.Column(db.Text)
     timestamp = db.Column(db.DateTime, index=True)
     block_number = db.Column(db.BigInteger)
-    tx_hash = db.Column(db.String(66), unique=True)
+    tx_hash = db.Column(db.String(66), index=True)
+    log_index = db.Column(db.Integer, nullable=False, default=0)
+
+
+class ActionLogPartition(db.Model):  # One calendar month of ActionLog moved out of the hot table
+    id = db.Column(db.Integer, primary_key=True)
+    month = db.Column(db.String(7), unique=True, nullable=False)  # 'YYYY-MM'
+    status = db.Column(db.String(10), nullable=False, default='table')  # table | archived
+    table_name = db.Column(db.String(64), nullable=True)
+    archive_path = db.Column(db.String(512), nullable=True)
+    range_start = db.Column(db.DateTime, nullable=False)  # inclusive, ActionLog.timestamp clock
+    range_end = db.Column(db.DateTime, nullable=False)  # exclusive
+    row_count = db.Column(db.BigInteger, default=0)
+
+
+class ActionRollup(db.Model):  # ActionLog counts per hour/day bucket and action, kept by the indexer
+    __table_args__ = (db.UniqueConstraint('granularity', 'bucket_start', 'action', name='uq_action_rollup_bucket'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    granularity = db.Column(db.String(4), nullable=False)  # 'hour' | 'day'
+    bucket_start = db.Column(db.DateTime, nullable=False)  # same clock as ActionLog.timestamp
+    action = db.Column(db.String(255), nullable=False)
+    count = db.Column(db.BigInteger, nullable=False, default=0)
+
+
+class UserActivityRollup(db.Model):  # ActionLog counts per bucket and user; row count = distinct users
+    __table_args__ = (
+        db.UniqueConstraint('granularity', 'bucket_start', 'user_address', name='uq_user_activity_rollup_bucket'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    granularity = db.Column(db.String(4), nullable=False)
+    bucket_start = db.Column(db.DateTime, nullable=False)
+    user_address = db.Column(db.String(42), nullable=False)
+    count = db.Column(db.BigInteger, nullable=False, default=0)
+
+
+class IndexedNFT(db.Model):  # NFTDoc NFTMinted events
+    id = db.Column(db.Integer, primary_key=True)
+    token_id = db.Column(db.BigInteger, unique=True, nullable=False)
+    owner = db.Column(db.String(42), index=True)  # Minting owner
+    token_uri = db.Column(db.Text)
+    block_number = db.Column(db.BigInteger)
+    tx_hash = db.Column(db.String(66))
+    log_index = db.Column(db.Integer)
+
+
+class NFTUpdate(db.Model):  # NFTDoc NFTUpdated events
+    __table_args__ = (db.UniqueConstraint('genesis_token_id', 'update_index', name='uq_nft_update_token_index'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    genesis_token_id = db.Column(db.BigInteger, index=True, nullable=False)
+    update_index = db.Column(db.BigInteger, nullable=False)
+    updated_data = db.Column(db.Text)
+    block_number = db.Column(db.BigInteger)
+    tx_hash = db.Column(db.String(66))
+    log_index = db.Column(db.Integer)
+
+
+class FaucetPayout(db.Model):  # EssentialisPayout Payout events (one row per paid claim)
+    __table_args__ = (db.UniqueConstraint('tx_hash', 'log_index', name='uq_faucet_payout_tx_log'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_address = db.Column(db.String(42), index=True, nullable=False)
+    amount = db.Column(db.Numeric(78, 0), nullable=False)  # wei
+    nonce = db.Column(db.BigInteger, nullable=False)  # recipient's contract nonce consumed by this payout
+    block_number = db.Column(db.BigInteger)
+    tx_hash = db.Column(db.String(66), nullable=False)
+    log_index = db.Column(db.Integer, nullable=False)
+
+
+class FaucetClaim(db.Model):  # Relayed faucet claims (app/claim_batcher.py): claim-status from any worker
+    id = db.Column(db.Integer, primary_key=True)
+    claim_id = db.Column(db.String(32), unique=True, nullable=False)
+    recipient = db.Column(db.String(42), index=True, nullable=False)  # lowercase
+    status = db.Column(db.String(10), nullable=False, default='batching')  # batching | sent | error
+    request_id = db.Column(db.String(32), nullable=True)  # OutboundTx.request_id of its claimBatch tx once sent
+    error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(UTC))
+
+
+class EncryptionKey(db.Model):  # Public-key directory: one row per (address, source)
+    # source 'event':     encryption key from EssentialisPayout KeyRegistered (latest wins)
+    # source 'recovered': secp256k1 public key recovered from an outgoing tx signature (/pubkey)
+    __table_args__ = (db.UniqueConstraint('user_address', 'source', name='uq_encryption_key_address_source'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_address = db.Column(db.String(42), index=True, nullable=False)
+    pub_key = db.Column(db.Text, nullable=False)
+    source = db.Column(db.String(16), nullable=False, default='event')  # event | recovered
+    block_number = db.Column(db.BigInteger)
+    tx_hash = db.Column(db.String(66))
+    log_index = db.Column(db.Integer)
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(UTC), onupdate=lambda: datetime.now(UTC))
+
+
+class MarketListing(db.Model):  # NFTMarketplace listings, built from NFTListed/NFTSold/NFTUnlisted
+    __table_args__ = (db.Index('ix_market_listing_status_price', 'status', 'price'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    listing_id = db.Column(db.BigInteger, unique=True, nullable=False)  # allListingsArray index on-chain
+    seller = db.Column(db.String(42), index=True, nullable=False)
+    nft_contract = db.Column(db.String(42), index=True, nullable=False)
+    token_id = db.Column(db.BigInteger, index=True, nullable=False)
+    price = db.Column(db.Numeric(78, 0), nullable=False)  # wei
+    status = db.Column(db.String(10), nullable=False, default='active')  # active | sold | unlisted
+    buyer = db.Column(db.String(42), nullable=True)
+    commission = db.Column(db.Numeric(78, 0), nullable=True)  # wei, set when sold
+    listed_block = db.Column(db.BigInteger, index=True)
+    listed_tx_hash = db.Column(db.String(66))
+    closed_block = db.Column(db.BigInteger, nullable=True)
+    closed_tx_hash = db.Column(db.String(66), nullable=True)
+
+    def to_dict(self):
+        return {
+            "listing_id": self.listing_id,
+            "seller": self.seller,
+            "nft_contract": self.nft_contract,
+            "token_id": self.token_id,
+            "price_wei": str(self.price),
+            "status": self.status,
+            "buyer": self.buyer,
+            "commission_wei": str(self.commission) if self.commission is not None else None,
+            "listed_block": self.listed_block,
+            "listed_tx_hash": self.listed_tx_hash,
+            "closed_block": self.closed_block,
+            "closed_tx_hash": self.closed_tx_hash,
+        }
+
+
+class ProvisionalLog(db.Model):  # Indexed logs not yet INDEXER_CONFIRMATIONS deep
+    """
+    Near-head logs, keyed by the block hash they were seen in.  Rewritten on
+    every poll: rows whose block left the canonical chain are deleted, and
+    rows are dropped once the confirmed pipeline has committed their block.
+    """
+    __table_args__ = (
+        db.UniqueConstraint('block_hash', 'log_index', name='uq_provisional_log_block_log'),
+        db.Index('ix_provisional_log_stream_block', 'contract', 'stream', 'block_number'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    contract = db.Column(db.String(42), nullable=False)
+    stream = db.Column(db.String(64), nullable=False)  # IndexerState.event key
+    event = db.Column(db.String(64), nullable=False)
+    block_number = db.Column(db.BigInteger, nullable=False)
+    block_hash = db.Column(db.String(66), nullable=False)
+    tx_hash = db.Column(db.String(66), nullable=False)
+    log_index = db.Column(db.Integer, nullable=False)
+    user_address = db.Column(db.String(42), index=True, nullable=True)  # ActionLogged user, for filtering
+    args = db.Column(db.Text)  # JSON of the decoded event args
+    seen_at = db.Column(db.DateTime, default=lambda: datetime.now(UTC))
+
+
+class IndexerState(db.Model):  # Per-stream checkpoint for the event indexer
+    """
+    Everything up to and including (last_block, last_log_index) for this
+    contract/event stream has been committed.  Updated in the same
+    transaction as the rows it covers, so a restart resumes exactly here.
+    """
+    __table_args__ = (db.UniqueConstraint('contract', 'event', name='uq_indexer_state_stream'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    contract = db.Column(db.String(42), nullable=False)  # Checksummed contract address
+    event = db.Column(db.String(64), nullable=False)  # Event name, e.g. "ActionLogged"
+    last_block = db.Column(db.BigInteger, nullable=False, default=0)
+    last_log_index = db.Column(db.Integer, nullable=False, default=-1)  # -1: no log of last_block processed
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(UTC), onupdate=lambda: datetime.now(UTC))
+
+
+class IndexerLease(db.Model):  # Leader leases (app/leases.py): event indexer, per-wallet tx relays
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(64), unique=True, nullable=False)
+    holder = db.Column(db.String(128), nullable=False)  # host:pid:nonce of the current leader
+    expires_at = db.Column(db.DateTime, nullable=False)  # naive UTC; expired leases may be taken over
+
+
+class TrackedTx(db.Model):  # Outgoing platform transactions and their latest receipt status
+    id = db.Column(db.Integer, primary_key=True)
+    tx_hash = db.Column(db.String(66), unique=True, nullable=False)
+    label = db.Column(db.String(128), index=True)  # e.g. "logAction:document_uploaded", "faucet-claim:0x..", "deploy:MyToken"
+    status = db.Column(db.String(10), index=True, nullable=False, default='pending')  # pending | mined | failed | replaced | dropped
+    block_number = db.Column(db.BigInteger, nullable=True)
+    gas_used = db.Column(db.BigInteger, nullable=True)
+    contract_address = db.Column(db.String(42), nullable=True)  # contract-creation txs
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(UTC))
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(UTC), onupdate=lambda: datetime.now(UTC))
+
+    def to_dict(self):
+        return {
+            "tx_hash": self.tx_hash,
+            "label": self.label,
+            "status": self.status,
+            "block_number": self.block_number,
+            "gas_used": self.gas_used,
+            "contract_address": self.contract_address,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+        }
+
+
+class OutboundTx(db.Model):  # Platform txs queued by any worker for the wallet's leased relay (app/tx_outbox.py)
+    __table_args__ = (db.Index('ix_outbound_tx_sender_status', 'sender', 'status'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    request_id = db.Column(db.String(32), unique=True, nullable=False)
+    sender = db.Column(db.String(64), nullable=False)  # config key of the signing wallet
+    label = db.Column(db.String(128))
+    tx = db.Column(db.Text, nullable=False)  # JSON to/data/value/gas; nonce and fees are the relay's
+    status = db.Column(db.String(10), nullable=False, default='queued')  # queued | sending | submitted | mined | failed | error
+    nonce = db.Column(db.BigInteger, nullable=True)
+    tx_hash = db.Column(db.String(66), nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    receipt = db.Column(db.Text, nullable=True)  # JSON: status, blockNumber, gasUsed, contractAddress, logs
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(UTC))
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(UTC), onupdate=lambda: datetime.now(UTC))
 
 
 class AdminLoginToken(db.Model):
@@ -0,0 +1,139 @@
+"""
+pubkey_directory.py — Persistent public-key directory (EncryptionKey table).
+
+A public key never changes for an address, so it is looked up once and
+kept.  Each address can have two rows:
+
+  source 'event'      encryption key the user registered with the faucet
+                      claim (KeyRegistered), written by the event indexer
+  source 'recovered'  secp256k1 public key recovered from one of the
+                      address's outgoing tx signatures, written by /pubkey
+                      the first time it is asked for that address
+
+  keys = lookup(["0xabc...", "0xdef..."])   # one query for a whole share group
+  keys["0xAbC..."] == {"encryptionKey": "...", "pubkey": "0x04..."}
+
+Only ``recover_public_key`` touches the network (Etherscan txlist, then
+``eth_getTransaction``).
+"""
+
+import requests
+from web3 import Web3
+
+from .models import EncryptionKey
+
+ETHERSCAN_URL = "https://api.etherscan.io/v2/api"
+ETHERSCAN_TIMEOUT = 15
+LOOKUP_CHUNK = 500  # addresses per IN (...) query
+_FIELDS = {"event": "encryptionKey", "recovered": "pubkey"}
+# Signed fields of typed txs, as named in eth_getTransactionByHash results
+_TYPED_FIELDS = ("chainId", "nonce", "gas", "to", "value", "accessList", "gasPrice", "maxFeePerGas",
+                 "maxPriorityFeePerGas", "maxFeePerBlobGas", "blobVersionedHashes", "authorizationList")
+
+
+def lookup(addresses) -> dict:
+    """
+    Stored keys for ``addresses`` (checksum address -> {"encryptionKey", "pubkey"}).
+
+    Addresses with no stored key are left out.
+    """
+    checksums = list({Web3.to_checksum_address(address) for address in addresses})
+    found = {}
+    for i in range(0, len(checksums), LOOKUP_CHUNK):
+        rows = EncryptionKey.query.filter(EncryptionKey.user_address.in_(checksums[i:i + LOOKUP_CHUNK])).all()
+        for row in rows:
+            entry = found.setdefault(row.user_address, {"encryptionKey": None, "pubkey": None})
+            entry[_FIELDS.get(row.source, row.source)] = row.pub_key
+    return found
+
+
+def store_recovered(db_session, address: str, pub_key: str, tx_hash: str = None):
+    """Keep a recovered public key; a concurrent first lookup for the same address is a no-op."""
+    from .indexer_store import insert_ignore  # write path only (/pubkey), not the read profile's lookups
+
+    insert_ignore(db_session, EncryptionKey, [{
+        "user_address": Web3.to_checksum_address(address), "pub_key": pub_key,
+        "source": "recovered", "tx_hash": tx_hash,
+    }], ["user_address", "source"])
+    db_session.commit()
+
+
+def _as_int(value) -> int:
+    return int(value, 16) if isinstance(value, str) else int(value)
+
+
+def signing_hash(tx) -> tuple:
+    """
+    (hash the sender signed, recovery id 0/1) for a transaction as returned
+    by ``eth_getTransactionByHash``.
+
+    Typed txs (EIP-2930/1559/4844/7702) are re-encoded with their own type
+    and fields and carry the recovery id in yParity.  Legacy txs are
+    EIP-155 (v = 35 + 2 * chainId + id, chainId in the signed payload) or
+    pre-155 (v = 27 + id, no chainId).
+    """
+    # Transaction re-serialisation deps are only needed here
+    import rlp
+    from eth_account._utils.legacy_transactions import serializable_unsigned_transaction_from_dict
+    from eth_account.typed_transactions import TypedTransaction
+
+    tx_type = _as_int(tx.get("type") or 0)
+    if tx_type == 0:
+        v = _as_int(tx["v"])
+        unsigned = {"nonce": tx["nonce"], "gasPrice": tx["gasPrice"], "gas": tx["gas"], "to": tx.get("to") or b"",
+                    "value": tx["value"], "data": tx["input"]}
+        if v >= 35:
+            unsigned["chainId"] = (v - 35) // 2
+            recovery_id = (v - 35) % 2
+        else:
+            recovery_id = v - 27
+        return Web3.keccak(rlp.encode(serializable_unsigned_transaction_from_dict(unsigned))), recovery_id
+
+    fields = {name: tx[name] for name in _TYPED_FIELDS if tx.get(name) is not None}
+    fields["type"] = tx_type
+    fields["data"] = tx["input"]
+    recovery_id = _as_int(tx["yParity"] if tx.get("yParity") is not None else tx["v"])
+    return TypedTransaction.from_dict(fields).hash(), recovery_id
+
+
+def recover_from_transaction(tx) -> str:
+    """
+    The signer's uncompressed public key (0x hex) for a fetched transaction.
+
+    Raises ValueError unless the key belongs to ``tx["from"]``, so a
+    mis-encoded payload is never returned (or stored) as someone's key.
+    """
+    from eth_keys.datatypes import Signature
+
+    msg_hash, recovery_id = signing_hash(tx)
+    signature = Signature(vrs=(recovery_id, _as_int(tx["r"]), _as_int(tx["s"])))
+    public_key = signature.recover_public_key_from_msg_hash(msg_hash)
+    if public_key.to_checksum_address() != Web3.to_checksum_address(tx["from"]):
+        raise ValueError(f"Recovered key does not match the sender of {Web3.to_hex(tx['hash'])}")
+    return public_key.to_hex()
+
+
+def recover_public_key(web3: Web3, address: str, api_key: str, chain_id: str):
+    """
+    Recover ``address``'s secp256k1 public key from its latest outgoing tx.
+
+    Returns (pubkey_hex, tx_hash).  Raises LookupError if the address has
+    not sent a transaction, ValueError if the recovered key is not its own.
+    """
+    address = address.lower()
+
+    # 1. Fetch recent normal transactions (outgoing) using the v2 API
+    resp = requests.get(ETHERSCAN_URL, params={
+        "module": "account", "action": "txlist", "address": address,
+        "sort": "desc", "apikey": api_key, "chainid": chain_id,
+    }, timeout=ETHERSCAN_TIMEOUT).json()
+    if resp.get("status") != "1" or not resp.get("result"):
+        raise LookupError("No transactions found for this address")
+
+    # 2. Find first outgoing transaction (from == address)
+    tx = next((t for t in resp["result"] if t["from"].lower() == address), None)
+    if not tx:
+        raise LookupError("No outgoing transactions found")
+
+    # 3. Fetch the signed transaction and recover (checked against the sender)
+    return recover_from_transaction(web3.eth.get_transaction(tx["hash"])), tx["hash"]
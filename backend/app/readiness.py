@@ -0,0 +1,176 @@
+"""
+readiness.py — Background startup validation and health endpoints.
+
+create_app() no longer blocks on RPC round-trips or schema creation.  The
+checks that used to run inline (db.create_all, RPC reachable, contract
+code present) run on a daemon thread and are retried with backoff until
+they pass.  The schema step goes first and is its own check, so tables
+exist (and are upgraded) as soon as the database is up, even while the
+RPC is still failing.  Load balancers should route on /health/ready;
+/health/live only says the process is up.
+
+STARTUP_VALIDATION (config):
+  background — default; serve immediately, validate on a thread
+  blocking   — run the checks inline in create_app (old behaviour)
+  off        — skip the checks entirely (tests, one-off CLI commands)
+"""
+
+import threading
+import time
+from typing import Dict, Optional
+
+from flask import Blueprint, current_app, jsonify
+from web3 import Web3
+
+
+health_bp = Blueprint("health", __name__)
+
+RETRY_INITIAL = 1.0  # seconds
+RETRY_MAX = 30.0
+
+
+class StartupState:
+    """Result of the startup checks, shared between the checker thread and requests."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.ready = False
+        self.attempts = 0
+        self.checks: Dict[str, str] = {}
+        self.error: Optional[str] = None
+        self.started_at = time.time()
+        self.ready_at: Optional[float] = None
+
+    def record(self, checks: Dict[str, str], error: Optional[str]):
+        with self._lock:
+            self.attempts += 1
+            self.checks = checks
+            self.error = error
+            if error is None and not self.ready:
+                self.ready = True
+                self.ready_at = time.time()
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                "ready": self.ready,
+                "attempts": self.attempts,
+                "checks": dict(self.checks),
+                "error": self.error,
+                "startup_seconds": round(self.ready_at - self.started_at, 3) if self.ready_at else None,
+            }
+
+
+def check_schema(app) -> str:
+    """
+    Create missing tables and upgrade existing ones (app/schema_upgrades.py).
+    Needs only the database, so it runs before any chain check.
+    """
+    from . import db, models, schema_upgrades  # noqa: F401 — models must be registered before create_all
+
+    with app.app_context():
+        db.create_all()
+        schema_upgrades.upgrade(db.engine)
+    return "ok"
+
+
+def check_rpc(app) -> str:
+    if not app.w3.is_connected():
+        raise ConnectionError("Failed to connect to RPC")
+    return "ok"
+
+
+def check_nft_doc_contract(app) -> str:
+    nft_address = app.config.get('NFT_DOC_CONTRACT_ADDRESS')
+    if not app.w3.eth.get_code(Web3.to_checksum_address(nft_address)):
+        raise ConnectionError(f"No contract code found at NFT_DOC_CONTRACT_ADDRESS {nft_address} on RPC")
+    return "ok"
+
+
+def check_action_logger_contract(app) -> str:
+    logger_address = app.config.get('ACTION_LOGGER_CONTRACT_ADDRESS')
+    if not app.w3.eth.get_code(Web3.to_checksum_address(logger_address)):
+        app.logger.warning(f"No contract code found at ACTION_LOGGER_CONTRACT_ADDRESS {logger_address}")
+        return "warning: no contract code"
+    return "ok"
+
+
+# In order; a check that raises stops the run and is retried with the rest
+CHECKS = (
+    ("database", check_schema),
+    ("rpc", check_rpc),
+    ("nft_doc_contract", check_nft_doc_contract),
+    ("action_logger_contract", check_action_logger_contract),
+)
+
+
+def run_checks(app, checks: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """
+    Run every startup check once.  Fills and returns ``checks``
+    ({check: "ok" | "warning: ..."}) and raises on the first fatal failure,
+    leaving the results of the checks before it in ``checks``.  A check that
+    already passed on an earlier attempt is not repeated.
+    """
+    checks = {} if checks is None else checks
+    for name, check in CHECKS:
+        if checks.get(name) != "ok":
+            checks[name] = check(app)
+    return checks
+
+
+def _check_loop(app):
+    state: StartupState = app.extensions["startup_state"]
+    delay = RETRY_INITIAL
+    checks = {}
+    while True:
+        try:
+            state.record(run_checks(app, checks), None)
+            app.logger.info(f"Startup checks passed after {state.attempts} attempt(s)")
+            return
+        except Exception as e:
+            state.record(dict(checks), str(e))
+            app.logger.warning(f"Startup check failed (attempt {state.attempts}), retrying in {delay:.0f}s: {e}")
+            time.sleep(delay)
+            delay = min(delay * 2, RETRY_MAX)
+
+
+def start_checker(app) -> StartupState:
+    """Give this process a fresh StartupState and validate it on a retrying daemon thread."""
+    state = StartupState()
+    app.extensions["startup_state"] = state
+    threading.Thread(target=_check_loop, args=(app,), name="startup-checks", daemon=True).start()
+    return state
+
+
+def start(app, start_thread=True):
+    """
+    Attach a StartupState to ``app`` and validate according to
+    STARTUP_VALIDATION.  With ``start_thread=False`` background mode only
+    attaches an unready state; lifecycle.warm starts the checker per worker.
+    """
+    mode = (app.config.get('STARTUP_VALIDATION') or 'background').lower()
+    if mode not in ('off', 'blocking'):
+        if not start_thread:
+            app.extensions["startup_state"] = StartupState()
+            return app.extensions["startup_state"]
+        return start_checker(app)
+
+    state = StartupState()
+    app.extensions["startup_state"] = state
+    if mode == 'off':
+        state.record({}, None)
+    else:
+        state.record(run_checks(app), None)
+    return state
+
+
+@health_bp.route("/health/live", methods=["GET"])
+def live():
+    return jsonify({"status": "ok"}), 200
+
+
+@health_bp.route("/health/ready", methods=["GET"])
+def ready():
+    state: StartupState = current_app.extensions["startup_state"]
+    body = state.to_dict()
+    return jsonify(body), 200 if body["ready"] else 503
@@ -0,0 +1,308 @@
+# app/reads.py
+# Read-only document endpoints: IPFS proxy, owned-doc listing, token details,
+# NDJSON batch streaming and version history.  This blueprint is all a
+# "read" worker profile loads, so keep its imports light.
+import asyncio
+import json
+import re
+from functools import lru_cache
+from pathlib import Path
+
+from flask import Blueprint, request, jsonify, current_app, session, Response, stream_with_context
+from web3 import Web3
+
+from . import services, aio, receipt_tracker, pubkey_directory
+from .dbretry import safe_query_get
+from .decorators import login_required
+from .models import User, MarketListing, TrackedTx
+
+
+reads_bp = Blueprint('reads', __name__)
+
+
+@reads_bp.route("/ipfs/<path:ipfs_hash>", methods=["GET"])
+def ipfs_proxy(ipfs_hash: str):
+    from .ipfs import stream_file_from_ipfs
+    stream, headers = stream_file_from_ipfs(ipfs_hash)
+
+    response = Response(
+        stream_with_context(stream),
+        headers={k: v for k, v in headers.items() if v is not None},
+        direct_passthrough=True,
+    )
+
+    return response
+
+
+@lru_cache(maxsize=None)
+def _load_contract_abi(abi_path: str) -> list:
+    """Read and parse an ABI file once per process."""
+    return json.loads(Path(abi_path).read_text())
+
+
+def _resolve_abi_path(cfg_path: str) -> Path:
+    # Support both absolute ABI paths (stored in config) and relative filenames.
+    if Path(cfg_path).is_absolute():
+        return Path(cfg_path)
+    return Path(__file__).parent / "abi" / cfg_path
+
+
+async def _get_my_nfts_async(app, owner_address: str, contract_address: str, contract_abi: list,
+                             page: int = 1, limit: int = 10, ids_only: bool = False):
+    """
+    Runs on the shared aio loop.  Everything that needs the Flask app context
+    (config, DB) is resolved by the caller; this coroutine only talks to the RPC.
+    """
+    try:
+        nft_land_contract = aio.get_async_contract(app.config['RPC_URL'], contract_address, contract_abi)
+        aw3 = nft_land_contract.w3
+
+        # The code check and the token-ID lookup are independent, so issue them together
+        code, tokenIDs = await asyncio.gather(
+            aw3.eth.get_code(contract_address),
+            nft_land_contract.functions.fetchNFTsForOwner(owner_address).call(),
+            return_exceptions=True,
+        )
+
+        # Verify that there's contract code at the address on this RPC/node
+        if isinstance(code, Exception):
+            app.logger.error(f"Error while checking contract code at {contract_address}: {code}")
+            return {"error": f"Error checking contract deployment: {code}"}, 502
+        if not code or code == b"\x00" or code.hex() in ('', '0x'):
+            app.logger.error(f"No contract code at address {contract_address} on configured RPC")
+            return {"error": "No contract deployed at configured address on RPC"}, 502
+
+        if isinstance(tokenIDs, Exception):
+            app.logger.error(f"Error calling fetchNFTsForOwner: {tokenIDs}")
+            return {"error": "Could not fetch token IDs from contract: %s" % str(tokenIDs)}, 502
+
+        if tokenIDs is None:
+            tokenIDs = []
+        elif isinstance(tokenIDs, (int,)):
+            tokenIDs = [tokenIDs]
+        tokenIDs = list(tokenIDs)
+
+        # Reverse to show latest first
+        tokenIDs.reverse()
+
+        total_tokens = len(tokenIDs)
+
+        if ids_only:
+            return {
+                "ids": tokenIDs,
+                "total": total_tokens
+            }, 200
+
+        # Pagination logic
+        start_idx = (page - 1) * limit
+        end_idx = start_idx + limit
+
+        sliced_token_ids = tokenIDs[start_idx:end_idx]
+
+        async def _token_data(tid):
+            try:
+                tokenURI = await nft_land_contract.functions.tokenData(tid).call()
+                return {"tokenID": int(tid), "tokenURI": tokenURI}
+            except Exception as e:
+                app.logger.error(f"Error fetching tokenData for {tid}: {e}")
+                return {"tokenID": int(tid), "error": str(e)}
+
+        # One concurrent eth_call per token on the page
+        nfts = await asyncio.gather(*(_token_data(tid) for tid in sliced_token_ids))
+
+        return {
+            "nfts": list(nfts),
+            "total": total_tokens,
+            "page": page,
+            "limit": limit,
+            "has_more": end_idx < total_tokens
+        }, 200
+
+    except Exception as e:
+        app.logger.error(f"Error fetching NFTs: {e}")
+        return {"error": f"Error fetching NFTs: {e}"}, 500
+
+
+def prepare_my_nfts(user_id):
+    """
+    Resolve everything /user/docs needs from config and the DB (app context
+    required).  Returns ((owner, contract_address, abi), None) or
+    (None, (error_body, status)).  Shared by the WSGI view and app/asgi.py.
+    """
+    cfg_path = current_app.config.get('NFT_LAND_CONTRACT_ABI_PATH')
+    if not cfg_path:
+        return None, ({"error": "NFT contract ABI path not configured"}, 500)
+
+    abi_path = _resolve_abi_path(cfg_path)
+    try:
+        contract_abi = _load_contract_abi(str(abi_path))
+    except Exception as e:
+        current_app.logger.error(f"Failed to read/parse ABI JSON at {abi_path}: {e}")
+        return None, ({"error": "Invalid or unreadable contract ABI on backend"}, 500)
+
+    contract_address = current_app.config.get('NFT_DOC_CONTRACT_ADDRESS')
+    if not contract_address:
+        return None, ({"error": "NFT contract address not configured"}, 503)
+
+    user = safe_query_get(User, user_id)
+    if not user or not user.wallet_address:
+        return None, ({"error": "User wallet address not found"}, 400)
+
+    try:
+        owner_address = Web3.to_checksum_address(user.wallet_address)
+    except Exception:
+        owner_address = user.wallet_address
+
+    return (owner_address, Web3.to_checksum_address(contract_address), contract_abi), None
+
+
+@reads_bp.route('/user/docs', methods=['GET'])
+@login_required
+def get_my_nfts():
+    user_id = session.get('user_id')
+    page = request.args.get('page', 1, type=int)
+    limit = request.args.get('limit', 10, type=int)
+    ids_only = request.args.get('ids_only', 'false').lower() == 'true'
+
+    try:
+        resolved, error = prepare_my_nfts(user_id)
+        if error:
+            return jsonify(error[0]), error[1]
+
+        body, status = aio.run(_get_my_nfts_async(
+            current_app._get_current_object(), *resolved, page, limit, ids_only,
+        ))
+    except Exception as e:
+        current_app.logger.error(f"Error fetching NFTs: {e}")
+        body, status = {"error": f"Error fetching NFTs: {e}"}, 500
+    return jsonify(body), status
+
+
+# --- NFT Interaction Routes ---
+@reads_bp.route('/doc/<int:token_id>', methods=['GET'])
+def get_single_nft(token_id):
+    result, status_code = aio.run(services.get_nft_details_async(current_app._get_current_object(), token_id))
+    return jsonify(result), status_code
+
+
+@reads_bp.route('/doc/stream_batch', methods=['POST'])
+def stream_docs_batch():
+    data = request.get_json()
+    token_ids = data.get('token_ids', [])
+    
+    if not token_ids or not isinstance(token_ids, list):
+         return jsonify({"error": "Invalid token_ids provided"}), 400
+
+    app = current_app._get_current_object()
+
+    def generate():
+        for token_id in token_ids:
+            try:
+                # get_nft_details_async returns (dict, status_code); token_id must be an int for the call
+                details, status = aio.run(services.get_nft_details_async(app, int(token_id)))
+                if status == 200:
+                    yield json.dumps(details) + "\n"
+                else:
+                    yield json.dumps({"token_id": token_id, "error": "Failed to fetch", "details": details}) + "\n"
+            except Exception as e:
+                yield json.dumps({"token_id": token_id, "error": str(e)}) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+
+# --- Marketplace Routes ---
+LISTING_SORTS = {
+    'price_asc': (MarketListing.price.asc(), MarketListing.listing_id.asc()),
+    'price_desc': (MarketListing.price.desc(), MarketListing.listing_id.desc()),
+    'newest': (MarketListing.listed_block.desc(), MarketListing.listing_id.desc()),
+    'oldest': (MarketListing.listed_block.asc(), MarketListing.listing_id.asc()),
+}
+
+
+@reads_bp.route('/market/listings', methods=['GET'])
+def get_listings():
+    # Served from the indexer's MarketListing table (NFTListed/NFTSold/NFTUnlisted)
+    page = request.args.get('page', 1, type=int)
+    per_page = min(request.args.get('per_page', 20, type=int), 100)
+    sort = request.args.get('sort', 'newest')
+    if sort not in LISTING_SORTS:
+        return jsonify({"error": f"Invalid sort. Use one of: {', '.join(LISTING_SORTS)}"}), 400
+
+    query = MarketListing.query.filter_by(status=request.args.get('status', 'active'))
+    seller = request.args.get('seller')
+    if seller:
+        if not Web3.is_address(seller):
+            return jsonify({"error": "Invalid seller address"}), 400
+        query = query.filter_by(seller=Web3.to_checksum_address(seller))
+    nft_contract = request.args.get('nft_contract')
+    if nft_contract:
+        if not Web3.is_address(nft_contract):
+            return jsonify({"error": "Invalid nft_contract address"}), 400
+        query = query.filter_by(nft_contract=Web3.to_checksum_address(nft_contract))
+
+    paginated = query.order_by(*LISTING_SORTS[sort]).paginate(page=page, per_page=per_page, error_out=False)
+    return jsonify({
+        "data": [listing.to_dict() for listing in paginated.items],
+        "total": paginated.total,
+        "pages": paginated.pages,
+        "current_page": paginated.page,
+    })
+
+
+@reads_bp.route('/fees/estimate', methods=['GET'])
+def get_fee_estimate():
+    # Cached per-block fee data (app/fee_oracle.py); no RPC call unless the snapshot is stale
+    try:
+        result, status_code = services.estimate_gas_fee(request.args.get('type', 'mint'))
+    except Exception as e:
+        current_app.logger.error(f"Fee estimate failed: {e}")
+        return jsonify({"error": "Fee data unavailable"}), 503
+    return jsonify(result), status_code
+
+
+@reads_bp.route('/tx/<tx_hash>', methods=['GET'])
+def get_tx_status(tx_hash):
+    # Written by the receipt tracker (app/receipt_tracker.py) of whichever worker sent the tx
+    if not re.fullmatch(r'0x[0-9a-fA-F]{64}', tx_hash):
+        return jsonify({"error": "Invalid transaction hash"}), 400
+    tx_hash = tx_hash.lower()
+    tracked = TrackedTx.query.filter_by(tx_hash=tx_hash).first()
+    if tracked is not None:
+        return jsonify(tracked.to_dict())
+    tracker = receipt_tracker.current_tracker()
+    if tracker is not None and tracker.is_pending(tx_hash):
+        return jsonify({"tx_hash": tx_hash, "status": "pending"})  # not flushed to the table yet
+    return jsonify({"error": "Unknown transaction"}), 404
+
+
+PUBKEY_BATCH_MAX = 1000
+
+
+@reads_bp.route('/pubkeys', methods=['POST'])
+def get_public_keys():
+    # Batch lookup in the key directory (app/pubkey_directory.py): one local query, no RPC.
+    # Body: {"addresses": ["0x..", ...]}.  "missing" addresses have no stored key yet;
+    # GET /pubkey?address= recovers and stores one.
+    data = request.get_json() or {}
+    addresses = data.get('addresses')
+    if not addresses or not isinstance(addresses, list):
+        return jsonify({"error": "addresses must be a non-empty list"}), 400
+    if len(addresses) > PUBKEY_BATCH_MAX:
+        return jsonify({"error": f"At most {PUBKEY_BATCH_MAX} addresses per request"}), 400
+    if not all(isinstance(address, str) and Web3.is_address(address) for address in addresses):
+        return jsonify({"error": "Invalid address in addresses"}), 400
+
+    keys = pubkey_directory.lookup(addresses)
+    missing = sorted({Web3.to_checksum_address(address) for address in addresses} - keys.keys())
+    return jsonify({"keys": keys, "missing": missing})
+
+
+@reads_bp.route('/doc/<token_id>/history', methods=['GET'])
+def get_nft_history(token_id):
+    try:
+        # getUpdateCount, then every tokenUpdates entry concurrently on the shared AsyncWeb3 loop
+        body, status = aio.run(services.get_nft_history_async(current_app._get_current_object(), int(token_id)))
+    except Exception as e:
+        current_app.logger.error(f"Error fetching NFT history: {str(e)}")
+        body, status = {"error": str(e)}, 500
+    return jsonify(body), status
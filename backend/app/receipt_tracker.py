@@ -0,0 +1,282 @@
+"""
+receipt_tracker.py — One background receipt poller for every outgoing tx.
+
+The faucet relay, action logger and deployer each called
+``wait_for_transaction_receipt`` (a request thread polling the RPC on its
+own for up to 120 s).  Instead, senders register hashes here and return:
+
+  tracker = get_tracker(app)
+  tracker.track(tx_hash, label="faucet-claim", callback=fn)   # fn(tx_hash, receipt)
+  tracker.wait(tx_hash, timeout)                               # only where a caller must block
+
+One thread per process checks ``eth_blockNumber`` every POLL_INTERVAL and,
+once per new block, asks for every pending receipt in JSON-RPC batch
+requests of BATCH_SIZE (one call each if the node rejects batches).
+Status is written to TrackedTx so ``GET /tx/<hash>`` answers from any
+worker.  Hashes pending longer than DROP_AFTER are marked dropped.
+"""
+
+import logging
+import os
+import threading
+import time
+from datetime import datetime, UTC
+
+import requests
+from web3 import Web3
+
+logger = logging.getLogger(__name__)
+
+POLL_INTERVAL = 1.0    # seconds between eth_blockNumber checks
+BATCH_SIZE = 100       # receipts per JSON-RPC batch request
+DROP_AFTER = 3600.0    # seconds pending before a hash is given up as dropped
+RPC_TIMEOUT = 15
+
+_INT_FIELDS = ('status', 'blockNumber', 'gasUsed', 'cumulativeGasUsed', 'effectiveGasPrice', 'transactionIndex')
+
+
+def normalize_hash(tx_hash) -> str:
+    value = tx_hash if isinstance(tx_hash, str) else Web3.to_hex(tx_hash)
+    value = value.lower()
+    return value if value.startswith('0x') else '0x' + value
+
+
+def _format_receipt(raw: dict) -> dict:
+    """Raw JSON-RPC receipt with the fields callers read converted from hex."""
+    receipt = dict(raw)
+    for key in _INT_FIELDS:
+        if isinstance(receipt.get(key), str):
+            receipt[key] = int(receipt[key], 16)
+    if receipt.get('contractAddress'):
+        receipt['contractAddress'] = Web3.to_checksum_address(receipt['contractAddress'])
+    return receipt
+
+
+class _Pending:
+    __slots__ = ('tx_hash', 'label', 'callbacks', 'since', 'receipt', 'done')
+
+    def __init__(self, tx_hash, label):
+        self.tx_hash = tx_hash
+        self.label = label
+        self.callbacks = []
+        self.since = time.monotonic()
+        self.receipt = None
+        self.done = threading.Event()
+
+
+class ReceiptTracker:
+
+    def __init__(self, rpc_url: str, session_factory):
+        self.rpc_url = rpc_url
+        self.session_factory = session_factory
+        self.pid = os.getpid()
+        self._http = requests.Session()
+        self._batch_supported = True
+        self._lock = threading.Lock()
+        self._pending = {}       # tx hash -> _Pending
+        self._inserts = []       # TrackedTx rows not yet written
+        self._updates = {}       # tx hash -> column values not yet written
+        self._last_block = None
+        self._stop = threading.Event()
+        self.thread = threading.Thread(target=self._loop, name="receipt-tracker", daemon=True)
+        self.thread.start()
+
+    # --- public ---
+
+    def track(self, tx_hash, label=None, callback=None) -> _Pending:
+        tx_hash = normalize_hash(tx_hash)
+        with self._lock:
+            entry = self._pending.get(tx_hash)
+            if entry is None:
+                entry = self._pending[tx_hash] = _Pending(tx_hash, label)
+                self._inserts.append({"tx_hash": tx_hash, "label": (label or "")[:128] or None,
+                                      "status": "pending", "created_at": datetime.now(UTC),
+                                      "updated_at": datetime.now(UTC)})
+            if callback is not None:
+                entry.callbacks.append(callback)
+        return entry
+
+    def untrack(self, tx_hash, status="replaced"):
+        """Stop polling ``tx_hash`` (e.g. a replaced tx whose nonce was mined by another version)."""
+        tx_hash = normalize_hash(tx_hash)
+        with self._lock:
+            entry = self._pending.pop(tx_hash, None)
+            if entry is not None:
+                self._updates[tx_hash] = {"status": status}
+        if entry is not None:
+            entry.done.set()
+
+    def wait(self, tx_hash, timeout=None, label=None):
+        """Block until ``tx_hash`` is mined (via the shared poller).  Returns the receipt or None."""
+        entry = self.track(tx_hash, label)
+        entry.done.wait(timeout)
+        return entry.receipt
+
+    def is_pending(self, tx_hash) -> bool:
+        return normalize_hash(tx_hash) in self._pending
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    def stop(self):
+        self._stop.set()
+
+    # --- RPC ---
+
+    def _call(self, method, params):
+        response = self._http.post(self.rpc_url, json={"jsonrpc": "2.0", "id": 1, "method": method,
+                                                       "params": params}, timeout=RPC_TIMEOUT)
+        response.raise_for_status()
+        body = response.json()
+        if body.get("error"):
+            raise RuntimeError(f"{method}: {body['error']}")
+        return body.get("result")
+
+    def _batch(self, method, param_list) -> list:
+        """``method`` for every params entry in one HTTP request; results in input order (None on error)."""
+        if self._batch_supported:
+            payload = [{"jsonrpc": "2.0", "id": i, "method": method, "params": params}
+                       for i, params in enumerate(param_list)]
+            response = self._http.post(self.rpc_url, json=payload, timeout=RPC_TIMEOUT)
+            response.raise_for_status()
+            body = response.json()
+            if isinstance(body, list):
+                by_id = {item.get("id"): item.get("result") for item in body}
+                return [by_id.get(i) for i in range(len(param_list))]
+            logger.warning(f"RPC rejected batch request ({body.get('error')}); polling receipts one by one")
+            self._batch_supported = False
+        results = []
+        for params in param_list:
+            try:
+                results.append(self._call(method, params))
+            except Exception:
+                results.append(None)
+        return results
+
+    # --- polling ---
+
+    def _resolve(self, entry: _Pending, receipt: dict):
+        status = "mined" if receipt.get("status") == 1 else "failed"
+        with self._lock:
+            self._pending.pop(entry.tx_hash, None)
+            self._updates[entry.tx_hash] = {"status": status, "block_number": receipt.get("blockNumber"),
+                                            "gas_used": receipt.get("gasUsed"),
+                                            "contract_address": receipt.get("contractAddress")}
+            callbacks = list(entry.callbacks)
+        entry.receipt = receipt
+        entry.done.set()
+        for callback in callbacks:
+            try:
+                callback(entry.tx_hash, receipt)
+            except Exception as e:
+                logger.error(f"Receipt callback for {entry.tx_hash} failed: {e}")
+
+    def _expire(self):
+        now = time.monotonic()
+        with self._lock:
+            stale = [h for h, entry in self._pending.items() if now - entry.since > DROP_AFTER]
+        for tx_hash in stale:
+            logger.warning(f"No receipt for {tx_hash} after {DROP_AFTER:.0f}s; marking dropped")
+            self.untrack(tx_hash, status="dropped")
+
+    def poll_once(self) -> int:
+        """Fetch receipts for every pending hash if a new block arrived.  Returns how many resolved."""
+        if not self._pending:
+            return 0
+        block = int(self._call("eth_blockNumber", []), 16)
+        if block == self._last_block:
+            return 0
+        with self._lock:
+            entries = list(self._pending.values())
+        resolved = 0
+        for i in range(0, len(entries), BATCH_SIZE):
+            chunk = entries[i:i + BATCH_SIZE]
+            for entry, raw in zip(chunk, self._batch("eth_getTransactionReceipt",
+                                                      [[entry.tx_hash] for entry in chunk])):
+                if raw:
+                    self._resolve(entry, _format_receipt(raw))
+                    resolved += 1
+        self._last_block = block
+        self._expire()
+        return resolved
+
+    def flush(self):
+        """Write queued TrackedTx inserts/updates in one transaction."""
+        from sqlalchemy import bindparam, update
+
+        from .indexer_store import insert_ignore
+        from .models import TrackedTx
+
+        with self._lock:
+            inserts, self._inserts = self._inserts, []
+            updates, self._updates = self._updates, {}
+        if not inserts and not updates:
+            return
+        session = self.session_factory()
+        try:
+            insert_ignore(session, TrackedTx, inserts, ["tx_hash"])
+            if updates:
+                table = TrackedTx.__table__
+                now = datetime.now(UTC)
+                # executemany per column set; bind names must not collide with the SET columns
+                for columns in {tuple(sorted(values)) for values in updates.values()}:
+                    rows = [{"b_tx_hash": h, "b_updated_at": now, **{f"b_{k}": v for k, v in values.items()}}
+                            for h, values in updates.items() if tuple(sorted(values)) == columns]
+                    stmt = update(table).where(table.c.tx_hash == bindparam("b_tx_hash")).values(
+                        {name: bindparam(f"b_{name}") for name in columns + ("updated_at",)})
+                    session.execute(stmt, rows)
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.warning(f"Could not persist tx statuses ({e}); retrying next poll")
+            with self._lock:
+                self._inserts[:0] = inserts
+                for tx_hash, values in updates.items():
+                    self._updates.setdefault(tx_hash, values)
+        finally:
+            session.close()
+
+    def _loop(self):
+        while not self._stop.wait(POLL_INTERVAL):
+            try:
+                self.poll_once()
+            except Exception as e:
+                logger.warning(f"Receipt poll failed: {e}")
+            self.flush()
+
+
+# --- per-process registry ---
+
+_tracker = None
+_tracker_lock = threading.Lock()
+
+
+def _reset_after_fork():
+    """The poller thread and pending set belong to the parent process."""
+    global _tracker, _tracker_lock
+    _tracker = None
+    _tracker_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def get_tracker(app) -> ReceiptTracker:
+    """This process's tracker for the app's RPC_URL."""
+    global _tracker
+    with _tracker_lock:
+        if _tracker is None:
+            from sqlalchemy.orm import sessionmaker
+
+            from . import db
+            with app.app_context():
+                engine = db.engine
+            _tracker = ReceiptTracker(app.config['RPC_URL'], sessionmaker(bind=engine, autoflush=False))
+        return _tracker
+
+
+def current_tracker():
+    """The tracker if this process has started one (for lookups that should not start it)."""
+    return _tracker
@@ -1,25 +1,17 @@
 # app/routes.py
-import requests
-import rlp
 import secrets
-from eth_account._utils.legacy_transactions import serializable_unsigned_transaction_from_dict
-from eth_keys.datatypes import Signature
-from flask import Blueprint, request, jsonify, current_app, session, render_template, Response, stream_with_context
+from flask import Blueprint, request, jsonify, current_app, session
 from web3 import Web3  # IMPORT Web3
-from eth_keys import keys
-from itsdangerous import URLSafeTimedSerializer  # IMPORT URLSafeTimedSerializer
 
 # Import from your app modules using relative imports
-from . import auth, services, models, db, ipfs # Assuming db is also in app/__init__
+from . import auth, services, db, ipfs, pubkey_directory # Assuming db is also in app/__init__
 from .dbretry import safe_query_get
-from .models import User, ActionLog, AdminLoginToken, AllowedEmail, Waitlist, ReferralCode, UserReferral  # Explicitly import models used
-from functools import wraps
-from datetime import datetime, UTC, timedelta
-import asyncio
+from .decorators import login_required
+from .models import User, Waitlist, ReferralCode, UserReferral  # Explicitly import models used
+from datetime import datetime, UTC
 import json
 from werkzeug.datastructures import FileStorage  # For type hinting
 import io  # For creating in-memory file for HTML content
-from pathlib import Path
 
 
 # Placeholder for your actual ipfs.py functions
@@ -37,30 +29,6 @@ def upload_json_to_ipfs(data: dict) -> str:
 bp = Blueprint('main', __name__)
 
 
-def login_required(f):
-    @wraps(f)
-    def decorated_function(*args, **kwargs):
-        if 'user_id' not in session:
-            return jsonify({"error": "Authentication required"}), 401
-        return f(*args, **kwargs)
-
-    return decorated_function
-
-
-def admin_required(f):
-    @wraps(f)
-    def decorated_function(*args, **kwargs):
-        if 'user_id' not in session or not session.get('is_admin'):
-            return jsonify({"error": "Admin privileges required"}), 403
-        # Optionally, re-verify against DB for extra security
-        user = safe_query_get(User, session['user_id'])
-        if not user or not user.is_admin:
-            return jsonify({"error": "Admin privileges required"}), 403
-        return f(*args, **kwargs)
-
-    return decorated_function
-
-
 # --- Auth Routes ---
 @bp.route('/auth/register/email', methods=['POST'])
 def register_email():
@@ -179,63 +147,22 @@ def user_details():
 
 @bp.route("/pubkey", methods=["GET"])
 def get_public_key():
+    # Served from the key directory (app/pubkey_directory.py); only the first
+    # lookup for an address goes to Etherscan + the RPC for ECDSA recovery.
     address = request.args.get("address", "").lower()
     if not Web3.is_address(address):
         return jsonify({"error": "Invalid address"}), 400
 
     try:
-        # 1️⃣ Fetch recent normal transactions (outgoing) using v2 API
-        url = (
-            f"https://api.etherscan.io/v2/api"
-            f"?module=account&action=txlist"
-            f"&address={address}"
-            f"&sort=desc&apikey=PGBQAJGXWVIKREF5UER6I8227MEGPU8Q66"
-            f"&chainid=11155420"
-        )
-        resp = requests.get(url).json()
-        print(resp)
-        if resp.get("status") != "1" or not resp.get("result"):
-            return jsonify({"error": "No transactions found for this address"}), 404
-
-        # 2️⃣ Find first outgoing transaction (from == address)
-        tx = None
-        for t in resp["result"]:
-            if t["from"].lower() == address:
-                tx = t
-                break
-
-        if not tx:
-            return jsonify({"error": "No outgoing transactions found"}), 404
-
-        # 3️⃣ Fetch the raw transaction to recover sender’s public key
-        tx_hash = tx["hash"]
-        tx_data = current_app.w3.eth.get_transaction(tx_hash)
-
-        # Ensure v, r, s are integers, not HexBytes
-        v = current_app.w3.to_int(tx_data.v)
-        r = current_app.w3.to_int(tx_data.r)
-        s = current_app.w3.to_int(tx_data.s)
-
-        # 3️⃣ Build the unsigned transaction
-        unsigned_tx = {
-            "nonce": tx_data.nonce,
-            "gasPrice": tx_data.gasPrice,
-            "gas": tx_data.gas,
-            "to": tx_data.to,
-            "value": tx_data.value,
-            "data": tx_data.input,
-            "chainId": tx_data.chainId,
-        }
-
-        # 4️⃣ Serialize and hash
-        stx = serializable_unsigned_transaction_from_dict(unsigned_tx)
-        encoded = rlp.encode(stx)
-        tx_hash_unsigned = Web3.keccak(encoded)
-
-        # 5️⃣ Recover the public key
-        signature = Signature(vrs=(v, r, s))
-        pubkey_bytes = signature.recover_public_key_from_msg_hash(tx_hash_unsigned)
-        pubkey_hex = pubkey_bytes.to_hex()
+        pubkey_hex = pubkey_directory.lookup([address]).get(Web3.to_checksum_address(address), {}).get("pubkey")
+        if pubkey_hex is None:
+            try:
+                pubkey_hex, tx_hash = pubkey_directory.recover_public_key(
+                    current_app.w3, address, current_app.config.get('ETHERSCAN_API_KEY'),
+                    current_app.config.get('ETHERSCAN_CHAIN_ID'))
+            except LookupError as e:
+                return jsonify({"error": str(e)}), 404
+            pubkey_directory.store_recovered(db.session, address, pubkey_hex, tx_hash)
 
         if request.headers.get("Accept") == "text/plain":
             return pubkey_hex, 200, {"Content-Type": "text/plain"}
@@ -243,10 +170,10 @@ def get_public_key():
         return jsonify({"pubkey": pubkey_hex})
 
     except Exception as e:
+        db.session.rollback()
         return jsonify({"error": str(e)}), 500
 
 
-
 # --- User/Wallet Virtualization (Conceptual - relies on Web3Auth/Magic on client) ---
 @bp.route('/user/profile', methods=['GET'])
 @login_required
@@ -285,170 +212,8 @@ def upload_ipfs(content):
 
     return 404
 
-@bp.route("/ipfs/<path:ipfs_hash>", methods=["GET"])
-def ipfs_proxy(ipfs_hash: str):
-    from .ipfs import stream_file_from_ipfs
-    stream, headers = stream_file_from_ipfs(ipfs_hash)
-
-    response = Response(
-        stream_with_context(stream),
-        headers={k: v for k, v in headers.items() if v is not None},
-        direct_passthrough=True,
-    )
-
-    return response
-
-
-async def _get_my_nfts_async(user_id: int, page: int = 1, limit: int = 10, ids_only: bool = False):
-    try:
-        # Read and parse the contract ABI in a background thread.
-        # Support both absolute ABI paths (stored in config) and relative filenames.
-        cfg_path = current_app.config.get('NFT_LAND_CONTRACT_ABI_PATH')
-        if not cfg_path:
-            return {"error": "NFT contract ABI path not configured"}, 500
-
-        if Path(cfg_path).is_absolute():
-            abi_path = Path(cfg_path)
-        else:
-            abi_path = Path(__file__).parent / "abi" / cfg_path
-
-        try:
-            abi_text = await asyncio.to_thread(lambda: abi_path.read_text())
-            contract_abi = json.loads(abi_text)
-        except Exception as e:
-            current_app.logger.error(f"Failed to read/parse ABI JSON at {abi_path}: {e}")
-            return {"error": "Invalid or unreadable contract ABI on backend"}, 500
-
-        # Ensure RPC is reachable and contract address is configured
-        if not current_app.w3.is_connected():
-            current_app.logger.error("Web3 RPC provider not reachable")
-            return {"error": "RPC provider not reachable"}, 503
-
-        contract_address = current_app.config.get('NFT_DOC_CONTRACT_ADDRESS')
-        if not contract_address:
-            return {"error": "NFT contract address not configured"}, 503
-
-        nft_land_contract = current_app.w3.eth.contract(address=Web3.to_checksum_address(contract_address), abi=contract_abi)
-
-        # Verify that there's contract code at the address on this RPC/node
-        try:
-            code = await asyncio.to_thread(lambda: current_app.w3.eth.get_code(Web3.to_checksum_address(contract_address)))
-            if not code or code == b"\x00" or code.hex() == '0x':
-                current_app.logger.error(f"No contract code at address {contract_address} on configured RPC")
-                return {"error": "No contract deployed at configured address on RPC"}, 502
-        except Exception as e:
-            current_app.logger.error(f"Error while checking contract code at {contract_address}: {e}")
-            # Continue, but warn the caller
-            return {"error": f"Error checking contract deployment: {e}"}, 502
-
-        user = await asyncio.to_thread(safe_query_get, User, user_id)
-        if not user or not user.wallet_address:
-            return {"error": "User wallet address not found"}, 400
-
-        try:
-            owner_address = Web3.to_checksum_address(user.wallet_address)
-        except Exception:
-            owner_address = user.wallet_address
-
-        # Fetch token IDs using a thread to avoid blocking (ensure .call() is invoked)
-        try:
-            tokenIDs = await asyncio.to_thread(lambda: nft_land_contract.functions.fetchNFTsForOwner(owner_address).call())
-        except Exception as e:
-            current_app.logger.error(f"Error calling fetchNFTsForOwner: {e}")
-            return {"error": "Could not fetch token IDs from contract: %s" % str(e)}, 502
-
-        if tokenIDs is None:
-            tokenIDs = []
-        elif isinstance(tokenIDs, (int,)):
-            tokenIDs = [tokenIDs]
-
-        # Reverse to show latest first
-        tokenIDs.reverse()
-        
-        total_tokens = len(tokenIDs)
-
-        if ids_only:
-             return {
-                "ids": tokenIDs,
-                "total": total_tokens
-            }, 200
-
-        # Pagination logic
-        start_idx = (page - 1) * limit
-        end_idx = start_idx + limit
-        
-        sliced_token_ids = tokenIDs[start_idx:end_idx]
-
-        # Fetch token data in a background thread (synchronously inside thread)
-        def _gather_token_data_sync(token_ids):
-            results = []
-            for tid in token_ids:
-                try:
-                    tokenURI = nft_land_contract.functions.tokenData(tid).call()
-                    results.append({"tokenID": int(tid), "tokenURI": tokenURI})
-                except Exception as e:
-                    current_app.logger.error(f"Error fetching tokenData for {tid}: {e}")
-                    results.append({"tokenID": int(tid), "error": str(e)})
-            return results
-
-        nfts = await asyncio.to_thread(_gather_token_data_sync, sliced_token_ids)
-
-        return {
-            "nfts": nfts,
-            "total": total_tokens,
-            "page": page,
-            "limit": limit,
-            "has_more": end_idx < total_tokens
-        }, 200
-
-    except Exception as e:
-        current_app.logger.error(f"Error fetching NFTs: {e}")
-        return {"error": f"Error fetching NFTs: {e}"}, 500
-
-
-@bp.route('/user/docs', methods=['GET'])
-@login_required
-def get_my_nfts():
-    user_id = session.get('user_id')
-    page = request.args.get('page', 1, type=int)
-    limit = request.args.get('limit', 10, type=int)
-    ids_only = request.args.get('ids_only', 'false').lower() == 'true'
-    body, status = asyncio.run(_get_my_nfts_async(user_id, page, limit, ids_only))
-    return jsonify(body), status
-
 
 # --- NFT Interaction Routes ---
-@bp.route('/doc/<int:token_id>', methods=['GET'])
-def get_single_nft(token_id):
-    result, status_code = services.get_nft_details(token_id)
-    return jsonify(result), status_code
-
-
-@bp.route('/doc/stream_batch', methods=['POST'])
-def stream_docs_batch():
-    data = request.get_json()
-    token_ids = data.get('token_ids', [])
-    
-    if not token_ids or not isinstance(token_ids, list):
-         return jsonify({"error": "Invalid token_ids provided"}), 400
-
-    def generate():
-        for token_id in token_ids:
-            try:
-                # Reuse existing service method
-                # Note: get_nft_details returns (dict, status_code)
-                # Ensure token_id is int for Web3 call
-                details, status = services.get_nft_details(int(token_id))
-                if status == 200:
-                    yield json.dumps(details) + "\n"
-                else:
-                    yield json.dumps({"token_id": token_id, "error": "Failed to fetch", "details": details}) + "\n"
-            except Exception as e:
-                yield json.dumps({"token_id": token_id, "error": str(e)}) + "\n"
-
-    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
-
-
 @bp.route('/nft/prepare_mint_tx', methods=['POST'])
 @login_required
 def prepare_mint_tx():
@@ -460,7 +225,7 @@ def prepare_mint_tx():
         return jsonify({"error": "Missing metadataURI or recipient address"}), 400
 
     if not current_app.config.get(
-            'NFT_DOC_CONTRACT_ADDRESS') or not services.nft_land_contract:  # Check if contract is loaded
+            'NFT_DOC_CONTRACT_ADDRESS') or not current_app.nft_land_contract:  # Check if contract is loaded
         return jsonify({"error": "NFTDoc contract not configured on backend"}), 503
 
     # Backend prepares transaction data for the client to sign and send This example assumes the `mintNFT` function
@@ -486,20 +251,6 @@ def prepare_mint_tx():
     }), 200
 
 
-# --- Marketplace Routes ---
-@bp.route('/market/listings', methods=['GET'])
-def get_listings():
-    # This should ideally pull from an indexed database.
-    # services.get_active_listings_from_contract is a placeholder for on-chain (inefficient).
-    # For a real app, you'd query your indexed 'ActionLog' or a dedicated 'Listings' table.
-
-    # Replace with actual DB query once indexer is running
-    # For now, conceptual:
-    # active_listings = YourIndexedMarketplaceListing.query.filter_by(active=True).limit(limit).offset(offset).all()
-    # return jsonify([listing.to_dict() for listing in active_listings])
-    return jsonify({"message": "Endpoint for indexed listings. Implement DB query.", "data": []})
-
-
 @bp.route('/market/prepare_list_tx', methods=['POST'])
 @login_required
 def prepare_list_tx():
@@ -523,139 +274,6 @@ def prepare_list_tx():
     }), 200
 
 
-# --- ADMIN ROUTES ---
-@bp.route('/admin/generate_login_url', methods=['GET'])  # Should be protected
-# @admin_required # Or some other form of initial admin auth to get this link
-def generate_admin_url_endpoint():
-    # Add strong authentication here if this endpoint is exposed.
-    # E.g. require "master" admin password or API key.
-    # For now, assuming it's called from a secure context or for setup.
-    return auth.get_admin_login_link()
-
-
-@bp.route('/admin/login_page/<login_token>', methods=['GET'])  # The dynamic link
-def admin_login_page(login_token):
-    # This page would be a simple HTML form that then POSTs to /admin/login
-    # It should pre-fill the token. The user enters dynamic username, email, pass, OTP.
-    # For a true SPA, this might just validate the token and then show the login form components.
-    # For simplicity with Flask, can render a template.
-    s = URLSafeTimedSerializer(current_app.config['SECRET_KEY'], salt='admin-login-link')
-    try:
-        token_data = s.loads(login_token, max_age=current_app.config['ADMIN_LOGIN_TOKEN_MAX_AGE'])
-        db_token = AdminLoginToken.query.filter_by(token=login_token, used=False).first()
-        if not db_token or db_token.expires_at < datetime.now(UTC) or \
-                token_data.get("purpose") != "admin_login":
-            return "Invalid or expired admin login link.", 400
-
-        # The page can display the expected username challenge if you want, or have user generate it
-        # username_challenge = token_data.get("username_challenge")
-        return render_template('admin_login_form.html', login_token=login_token)  # Create this HTML template
-    except Exception as e:
-        return f"{e}", 400
-
-
-@bp.route('/admin/login', methods=['POST'])
-def admin_login_endpoint():
-    return auth.admin_login()
-
-
-@bp.route('/admin/logs', methods=['GET'])
-@admin_required
-def get_admin_logs():
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 20, type=int)
-    search_query = request.args.get('q', None)  # For searching
-
-    query = ActionLog.query.order_by(ActionLog.timestamp.desc())
-    if search_query:
-        # Basic search across a few fields
-        search_term = f"%{search_query}%"
-        query = query.filter(
-            models.db.or_(
-                ActionLog.user_address.ilike(search_term),
-                ActionLog.action.ilike(search_term),
-                ActionLog.details.ilike(search_term)
-            )
-        )
-
-    paginated_logs = query.paginate(page=page, per_page=per_page, error_out=False)
-    logs_data = [{
-        "id": log.id, "log_id_onchain": log.log_id_onchain, "user_address": log.user_address,
-        "action": log.action, "details": log.details,
-        "timestamp": log.timestamp.isoformat(), "tx_hash": log.tx_hash
-    } for log in paginated_logs.items]
-
-    return jsonify({
-        "logs": logs_data,
-        "total": paginated_logs.total,
-        "pages": paginated_logs.pages,
-        "current_page": paginated_logs.page
-    })
-
-
-@bp.route('/admin/users', methods=['GET'])
-@admin_required
-def get_admin_users():
-    # Similar pagination and search as logs for User model
-    # Exclude password_hash and otp_secret from response
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 20, type=int)
-    search_query = request.args.get('q', None)
-
-    query = User.query
-    if search_query:
-        search_term = f"%{search_query}%"
-        query = query.filter(
-            models.db.or_(
-                User.email.ilike(search_term),
-                User.wallet_address.ilike(search_term)
-            )
-        )
-
-    paginated_users = query.paginate(page=page, per_page=per_page, error_out=False)
-    users_data = [{
-        "id": user.id, "email": user.email, "wallet_address": user.wallet_address, "is_admin": user.is_admin
-    } for user in paginated_users.items]
-
-    return jsonify({
-        "users": users_data,
-        "total": paginated_users.total,
-        "pages": paginated_users.pages,
-        "current_page": paginated_users.page
-    })
-
-
-@bp.route('/admin/nfts_overview', methods=['GET'])
-@admin_required
-def get_admin_nfts_overview():
-    # This would ideally query an indexed database of all minted NFTs.
-    # If not, you'd have to iterate on-chain events (NFTMinted from NFTDoc)
-    # or rely on `totalSupply` and then query each token (very inefficient).
-    # Assume you have an `IndexedNFT` model populated by an indexer.
-    # For now, placeholder:
-    return jsonify({"message": "Admin NFTs overview. Implement with an indexed NFT database."})
-
-
-@bp.route('/admin/contract_info', methods=['GET'])
-@admin_required
-def get_admin_contract_info():
-    return jsonify({
-        "nft_land_contract": {
-            "address": current_app.config.get('NFT_DOC_CONTRACT_ADDRESS'),
-            "abi_path": Path(__file__).parent / "abi" / current_app.config.get('NFT_LAND_CONTRACT_ABI_PATH'),
-            # Could add more details like owner, specific state variables if needed
-        },
-        "action_logger_contract": {
-            "address": current_app.config.get('ACTION_LOGGER_CONTRACT_ADDRESS'),
-            "abi_path": Path(__file__).parent / "abi" / current_app.config.get('ACTION_LOGGER_CONTRACT_ABI_PATH'),
-        },
-        "nft_marketplace_contract": {
-            "address": current_app.config.get('NFT_MARKETPLACE_CONTRACT_ADDRESS'),
-            "abi_path": Path(__file__).parent / "abi" / current_app.config.get('NFT_MARKETPLACE_CONTRACT_ABI_PATH'),
-        }
-    })
-
-
 # You'll need to add this to your Blueprint, typically nft_bp or similar
 # For example, if your blueprint is named `bp`:
 # @bp.route('/doc/prepare_metadata_for_minting', methods=['POST'])
@@ -810,43 +428,6 @@ def get_admin_contract_info():
 #         return jsonify({"error": str(e)}), 500
 
 
-@bp.route('/doc/<token_id>/history', methods=['GET'])
-def get_nft_history(token_id):
-    try:
-        # Read the contract ABI in a background thread
-        contract_abi = open(Path(__file__).parent / "abi" / current_app.config.get('NFT_LAND_CONTRACT_ABI_PATH'),
-                            'r').read()
-
-        # Set the contract address (replace with your contract's deployed address)
-        contract_address = current_app.config.get('NFT_DOC_CONTRACT_ADDRESS')
-        nft_land_contract = current_app.w3.eth.contract(address=Web3.to_checksum_address(contract_address), abi=contract_abi)
-        token_id = int(token_id)
-
-        # Get total number of updates
-        update_count = nft_land_contract.functions.getUpdateCount(token_id).call()
-
-        # Fetch all versions in reverse chronological order
-        history = []
-        for i in range(update_count - 1, -1, -1):  # Loop from newest to oldest
-            ipfs_uri = nft_land_contract.functions.tokenUpdates(token_id, i).call()
-            history.append({
-                "version": i + 1,  # Make it 1-based for display
-                "update_index": i,
-                "token_uri": ipfs_uri,
-                "timestamp": "N/A"  # Optional: Add if you have timestamp data
-            })
-
-        return jsonify({
-            "token_id": token_id,
-            "total_updates": update_count,
-            "history": history
-        })
-
-    except Exception as e:
-        current_app.logger.error(f"Error fetching NFT history: {str(e)}")
-        return jsonify({"error": str(e)}), 500
-
-
 # --- Access & Referral Routes ---
 @bp.route('/public/stats', methods=['GET'])
 def public_stats():
@@ -994,88 +575,6 @@ def validate_referral():
     return jsonify({"valid": True}), 200
 
 
-# --- Admin Management Routes ---
-
-@bp.route('/admin/waitlist', methods=['GET'])
-@admin_required
-def get_waitlist():
-    entries = Waitlist.query.filter_by(status='pending').order_by(Waitlist.created_at.desc()).all()
-    return jsonify([{
-        "id": e.id,
-        "email": e.email,
-        "contact_info": e.contact_info,
-        "platform": e.platform,
-        "created_at": e.created_at.isoformat()
-    } for e in entries]), 200
-
-@bp.route('/admin/approve-waitlist', methods=['POST'])
-@admin_required
-def approve_waitlist_entry():
-    data = request.get_json()
-    entry_id = data.get('id')
-    
-    entry = Waitlist.query.get(entry_id)
-    if not entry:
-        return jsonify({"error": "Entry not found"}), 404
-        
-    # Move to AllowedEmail
-    # We need an email for AllowedEmail. If they only provided telegram handle, we can't really "Allow" an email.
-    # Assumption: The admin will manually contact them or we only allow approving entries WITH emails.
-    
-    if not entry.email:
-        return jsonify({"error": "Cannot approve entry without email. Contact user manually first."}), 400
-        
-    if not AllowedEmail.query.filter_by(email=entry.email).first():
-        allowed = AllowedEmail(email=entry.email, added_by="admin_approved_waitlist")
-        db.session.add(allowed)
-    
-    entry.status = 'approved'
-    db.session.commit()
-    
-    return jsonify({"message": f"Approved {entry.email}"}), 200
-
-@bp.route('/admin/referrals', methods=['GET'])
-@admin_required
-def get_referral_codes():
-    codes = ReferralCode.query.order_by(ReferralCode.created_at.desc()).all()
-    return jsonify([{
-        "id": c.id,
-        "code": c.code,
-        "uses": f"{c.used_count}/{'∞' if c.max_uses == -1 else c.max_uses}",
-        "active": c.is_active,
-        "expires": c.expires_at.isoformat() if c.expires_at else "Never"
-    } for c in codes]), 200
-
-@bp.route('/admin/generate-referral', methods=['POST'])
-@admin_required
-def generate_referral():
-    data = request.get_json()
-    max_uses = data.get('max_uses', 1)
-    custom_code = data.get('code')
-    days_valid = data.get('days_valid', 7)
-    
-    code_str = custom_code if custom_code else secrets.token_urlsafe(8)
-    
-    if ReferralCode.query.filter_by(code=code_str).first():
-        return jsonify({"error": "Code already exists"}), 400
-        
-    expires = datetime.now(UTC) + timedelta(days=days_valid) if days_valid else None
-    
-    new_code = ReferralCode(
-        code=code_str,
-        max_uses=max_uses,
-        expires_at=expires,
-        created_by=session['user_id']
-    )
-    db.session.add(new_code)
-    db.session.commit()
-    
-    return jsonify({
-        "code": code_str, 
-        "message": "Referral code generated"
-    }), 201
-
-
 # --- User Referral Routes ---
 
 @bp.route('/user/referral', methods=['GET'])
@@ -1125,28 +624,3 @@ def track_referral_landing():
     
     return jsonify({"ok": True}), 200
 
-
-@bp.route('/admin/user-referrals', methods=['GET'])
-@admin_required
-def get_admin_user_referrals():
-    referrals = db.session.query(UserReferral, User).join(User, UserReferral.user_id == User.id).all()
-    
-    result = []
-    for ref, user in referrals:
-        try:
-            signup_emails = json.loads(ref.signup_list or '[]')
-        except (json.JSONDecodeError, TypeError):
-            signup_emails = []
-        
-        result.append({
-            "id": ref.id,
-            "user_email": user.email,
-            "user_wallet": user.wallet_address,
-            "referral_code": ref.referral_code,
-            "landing_count": ref.landing_count,
-            "waitlist_count": ref.waitlist_count,
-            "signup_list": signup_emails,
-            "created_at": ref.created_at.isoformat() if ref.created_at else None
-        })
-    
-    return jsonify(result), 200
@@ -0,0 +1,103 @@
+"""
+schema_upgrades.py — In-place upgrades for tables that predate a model change.
+
+There are no migrations in this repo: db.create_all() creates missing
+tables but never alters existing ones.  The few model changes that touch a
+table already in production are applied here instead, from the readiness
+"database" check right after create_all.  Every step inspects the live
+schema first, so running ``upgrade()`` again (or from several workers at
+once — a loser's DDL error is retried by the readiness loop) is a no-op.
+
+  action_log  gains log_index (NOT NULL DEFAULT 0); the unique key moves
+              from tx_hash to (tx_hash, log_index) so a tx emitting several
+              ActionLogged events is stored in full
+
+SQLite cannot drop an inline UNIQUE, so there action_log is rebuilt (rename,
+create, copy, drop) in one transaction.
+"""
+
+import logging
+
+from sqlalchemy import inspect, text
+
+from .models import ActionLog
+
+logger = logging.getLogger(__name__)
+
+_ACTION_LOG_KEY = ['tx_hash', 'log_index']
+
+
+def _unique_keys(insp, table: str) -> list:
+    """(kind, name, columns) for every unique constraint and unique index on ``table``."""
+    keys = [('constraint', uc['name'], uc['column_names']) for uc in insp.get_unique_constraints(table)]
+    # SQLite reports a column-level UNIQUE only as its sqlite_autoindex_* index
+    options = {'include_auto_indexes': True} if insp.dialect.name == 'sqlite' else {}
+    keys += [('index', ix['name'], ix['column_names']) for ix in insp.get_indexes(table, **options)
+             if ix.get('unique') and not ix.get('duplicates_constraint')]
+    return keys
+
+
+def _rebuild_action_log_sqlite(connection, insp, has_log_index: bool):
+    table = ActionLog.__table__
+    for index in insp.get_indexes(table.name):
+        connection.execute(text(f'DROP INDEX "{index["name"]}"'))
+    connection.execute(text(f'ALTER TABLE "{table.name}" RENAME TO "{table.name}_pre_upgrade"'))
+    table.create(connection)
+    columns = [column.name for column in table.columns]
+    source = [name if name != 'log_index' or has_log_index else '0' for name in columns]
+    connection.execute(text(f'INSERT INTO "{table.name}" ({", ".join(columns)}) '
+                            f'SELECT {", ".join(source)} FROM "{table.name}_pre_upgrade"'))
+    connection.execute(text(f'DROP TABLE "{table.name}_pre_upgrade"'))
+
+
+def upgrade_action_log(connection) -> list:
+    """Bring an existing action_log table up to the ActionLog model.  Returns the steps applied."""
+    table = ActionLog.__table__
+    insp = inspect(connection)
+    if table.name not in insp.get_table_names():
+        return []
+
+    applied = []
+    has_log_index = 'log_index' in {column['name'] for column in insp.get_columns(table.name)}
+    old_keys = [(kind, name) for kind, name, columns in _unique_keys(insp, table.name) if columns == ['tx_hash']]
+
+    if old_keys and connection.dialect.name == 'sqlite':
+        _rebuild_action_log_sqlite(connection, insp, has_log_index)
+        return ['rebuild action_log with log_index and unique (tx_hash, log_index)']
+
+    if not has_log_index:
+        connection.execute(text(f'ALTER TABLE {table.name} ADD COLUMN log_index INTEGER NOT NULL DEFAULT 0'))
+        applied.append('add action_log.log_index')
+
+    for kind, name in old_keys:
+        if connection.dialect.name == 'mysql':  # a MySQL unique constraint is an index
+            connection.execute(text(f'ALTER TABLE {table.name} DROP INDEX {name}'))
+        elif kind == 'constraint':
+            connection.execute(text(f'ALTER TABLE {table.name} DROP CONSTRAINT {name}'))
+        else:
+            connection.execute(text(f'DROP INDEX {name}'))
+        applied.append(f'drop unique {name} on action_log.tx_hash')
+
+    insp = inspect(connection)
+    if not any(columns == _ACTION_LOG_KEY for _, _, columns in _unique_keys(insp, table.name)):
+        # A unique index is a valid ON CONFLICT (tx_hash, log_index) target on every dialect
+        connection.execute(text(f'CREATE UNIQUE INDEX uq_action_log_tx_log ON {table.name} (tx_hash, log_index)'))
+        applied.append('add unique (tx_hash, log_index)')
+
+    existing = {index['name'] for index in insp.get_indexes(table.name)}
+    for index in table.indexes:
+        if index.name not in existing:
+            index.create(connection)
+            applied.append(f'add index {index.name}')
+    return applied
+
+
+def upgrade(engine) -> list:
+    """Run every upgrade step, each in its own transaction.  Returns the steps applied."""
+    applied = []
+    for step in (upgrade_action_log,):
+        with engine.begin() as connection:
+            applied += step(connection)
+    for description in applied:
+        logger.info(f"Schema upgrade: {description}")
+    return applied
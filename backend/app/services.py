@@ -1,55 +1,56 @@
-from pathlib import Path
+import asyncio
 from flask import current_app
 from web3 import Web3  # Make sure Web3 is imported for type hinting and utilities
 
-# Import the initialized instances from your app package (app/__init__.py)
-# This assumes your app/__init__.py defines w3, nft_land_contract, etc. globally within that file
-# and they are not None.
-from . import w3, nft_land_contract, action_logger_contract, nft_marketplace_contract
+from . import aio, fee_oracle
 
-def log_action_on_chain(user_address, action_description, details_json_str, acting_as_address=None):
+# Web3 and contract instances are read from current_app (attached by
+# init_chain_clients) rather than imported, so each worker process uses the
+# clients it built after fork.
+
+def log_action_on_chain(user_address, action_description, details_json_str, acting_as_address=None,
+                        wait_for_receipt=False, timeout=120):
+    """
+    Queue ActionLogger.logAction on the process's TxSender and return at
+    once with the tx hash (nonce, fees and receipts are handled in the
+    background).  With ACTION_LOG_BATCHING the action rides in a shared
+    logActions tx (see action_batcher).  Pass wait_for_receipt=True to block
+    for the receipt.
+    """
+    # Write path only; read-profile workers import this module but never load the sender
+    from . import action_batcher, tx_sender
+
+    action_logger_contract = current_app.action_logger_contract
     if not action_logger_contract:  # Check if contract instance is valid
         current_app.logger.error("ActionLogger contract not loaded or not available.")
         return {"error": "ActionLogger service not available"}, False
-    if not w3:  # Check if w3 is valid
-        current_app.logger.error("Web3 instance not available.")
-        return {"error": "Web3 service not available"}, False
 
     try:
-        backend_wallet_address_str = current_app.config.get('PLATFORM_OPERATIONAL_WALLET_ADDRESS')
-        backend_private_key = current_app.config.get('PLATFORM_OPERATIONAL_WALLET_PRIVATE_KEY')
-
-        if not backend_wallet_address_str or not backend_private_key:
+        if not current_app.config.get('PLATFORM_OPERATIONAL_WALLET_PRIVATE_KEY'):
             current_app.logger.error("Backend operational wallet or private key not configured for logging.")
             return {"error": "Cannot log action: backend signer not configured"}, False
 
-        backend_wallet_address = Web3.to_checksum_address(backend_wallet_address_str)
-
-        # Ensure w3.eth is available
-        if not hasattr(w3, 'eth'):
-            current_app.logger.error("w3.eth is not available. Web3 connection issue?")
-            return {"error": "Web3 eth attribute not available"}, False
-
-        tx_params = {
-            'from': backend_wallet_address,
-            'nonce': w3.eth.get_transaction_count(backend_wallet_address),
-            'gas': 200000,
-            'gasPrice': w3.eth.gas_price
-        }
-
-        # Assuming ActionLogger.sol has: function logAction(string memory action, string memory details) public
-        # The .functions accessor should exist if action_logger_contract is a valid Contract object
-        transaction_call = action_logger_contract.functions.logAction(
-            action_description, details_json_str
-        )
-        transaction = transaction_call.build_transaction(tx_params)  # build_transaction is a method
-
-        signed_tx = w3.eth.account.sign_transaction(transaction, private_key=backend_private_key)
-        tx_hash = w3.eth.send_raw_transaction(signed_tx.rawTransaction)
-        tx_receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
-
-        current_app.logger.info(f"Action logged on-chain: {action_description}, Tx: {tx_hash.hex()}")
-        return {"tx_hash": tx_hash.hex(), "status": tx_receipt.status}, True
+        if current_app.config.get('ACTION_LOG_BATCHING'):
+            # Shares one logActions tx with other actions queued in the same flush window
+            pending = action_batcher.get_batcher(current_app).add(action_description, details_json_str)
+            handle = pending.wait_handle(timeout=30)
+            if handle is None:
+                return {"error": pending.error or "Timed out batching action"}, False
+        else:
+            # Assuming ActionLogger.sol has: function logAction(string memory action, string memory details) public
+            data = action_logger_contract.encode_abi('logAction', args=[action_description, details_json_str])
+            handle = tx_sender.get_sender(current_app).submit(
+                {'to': action_logger_contract.address, 'data': data, 'gas': 200000}, label=f"logAction:{action_description}")
+
+        if not handle.wait_submitted(timeout=30):
+            return {"error": handle.error or "Timed out queueing transaction", "request_id": handle.id}, False
+        current_app.logger.info(f"Action logged on-chain: {action_description}, Tx: {handle.tx_hash}")
+
+        if wait_for_receipt:
+            receipt = handle.wait(timeout)
+            return {"tx_hash": handle.tx_hash, "status": receipt["status"] if receipt else None,
+                    "request_id": handle.id}, True
+        return {"tx_hash": handle.tx_hash, "status": "pending", "request_id": handle.id}, True
 
     except Exception as e:
         current_app.logger.error(f"Error logging action on-chain: {e}")
@@ -60,6 +61,7 @@ def log_action_on_chain(user_address, action_description, details_json_str, acti
 
 
 def get_nft_details(token_id):
+    w3, nft_land_contract = current_app.w3, current_app.nft_land_contract
     if not nft_land_contract:  # Check if contract instance is valid
         current_app.logger.error("NFTDoc contract not loaded or not available.")
         return {"error": "NFTDoc contract not loaded."}, 503
@@ -83,7 +85,63 @@ def get_nft_details(token_id):
         return {"error": f"Could not fetch details for token {token_id}. It may not exist or an error occurred."}, 404
 
 
+async def get_nft_details_async(app, token_id):
+    """
+    Async twin of get_nft_details for code running on an event loop (app.aio,
+    the ASGI server).  Takes the Flask app explicitly since there is no app
+    context on the loop; ownerOf and tokenData are fetched concurrently.
+    """
+    sync_contract = getattr(app, 'nft_land_contract', None)
+    if not sync_contract:
+        app.logger.error("NFTDoc contract not loaded or not available.")
+        return {"error": "NFTDoc contract not loaded."}, 503
+
+    contract = aio.get_async_contract(app.config['RPC_URL'], sync_contract.address, sync_contract.abi)
+    try:
+        owner, token_uri = await asyncio.gather(
+            contract.functions.ownerOf(token_id).call(),
+            contract.functions.tokenData(token_id).call(),
+        )
+        return {
+            "token_id": token_id,
+            "owner": owner,
+            "token_uri": token_uri,
+        }, 200
+    except Exception as e:
+        app.logger.error(f"Error fetching NFT details for token {token_id}: {e}")
+        return {"error": f"Could not fetch details for token {token_id}. It may not exist or an error occurred."}, 404
+
+
+async def get_nft_history_async(app, token_id):
+    """Every tokenUpdates URI of ``token_id``, newest first; the entries are fetched concurrently."""
+    sync_contract = getattr(app, 'nft_land_contract', None)
+    if not sync_contract:
+        app.logger.error("NFTDoc contract not loaded or not available.")
+        return {"error": "NFTDoc contract not loaded."}, 503
+
+    contract = aio.get_async_contract(app.config['RPC_URL'], sync_contract.address, sync_contract.abi)
+    try:
+        update_count = await contract.functions.getUpdateCount(token_id).call()
+        uris = await asyncio.gather(*(contract.functions.tokenUpdates(token_id, i).call()
+                                      for i in range(update_count - 1, -1, -1)))
+    except Exception as e:
+        app.logger.error(f"Error fetching NFT history: {e}")
+        return {"error": str(e)}, 500
+    return {
+        "token_id": token_id,
+        "total_updates": update_count,
+        "history": [{
+            "version": i + 1,  # 1-based for display
+            "update_index": i,
+            "token_uri": uri,
+            "timestamp": "N/A",
+        } for i, uri in zip(range(update_count - 1, -1, -1), uris)],
+    }, 200
+
+
 def get_active_listings_from_contract(limit=50, offset=0):
+    # Debug only: /market/listings reads the indexed MarketListing table instead.
+    w3, nft_marketplace_contract = current_app.w3, current_app.nft_marketplace_contract
     if not nft_marketplace_contract:  # Check if contract instance is valid
         current_app.logger.error("Marketplace contract not loaded or not available.")
         return {"error": "Marketplace contract not loaded"}, 503
@@ -145,14 +203,38 @@ def get_fiat_onramp_quote(amount_inr, crypto_currency="MATIC", user_wallet_addre
     }, 200
 
 
+# Typical gas units per platform transaction, for fee estimates shown before signing
+GAS_UNITS = {
+    "mint": 200000,
+    "buy": 300000,
+    "list": 150000,
+    "log_action": 60000,
+    "claim": 200000,
+}
+
+
+def estimate_gas_fee(transaction_type="mint"):
+    """Expected fee for a typical ``transaction_type`` tx at the fee oracle's cached next-block prices."""
+    gas_units = GAS_UNITS.get(transaction_type)
+    if gas_units is None:
+        return {"error": f"Unknown transaction type. Use one of: {', '.join(GAS_UNITS)}"}, 400
+    if not current_app.w3:
+        return {"error": "Web3 service not available"}, 503
+
+    oracle = fee_oracle.get_oracle(current_app.w3)
+    fee_wei = oracle.estimate_cost(gas_units)
+    fee_native = float(Web3.from_wei(fee_wei, 'ether'))
+    return {
+        "transaction_type": transaction_type,
+        "gas_units": gas_units,
+        "fees": oracle.snapshot().to_dict(),
+        "fee_wei": fee_wei,
+        "fee_native": fee_native,
+        # Rate is a configured constant until a price feed is wired in
+        "fee_inr": round(fee_native * current_app.config['NATIVE_TOKEN_INR_RATE'], 4),
+    }, 200
+
+
 def get_estimated_gas_fee_inr(transaction_type="mint"):
-    # This is highly dynamic. Gas price fluctuates.
-    # You'd need to estimate gas units for a typical transaction of this type.
-    # gas_units_mint = 200000 # Example
-    # gas_units_buy = 300000 # Example
-    # current_gas_price_wei = w3.eth.gas_price
-    # gas_fee_matic = Web3.from_wei(gas_units_mint * current_gas_price_wei, 'ether')
-    # matic_to_inr_rate = 80 # Fetch this from an oracle or price feed
-    # gas_fee_inr = float(gas_fee_matic) * matic_to_inr_rate
-    # return gas_fee_inr
-    return 5.00  # Placeholder INR for gas
\ No newline at end of file
+    result, status = estimate_gas_fee(transaction_type)
+    return result["fee_inr"] if status == 200 else None
\ No newline at end of file
@@ -0,0 +1,414 @@
+"""
+tx_outbox.py — One sending process per wallet, whatever the worker count.
+
+TxSender's nonce counter lives in one process, but serve.py runs
+cpu*2+1 workers that all sign with the same operational/owner key.  Two
+workers would hand out the same nonce and, once their fee bumps differ by
+the replacement threshold, one tx silently replaces the other.  Instead:
+
+  submit()   any worker inserts an OutboundTx row and gets an OutboxHandle
+             back (same interface as TxHandle)
+  relay      every process with an outbox runs one relay thread per
+             wallet; they compete for the lease "tx-sender:<config key>"
+             (app/leases.py).  Only the holder feeds queued rows to its
+             local TxSender, so the wallet's nonces come from one process.
+             Status, nonce, hash and receipt are written back to the row.
+  handles    one watcher thread per process re-reads the rows of every
+             open handle each HANDLE_POLL seconds
+
+A submit in the leader's own process wakes its relay at once; elsewhere
+the row is picked up within RELAY_POLL.  When the leader dies another
+process takes the lease within TX_SENDER_LEASE_TTL: rows the old leader
+had sent (tx_hash written) are followed through the receipt tracker; rows
+it had claimed without a recorded hash get one more TTL for a live old
+leader to write them back, then are marked "error" rather than sent again,
+since a lost write cannot tell "not sent" from "sent".
+
+A leader that stalls past its lease must not keep sending: its TxSender is
+gated on Lease.valid(), which closes ttl/2 after the last renewal, before
+anyone else can take the lease.  Txs still queued in it then finish
+"unsent" and their rows go back to "queued" for the new leader.
+
+  outbox = get_outbox(app, 'OWNER_PRIVATE_KEY', name="faucet")
+  handle = outbox.submit({"to": ..., "data": ..., "gas": 200_000}, label="...")
+  handle.wait_submitted(5)
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, UTC
+
+from eth_account import Account
+from web3 import Web3
+
+from . import receipt_tracker, tx_sender
+from .leases import Lease
+
+logger = logging.getLogger(__name__)
+
+RELAY_POLL = 0.1      # seconds between the leader's scans for queued rows
+RELAY_BATCH = 100     # rows claimed per scan
+HANDLE_POLL = 0.1     # seconds between re-reads of open handles' rows
+FINAL_STATUSES = ("mined", "failed", "error")
+
+
+def _hex(value):
+    if isinstance(value, (bytes, bytearray)):
+        return Web3.to_hex(value)
+    return value
+
+
+def _receipt_json(receipt) -> str:
+    """The receipt fields callers read (batch Payout logs included), JSON-safe."""
+    if not receipt:
+        return None
+    return json.dumps({
+        "status": receipt.get("status"),
+        "blockNumber": receipt.get("blockNumber"),
+        "gasUsed": receipt.get("gasUsed"),
+        "contractAddress": receipt.get("contractAddress"),
+        "transactionHash": _hex(receipt.get("transactionHash")),
+        "logs": [{"address": log.get("address"), "topics": [_hex(t) for t in log.get("topics") or []],
+                  "data": _hex(log.get("data")), "logIndex": log.get("logIndex")}
+                 for log in receipt.get("logs") or []],
+    })
+
+
+class OutboxHandle:
+    """Caller-side view of one OutboundTx row.  Updated by the process's watcher thread."""
+
+    def __init__(self, request_id: str, label=None):
+        self.id = request_id
+        self.label = label
+        self.status = "queued"     # queued | submitted | mined | failed | error
+        self.nonce = None
+        self.tx_hash = None
+        self.receipt = None
+        self.error = None
+        self._submitted = threading.Event()
+        self._done = threading.Event()
+
+    def wait_submitted(self, timeout=None):
+        """Block until the relay has sent the tx (or failed to).  Returns the hash or None."""
+        self._submitted.wait(timeout)
+        return self.tx_hash
+
+    def wait(self, timeout=None):
+        """Block until mined/failed.  Returns the receipt or None on timeout/error."""
+        self._done.wait(timeout)
+        return self.receipt
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def _update(self, status, nonce, tx_hash, error, receipt):
+        self.nonce, self.tx_hash, self.error = nonce, tx_hash, error
+        if receipt and self.receipt is None:
+            self.receipt = json.loads(receipt)
+        if status != "sending":
+            self.status = status
+        if tx_hash or status in FINAL_STATUSES:
+            self._submitted.set()
+        if status in FINAL_STATUSES:
+            self._done.set()
+
+    def to_dict(self) -> dict:
+        return {
+            "request_id": self.id, "label": self.label, "status": self.status,
+            "tx_hash": self.tx_hash, "nonce": self.nonce,
+            "block_number": self.receipt["blockNumber"] if self.receipt else None,
+            "error": self.error,
+        }
+
+
+class _Watcher:
+    """Refreshes every open OutboxHandle in this process with one query per HANDLE_POLL."""
+
+    def __init__(self, session_factory):
+        self.session_factory = session_factory
+        self._lock = threading.Lock()
+        self._handles = {}    # request id -> OutboxHandle
+        self._wake = threading.Event()
+        self._thread = threading.Thread(target=self._loop, name="tx-outbox-watch", daemon=True)
+        self._thread.start()
+
+    def watch(self, handle: OutboxHandle):
+        with self._lock:
+            self._handles[handle.id] = handle
+        self._wake.set()
+
+    def poll_once(self):
+        from .models import OutboundTx
+
+        with self._lock:
+            ids = list(self._handles)
+        if not ids:
+            return
+        session = self.session_factory()
+        try:
+            for i in range(0, len(ids), 500):
+                rows = session.query(OutboundTx.request_id, OutboundTx.status, OutboundTx.nonce, OutboundTx.tx_hash,
+                                     OutboundTx.error, OutboundTx.receipt).filter(
+                    OutboundTx.request_id.in_(ids[i:i + 500])).all()
+                for request_id, status, nonce, tx_hash, error, receipt in rows:
+                    handle = self._handles.get(request_id)
+                    if handle is None:
+                        continue
+                    handle._update(status, nonce, tx_hash, error, receipt)
+                    if handle.done:
+                        with self._lock:
+                            self._handles.pop(request_id, None)
+        finally:
+            session.close()
+
+    def _loop(self):
+        while True:
+            if not self._handles:
+                self._wake.wait()
+                self._wake.clear()
+            try:
+                self.poll_once()
+            except Exception as e:
+                logger.warning(f"Outbox handle refresh failed: {e}")
+            time.sleep(HANDLE_POLL)
+
+
+class TxOutbox:
+
+    def __init__(self, app, private_key_key: str, name: str, session_factory, watcher: _Watcher):
+        private_key = app.config.get(private_key_key)
+        if not private_key:
+            raise RuntimeError(f"{private_key_key} is not configured")
+        self.app = app
+        self.key = private_key_key
+        self.name = name
+        self.address = Account.from_key(private_key).address
+        self.web3 = Web3(Web3.HTTPProvider(app.config['RPC_URL']))  # gas estimates by batchers
+        self.session_factory = session_factory
+        self.watcher = watcher
+        self.lease = Lease(session_factory, f"tx-sender:{private_key_key}", app.config.get('TX_SENDER_LEASE_TTL', 20))
+        self.renew_every = max(self.lease.ttl / 4, 1)
+        self.is_leader = False
+        self.pid = os.getpid()
+        self._relayed = {}     # row id -> (TxHandle, last written snapshot)
+        self._orphans = {}     # row id -> monotonic deadline; claimed by a previous leader, no hash yet
+        self._next_renew = 0.0
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._relay_loop, name=f"{name}-relay", daemon=True)
+        self._thread.start()
+
+    # --- public ---
+
+    def submit(self, tx: dict, label=None) -> OutboxHandle:
+        """Queue ``tx`` (to/data/value/gas) for the wallet's relay."""
+        from .models import OutboundTx
+
+        handle = OutboxHandle(uuid.uuid4().hex, label)
+        session = self.session_factory()
+        try:
+            session.add(OutboundTx(request_id=handle.id, sender=self.key, label=(label or "")[:128] or None,
+                                   tx=json.dumps(tx), status="queued"))
+            session.commit()
+        finally:
+            session.close()
+        self.watcher.watch(handle)
+        self._wake.set()
+        return handle
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    # --- relay (lease holder only) ---
+
+    def _take_over(self, sender):
+        """Just became leader: settle rows a previous leader left in flight."""
+        from .models import OutboundTx
+
+        sender.gate = self.lease.valid
+        sender.reset_nonce()
+        tracker = receipt_tracker.get_tracker(self.app)
+        session = self.session_factory()
+        try:
+            rows = session.query(OutboundTx).filter(OutboundTx.sender == self.key,
+                                                    OutboundTx.status.in_(("sending", "submitted"))).all()
+            mine = set(self._relayed)
+            for row in rows:
+                if row.id in mine:
+                    continue
+                if row.tx_hash is None:
+                    self._orphans[row.id] = time.monotonic() + self.lease.ttl
+                else:
+                    tracker.track(row.tx_hash, row.label, callback=lambda h, r, row_id=row.id: self._record_receipt(
+                        row_id, h, r))
+            session.commit()
+        finally:
+            session.close()
+
+    def _settle_orphans(self):
+        """Orphans still without a hash after their grace period: "error" (only if nobody wrote them back)."""
+        from .models import OutboundTx
+
+        expired = [row_id for row_id, deadline in self._orphans.items() if time.monotonic() >= deadline]
+        if not expired:
+            return
+        session = self.session_factory()
+        try:
+            session.query(OutboundTx).filter(
+                OutboundTx.id.in_(expired), OutboundTx.status == "sending", OutboundTx.tx_hash.is_(None),
+            ).update({"status": "error", "error": "relay changed hands before the send was recorded",
+                      "updated_at": datetime.now(UTC)}, synchronize_session=False)
+            session.commit()
+        finally:
+            session.close()
+        for row_id in expired:
+            self._orphans.pop(row_id, None)
+
+    def _record_receipt(self, row_id, tx_hash, receipt):
+        """Tracker callback for rows inherited from a previous leader."""
+        from .models import OutboundTx
+
+        session = self.session_factory()
+        try:
+            session.query(OutboundTx).filter_by(id=row_id).update({
+                "status": "mined" if receipt.get("status") == 1 else "failed", "tx_hash": tx_hash,
+                "receipt": _receipt_json(receipt), "updated_at": datetime.now(UTC)}, synchronize_session=False)
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.warning(f"{self.name}: could not record receipt for {tx_hash}: {e}")
+        finally:
+            session.close()
+
+    def _claim_queued(self, sender):
+        from .models import OutboundTx
+
+        session = self.session_factory()
+        try:
+            rows = session.query(OutboundTx.id, OutboundTx.tx, OutboundTx.label).filter(
+                OutboundTx.sender == self.key, OutboundTx.status == "queued").order_by(
+                OutboundTx.id).limit(RELAY_BATCH).all()
+            claimed = []
+            for row_id, tx, label in rows:
+                # Conditional per row: a second relay overlapping a lease hand-over must not send it too
+                if session.query(OutboundTx).filter_by(id=row_id, status="queued").update(
+                        {"status": "sending"}, synchronize_session=False):
+                    claimed.append((row_id, tx, label))
+            session.commit()
+        finally:
+            session.close()
+        for row_id, tx, label in claimed:
+            self._relayed[row_id] = (sender.submit(json.loads(tx), label=label), None)
+        return len(claimed)
+
+    def _write_back(self):
+        """Copy status/hash/receipt of locally relayed txs to their rows, in one transaction."""
+        from sqlalchemy import bindparam, update
+
+        from .models import OutboundTx
+
+        rows, finished = [], []
+        for row_id, (handle, written) in list(self._relayed.items()):
+            snapshot = (handle.status, handle.nonce, handle.tx_hash, handle.error, handle.receipt is not None)
+            if snapshot == written:
+                continue
+            if handle.status == "unsent":
+                # Gate closed before it was sent: hand the row back to whoever leads next
+                rows.append({"b_id": row_id, "b_status": "queued", "b_nonce": None, "b_tx_hash": None,
+                             "b_error": None, "b_receipt": None, "b_updated_at": datetime.now(UTC)})
+                finished.append((row_id, handle, snapshot))
+                continue
+            rows.append({"b_id": row_id, "b_status": handle.status if handle.status != "queued" else "sending",
+                         "b_nonce": handle.nonce, "b_tx_hash": handle.tx_hash, "b_error": handle.error,
+                         "b_receipt": _receipt_json(handle.receipt), "b_updated_at": datetime.now(UTC)})
+            finished.append((row_id, handle, snapshot))
+        if not rows:
+            return
+        table = OutboundTx.__table__
+        stmt = update(table).where(table.c.id == bindparam("b_id")).values(
+            {name: bindparam(f"b_{name}") for name in ("status", "nonce", "tx_hash", "error", "receipt", "updated_at")})
+        session = self.session_factory()
+        try:
+            session.execute(stmt, rows)
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.warning(f"{self.name}: could not write back tx statuses ({e}); retrying")
+            return
+        finally:
+            session.close()
+        for row_id, handle, snapshot in finished:
+            if handle.done:
+                self._relayed.pop(row_id, None)
+            else:
+                self._relayed[row_id] = (handle, snapshot)
+
+    def _relay_loop(self):
+        while not self._stop.is_set():
+            try:
+                if time.monotonic() >= self._next_renew:
+                    leader = self.lease.acquire()
+                    self._next_renew = time.monotonic() + self.renew_every
+                    if leader and not self.is_leader:
+                        logger.info(f"{self.name}: tx relay lease acquired by {self.lease.holder}")
+                        self._take_over(tx_sender.get_local_sender(self.app, self.key, self.name))
+                    elif self.is_leader and not leader:
+                        # The sender's gate (lease.valid) is already closed: anything it still holds
+                        # finishes "unsent" and goes back to "queued" in _write_back
+                        logger.warning(f"{self.name}: tx relay lease lost; no longer sending")
+                    self.is_leader = leader
+                if self.is_leader and self.lease.valid():
+                    self._claim_queued(tx_sender.get_local_sender(self.app, self.key, self.name))
+                    self._settle_orphans()
+                self._write_back()  # txs relayed before a demotion still report their outcome
+            except Exception as e:
+                logger.error(f"{self.name}: tx relay iteration failed: {e}")
+            timeout = RELAY_POLL if self.is_leader or self._relayed else max(self._next_renew - time.monotonic(), 0)
+            self._wake.wait(timeout)
+            self._wake.clear()
+        if self.is_leader:
+            self.lease.release()
+            self.is_leader = False
+
+
+# --- per-process registry ---
+
+_outboxes = {}
+_watcher = None
+_outboxes_lock = threading.Lock()
+
+
+def _reset_after_fork():
+    """Relay/watcher threads belong to the parent process."""
+    global _outboxes, _watcher, _outboxes_lock
+    _outboxes = {}
+    _watcher = None
+    _outboxes_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def get_outbox(app, private_key_key='PLATFORM_OPERATIONAL_WALLET_PRIVATE_KEY', name="platform") -> TxOutbox:
+    """This process's outbox (and relay candidate) for the wallet under ``private_key_key``."""
+    global _watcher
+    with _outboxes_lock:
+        outbox = _outboxes.get(private_key_key)
+        if outbox is None:
+            from sqlalchemy.orm import sessionmaker
+
+            from . import db
+            with app.app_context():
+                engine = db.engine
+            session_factory = sessionmaker(bind=engine, autoflush=False)
+            if _watcher is None:
+                _watcher = _Watcher(session_factory)
+            outbox = _outboxes[private_key_key] = TxOutbox(app, private_key_key, name, session_factory, _watcher)
+        return outbox
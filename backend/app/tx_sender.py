@@ -0,0 +1,403 @@
+"""
+tx_sender.py — Queued transaction sender with a local nonce manager.
+
+Request handlers used to fetch the nonce, gas price, sign, send and then
+block on ``wait_for_transaction_receipt``.  Two concurrent requests also
+raced on the same nonce.  A TxSender owns one signing account per process:
+
+  submit(tx)   queue an unsigned tx (to/data/value/gas) and return a
+               TxHandle immediately; ``handle.wait_submitted()`` gives the
+               hash within milliseconds, ``handle.wait()`` the receipt
+  sender loop  one thread: allocate the next local nonce, price, sign, send
+  tracker loop one thread: collect receipts for in-flight txs, re-send a
+               stuck tx at the same nonce with a bumped fee, and fill
+               nonces left behind by failed sends so later txs are not
+               blocked behind a gap
+
+The nonce counter starts from ``get_transaction_count(address, 'pending')``
+and is re-synced from the chain on "nonce too low" errors.  When given a
+ReceiptTracker, every hash is registered there and receipts arrive from
+its batched per-block poll instead of one request per in-flight tx.
+
+  sender = get_sender(app)                   # operational wallet
+  handle = sender.submit({"to": ..., "data": ..., "gas": 200_000})
+
+The nonce counter is per process, so a wallet must only be sent from by one
+process.  get_sender() therefore returns the DB outbox (app/tx_outbox.py),
+whose leased relay is the one process that owns a TxSender for the wallet;
+TX_SENDER_MODE=local hands out this process's TxSender directly and is only
+safe with a single worker (run.py, benchmarks).
+"""
+
+import heapq
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+
+from eth_account import Account
+from web3 import Web3
+from web3.exceptions import TransactionNotFound
+
+from . import fee_oracle, receipt_tracker
+
+logger = logging.getLogger(__name__)
+
+TRACK_INTERVAL = 2.0       # seconds between receipt polls
+STUCK_AFTER = 90.0         # seconds pending before a tx is re-sent with a higher fee
+FEE_BUMP_PERCENT = 15      # nodes require >= 10-12.5% to accept a replacement
+MAX_REPLACEMENTS = 5
+GAP_FILL_AFTER = 5.0       # seconds a freed nonce may wait for real work before a filler tx takes it
+FILLER_GAS = 21_000
+
+_NONCE_LOW_HINTS = ("nonce too low", "already been used", "replacement transaction underpriced")
+_KNOWN_HINTS = ("already known", "known transaction")
+
+
+class TxHandle:
+    """Caller-side view of one queued transaction.  Thread-safe to read."""
+
+    def __init__(self, tx: dict, label=None):
+        self.id = uuid.uuid4().hex
+        self.label = label
+        self.tx = tx
+        self.nonce = None
+        self.tx_hash = None
+        self.hashes = []           # every hash sent for this nonce (replacements included)
+        self.status = "queued"     # queued | submitted | mined | failed | error | unsent (gate closed)
+        self.receipt = None
+        self.error = None
+        self.gas_price = None
+        self.submitted_at = None
+        self.replacements = 0
+        self._submitted = threading.Event()
+        self._done = threading.Event()
+
+    def wait_submitted(self, timeout=None):
+        """Block until the tx has a hash (or failed to send).  Returns the hash or None."""
+        self._submitted.wait(timeout)
+        return self.tx_hash
+
+    def wait(self, timeout=None):
+        """Block until mined/failed.  Returns the receipt or None on timeout/error."""
+        self._done.wait(timeout)
+        return self.receipt
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def _finish(self, status, receipt=None, error=None):
+        self.status, self.receipt, self.error = status, receipt, error
+        self._submitted.set()
+        self._done.set()
+
+    def to_dict(self) -> dict:
+        return {
+            "request_id": self.id, "label": self.label, "status": self.status,
+            "tx_hash": self.tx_hash, "nonce": self.nonce, "replaced_hashes": self.hashes[:-1],
+            "block_number": self.receipt["blockNumber"] if self.receipt else None,
+            "error": self.error,
+        }
+
+
+def _error_text(exc) -> str:
+    return str(exc.args[0] if exc.args else exc).lower()
+
+
+class TxSender:
+
+    def __init__(self, web3: Web3, private_key: str, name="sender", fee_fn=None, tracker=None):
+        self.web3 = web3
+        self.account = Account.from_key(private_key)
+        self.address = self.account.address
+        self.name = name
+        # fee_fn(web3) -> dict of fee fields; the shared per-block fee oracle by default
+        self.fee_fn = fee_fn or fee_oracle.tx_fields
+        self.tracker = tracker
+        self.chain_id = None
+        self.pid = os.getpid()
+        # gate() -> bool, checked before every send (new, replacement, gap filler).  False means another
+        # process may own the wallet's nonces now (the outbox's relay lease): queued txs finish "unsent"
+        self.gate = None
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._next_nonce = None
+        self._free_nonces = []          # heap of nonces whose send failed
+        self._free_since = {}
+        self._inflight = {}             # nonce -> TxHandle
+        self._handles = {}              # request id -> TxHandle (recent)
+        self._stop = threading.Event()
+        self._threads = [
+            threading.Thread(target=self._send_loop, name=f"{name}-send", daemon=True),
+            threading.Thread(target=self._track_loop, name=f"{name}-track", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    # --- public ---
+
+    def submit(self, tx: dict, label=None) -> TxHandle:
+        """Queue ``tx`` (to/data/value/gas; nonce, fees and chainId are filled in)."""
+        handle = TxHandle(dict(tx), label)
+        with self._lock:
+            self._handles[handle.id] = handle
+            if len(self._handles) > 10_000:
+                for key in [k for k, h in self._handles.items() if h.done][:1000]:
+                    self._handles.pop(key, None)
+        self._queue.put(handle)
+        return handle
+
+    def get(self, request_id):
+        return self._handles.get(request_id)
+
+    def stop(self):
+        self._stop.set()
+        self._queue.put(None)
+
+    # --- nonce management ---
+
+    def _sync_nonce(self):
+        self._next_nonce = self.web3.eth.get_transaction_count(self.address, "pending")
+
+    def reset_nonce(self):
+        """Forget the local counter; the next send re-reads the pending count (e.g. on regaining a relay lease)."""
+        with self._lock:
+            self._next_nonce = None
+
+    def _allocate_nonce(self) -> int:
+        with self._lock:
+            if self._free_nonces:
+                nonce = heapq.heappop(self._free_nonces)
+                self._free_since.pop(nonce, None)
+                return nonce
+            if self._next_nonce is None:
+                self._sync_nonce()
+            nonce = self._next_nonce
+            self._next_nonce += 1
+            return nonce
+
+    def _release_nonce(self, nonce):
+        """A send failed after allocation: reuse the nonce so later txs are not stuck behind it."""
+        with self._lock:
+            heapq.heappush(self._free_nonces, nonce)
+            self._free_since[nonce] = time.monotonic()
+
+    # --- sending ---
+
+    def _sign_and_send(self, handle: TxHandle, nonce: int, fees: dict):
+        tx = {**handle.tx, **fees, "nonce": nonce, "chainId": self.chain_id, "from": self.address}
+        tx.setdefault("value", 0)
+        signed = self.account.sign_transaction(tx)
+        tx_hash = Web3.to_hex(signed.hash)
+        try:
+            self.web3.eth.send_raw_transaction(signed.raw_transaction)
+        except Exception as e:
+            if not any(hint in _error_text(e) for hint in _KNOWN_HINTS):
+                raise
+        handle.tx_hash = tx_hash
+        handle.hashes.append(tx_hash)
+        handle.gas_price = fees
+        if self.tracker is not None:
+            self.tracker.track(tx_hash, handle.label, callback=lambda h, r: self._on_receipt(handle, h, r))
+        return tx_hash
+
+    def _may_send(self) -> bool:
+        return self.gate is None or self.gate()
+
+    def _send(self, handle: TxHandle):
+        if not self._may_send():
+            handle._finish("unsent", error="sender closed: wallet relay lease not held")
+            return
+        if self.chain_id is None:
+            self.chain_id = self.web3.eth.chain_id
+        for attempt in range(2):
+            nonce = self._allocate_nonce()
+            try:
+                self._sign_and_send(handle, nonce, self.fee_fn(self.web3))
+            except Exception as e:
+                if attempt == 0 and any(hint in _error_text(e) for hint in _NONCE_LOW_HINTS):
+                    logger.warning(f"{self.name}: nonce {nonce} rejected ({e}); re-syncing from chain")
+                    with self._lock:
+                        self._sync_nonce()
+                    continue
+                self._release_nonce(nonce)
+                logger.error(f"{self.name}: send failed for {handle.label or handle.id}: {e}")
+                handle._finish("error", error=str(e))
+                return
+            handle.nonce = nonce
+            handle.status = "submitted"
+            handle.submitted_at = time.monotonic()
+            with self._lock:
+                self._inflight[nonce] = handle
+            handle._submitted.set()
+            return
+
+    def _fill_gaps(self):
+        """Spend nonces freed by failed sends on 0-value self-transfers if no real tx took them."""
+        if not self._may_send():
+            return
+        with self._lock:
+            stale = [n for n, since in self._free_since.items() if time.monotonic() - since > GAP_FILL_AFTER]
+        for nonce in stale:
+            with self._lock:
+                if nonce not in self._free_since:
+                    continue
+                self._free_nonces.remove(nonce)
+                heapq.heapify(self._free_nonces)
+                self._free_since.pop(nonce)
+            filler = TxHandle({"to": self.address, "value": 0, "gas": FILLER_GAS}, label="nonce-gap-filler")
+            try:
+                self._sign_and_send(filler, nonce, self.fee_fn(self.web3))
+            except Exception as e:
+                if any(hint in _error_text(e) for hint in _NONCE_LOW_HINTS):
+                    continue  # something already used it on-chain
+                logger.error(f"{self.name}: gap filler for nonce {nonce} failed: {e}")
+                self._release_nonce(nonce)
+                continue
+            filler.nonce, filler.status, filler.submitted_at = nonce, "submitted", time.monotonic()
+            with self._lock:
+                self._inflight[nonce] = filler
+            logger.warning(f"{self.name}: filled nonce gap {nonce} with {filler.tx_hash}")
+
+    def _send_loop(self):
+        while not self._stop.is_set():
+            try:
+                handle = self._queue.get(timeout=1.0)
+            except queue.Empty:
+                handle = None
+            if handle is not None:
+                try:
+                    self._send(handle)
+                except Exception as e:  # e.g. chain id / nonce sync RPC failure; keep the loop alive
+                    logger.error(f"{self.name}: could not send {handle.label or handle.id}: {e}")
+                    handle._finish("error", error=str(e))
+            elif self._free_since:
+                self._fill_gaps()
+
+    # --- tracking ---
+
+    def _replace(self, handle: TxHandle):
+        """Re-send a stuck tx at the same nonce with fees bumped by FEE_BUMP_PERCENT (and never below market)."""
+        if not self._may_send():
+            return
+        current = self.fee_fn(self.web3)
+        bumped = {key: max(int(value * (100 + FEE_BUMP_PERCENT) // 100), current.get(key, 0))
+                  for key, value in (handle.gas_price or current).items()}
+        try:
+            self._sign_and_send(handle, handle.nonce, bumped)
+        except Exception as e:
+            logger.warning(f"{self.name}: replacement of nonce {handle.nonce} failed: {e}")
+            return
+        handle.replacements += 1
+        handle.submitted_at = time.monotonic()
+        logger.warning(f"{self.name}: nonce {handle.nonce} stuck; replaced with {handle.tx_hash} ({bumped})")
+
+    def _settle(self, handle: TxHandle, tx_hash, status, receipt=None, error=None):
+        handle.tx_hash = tx_hash  # whichever version was mined
+        handle._finish(status, receipt=receipt, error=error)
+        if self.tracker is not None:
+            for other in handle.hashes:
+                if receipt is None:
+                    self.tracker.untrack(other, status="dropped")
+                elif other != tx_hash:
+                    self.tracker.untrack(other, status="replaced")
+
+    def _on_receipt(self, handle: TxHandle, tx_hash, receipt):
+        """ReceiptTracker callback (tracker thread)."""
+        if handle.done:
+            return
+        self._settle(handle, tx_hash, "mined" if receipt["status"] == 1 else "failed", receipt=receipt)
+        with self._lock:
+            if self._inflight.get(handle.nonce) is handle:
+                self._inflight.pop(handle.nonce)
+
+    def _check(self, handle: TxHandle, mined_nonce: int):
+        if handle.done:
+            return True
+        # With a tracker, receipts arrive via _on_receipt; look one up here only when the nonce is
+        # already consumed and the tracker has not reported yet
+        if self.tracker is None or handle.nonce < mined_nonce:
+            for tx_hash in reversed(handle.hashes):
+                try:
+                    receipt = self.web3.eth.get_transaction_receipt(tx_hash)
+                except TransactionNotFound:
+                    continue
+                self._settle(handle, tx_hash, "mined" if receipt["status"] == 1 else "failed", receipt=dict(receipt))
+                return True
+        if handle.nonce < mined_nonce:
+            # Nonce consumed by a tx we did not send (or a receipt we cannot see yet); stop waiting
+            self._settle(handle, handle.tx_hash, "failed", error=f"nonce {handle.nonce} used by another transaction")
+            return True
+        if (time.monotonic() - handle.submitted_at > STUCK_AFTER * (handle.replacements + 1)
+                and handle.replacements < MAX_REPLACEMENTS):
+            self._replace(handle)
+        return False
+
+    def _track_loop(self):
+        while not self._stop.wait(TRACK_INTERVAL):
+            with self._lock:
+                inflight = sorted(self._inflight.items())
+            if not inflight:
+                continue
+            try:
+                mined_nonce = self.web3.eth.get_transaction_count(self.address, "latest")
+                for nonce, handle in inflight:
+                    if self._check(handle, mined_nonce):
+                        with self._lock:
+                            self._inflight.pop(nonce, None)
+            except Exception as e:
+                logger.warning(f"{self.name}: receipt tracking failed: {e}")
+
+
+# --- per-process registry ---
+
+_senders = {}
+_senders_lock = threading.Lock()
+
+
+def _reset_after_fork():
+    """Sender threads and nonce state belong to the parent process."""
+    global _senders, _senders_lock
+    _senders = {}
+    _senders_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def get_local_sender(app, private_key_key='PLATFORM_OPERATIONAL_WALLET_PRIVATE_KEY', name="platform") -> TxSender:
+    """
+    This process's TxSender for the wallet configured under ``private_key_key``.
+
+    Its nonces are only unique if no other process sends for the wallet:
+    use get_sender(), which goes through the leased relay unless
+    TX_SENDER_MODE=local.
+    """
+    private_key = app.config.get(private_key_key)
+    if not private_key:
+        raise RuntimeError(f"{private_key_key} is not configured")
+    with _senders_lock:
+        sender = _senders.get(private_key_key)
+        if sender is None:
+            web3 = Web3(Web3.HTTPProvider(app.config['RPC_URL']))  # own session: sends never queue behind reads
+            sender = _senders[private_key_key] = TxSender(web3, private_key, name=name,
+                                                          tracker=receipt_tracker.get_tracker(app))
+        return sender
+
+
+def get_sender(app, private_key_key='PLATFORM_OPERATIONAL_WALLET_PRIVATE_KEY', name="platform"):
+    """
+    The sender for the wallet under ``private_key_key``: the DB outbox with
+    one leased relay per wallet (app/tx_outbox.py), or with
+    TX_SENDER_MODE=local this process's TxSender.  Both expose
+    submit(tx, label) -> handle, ``web3`` and ``address``.
+    """
+    if app.config.get('TX_SENDER_MODE', 'outbox') == 'local':
+        return get_local_sender(app, private_key_key, name)
+    from . import tx_outbox
+    return tx_outbox.get_outbox(app, private_key_key, name)
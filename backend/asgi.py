@@ -0,0 +1,14 @@
+"""
+ASGI entry point.  Serves /ipfs/<hash>, /doc/stream_batch and /user/docs
+natively on the event loop and every other route through the Flask app.
+
+  uvicorn asgi:app --host 0.0.0.0 --port 8080 --workers 4
+"""
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app.asgi import create_asgi_app
+
+app = create_asgi_app()
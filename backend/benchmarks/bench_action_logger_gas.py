@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+bench_action_logger_gas.py — Gas per logged action, single vs batched.
+
+  single  : K separate ActionLogger.logAction transactions
+  batched : one ActionLogger.logActions transaction carrying K actions
+
+Compiles contracts/ActionLogger.sol and deploys it on the local dev chain
+(Ganache, or EthereumTesterProvider when npx is unavailable), so the
+figures are receipt gasUsed, intrinsic 21k gas included.
+
+Usage:
+  python benchmarks/bench_action_logger_gas.py
+  python benchmarks/bench_action_logger_gas.py --sizes 1 10 50 --details-bytes 200
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.deploy.services.chain import deploy_contract_local, get_dev_account, get_local_w3, reset_chain
+from app.deploy.services.compiler import compile_file
+
+SOL_PATH = Path(__file__).resolve().parent.parent.parent / "contracts" / "ActionLogger.sol"
+
+
+def _actions(k: int, details_bytes: int):
+    actions, details = [], []
+    for i in range(k):
+        body = json.dumps({"token_id": i, "pad": ""})
+        details.append(json.dumps({"token_id": i, "pad": "x" * max(0, details_bytes - len(body))}))
+        actions.append("document_uploaded")
+    return actions, details
+
+
+def _gas_used(w3, tx_hash) -> int:
+    return w3.eth.wait_for_transaction_receipt(tx_hash)["gasUsed"]
+
+
+def run(sizes, details_bytes):
+    compiled = compile_file(SOL_PATH)["ActionLogger"]
+    w3 = get_local_w3()
+    sender = get_dev_account(w3)
+    address, _, _ = deploy_contract_local(w3, compiled["abi"], compiled["bytecode"])
+    contract = w3.eth.contract(address=address, abi=compiled["abi"])
+
+    print(f"{'K':>5}  {'single gas/action':>18}  {'batched gas/action':>19}  {'saving':>7}")
+    for k in sizes:
+        actions, details = _actions(k, details_bytes)
+        single = sum(_gas_used(w3, contract.functions.logAction(a, d).transact({"from": sender}))
+                     for a, d in zip(actions, details))
+        batched = _gas_used(w3, contract.functions.logActions(actions, details).transact({"from": sender}))
+        print(f"{k:>5}  {single / k:>18,.0f}  {batched / k:>19,.0f}  {1 - batched / single:>6.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 5, 10, 25, 50, 100])
+    parser.add_argument("--details-bytes", type=int, default=120, help="approximate details JSON length")
+    args = parser.parse_args()
+    try:
+        run(args.sizes, args.details_bytes)
+    finally:
+        reset_chain()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+bench_claim_signing.py — Faucet claim signatures: per-claim encode_typed_data vs bulk path.
+
+  typed_data : create_claim_signature() per recipient (rebuilds domain + types each time)
+  digest     : precomputed domain separator + sign_claims() in this process
+  pool       : sign_claims_bulk() across --workers spawned processes
+
+Uses a throwaway owner key, CHAIN_ID and contract address, so no chain or
+.env is needed.  Checks that the digest path produces byte-identical
+signatures (both sign deterministically, RFC 6979) before timing.
+
+Usage:
+  python benchmarks/bench_claim_signing.py
+  python benchmarks/bench_claim_signing.py --claims 5000 --workers 4
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from eth_account import Account
+
+_owner = Account.create()
+os.environ["OWNER_PRIVATE_KEY"] = _owner.key.hex()
+os.environ["CHAIN_ID"] = "80002"
+os.environ["FAUCET_CONTRACT_ADDRESS"] = Account.create().address
+
+from app import faucet_signer  # noqa: E402  (reads the env above at import)
+
+AMOUNT = 20_000_000_000_000
+
+
+def run(claims, workers):
+    recipients = [Account.create().address for _ in range(claims)]
+    batch = [(recipient, AMOUNT, 0) for recipient in recipients]
+    deadline = int(time.time()) + 600
+
+    # Same deadline for both paths so the signatures can be compared
+    faucet_signer.init_worker(faucet_signer.get_domain_separator())
+    reference = faucet_signer.create_claim_signature(recipients[0], AMOUNT, 0)
+    fast = faucet_signer.sign_claims([(recipients[0], AMOUNT, 0)], int(reference["deadline"]))[0]
+    if fast["signature"].removeprefix("0x") != reference["signature"].removeprefix("0x"):
+        raise SystemExit("digest path signature differs from encode_typed_data")
+
+    started = time.perf_counter()
+    for recipient in recipients:
+        faucet_signer.create_claim_signature(recipient, AMOUNT, 0)
+    typed_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    faucet_signer.sign_claims(batch, deadline)
+    digest_seconds = time.perf_counter() - started
+
+    list(faucet_signer.sign_claims_bulk(batch[:workers], deadline, workers))  # spawn the pool outside the timing
+    started = time.perf_counter()
+    signed = sum(len(chunk) for chunk in faucet_signer.sign_claims_bulk(batch, deadline, workers))
+    pool_seconds = time.perf_counter() - started
+    assert signed == claims
+
+    print(f"claims={claims}  workers={workers}  chunk={faucet_signer.SIGN_CHUNK}")
+    print(f"{'mode':<12}{'seconds':>10}{'claims/sec':>12}")
+    for mode, seconds in (("typed_data", typed_seconds), ("digest", digest_seconds), ("pool", pool_seconds)):
+        print(f"{mode:<12}{seconds:>10.2f}{claims / seconds:>12,.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--claims", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=min(os.cpu_count() or 1, 4))
+    args = parser.parse_args()
+    run(args.claims, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+bench_cold_start.py — Measure worker cold-start cost.
+
+Each run spawns a fresh interpreter (like a new gunicorn worker or an
+autoscaled container) and records:
+
+  import  : time to `import app`
+  factory : time for create_app() to return
+  ready   : time until /health/ready answers 200 (startup checks done)
+
+Usage:
+  python benchmarks/bench_cold_start.py
+  python benchmarks/bench_cold_start.py --runs 10 --validation blocking
+
+Reads the usual backend env (.env).  `--validation` sets STARTUP_VALIDATION
+for the child processes so background and blocking boots can be compared.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+_CHILD = r"""
+import json, sys, time
+t0 = time.perf_counter()
+import app
+t1 = time.perf_counter()
+flask_app = app.create_app()
+t2 = time.perf_counter()
+client = flask_app.test_client()
+deadline = t2 + {ready_timeout}
+ready = None
+while time.perf_counter() < deadline:
+    if client.get("/health/ready").status_code == 200:
+        ready = time.perf_counter() - t0
+        break
+    time.sleep(0.05)
+print(json.dumps({{"import": t1 - t0, "factory": t2 - t1, "ready": ready}}))
+"""
+
+
+def _one_run(ready_timeout: float, env: dict) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", _CHILD.format(ready_timeout=ready_timeout)],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def _fmt(values) -> str:
+    values = [v * 1000 for v in values if v is not None]
+    if not values:
+        return "n/a"
+    return f"mean={statistics.mean(values):8.1f} ms  min={min(values):8.1f} ms  max={max(values):8.1f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark import and app-factory time")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--validation", choices=["background", "blocking", "off"], default="background")
+    parser.add_argument("--ready-timeout", type=float, default=30.0)
+    args = parser.parse_args()
+
+    env = dict(os.environ, STARTUP_VALIDATION=args.validation)
+    results = [_one_run(args.ready_timeout, env) for _ in range(args.runs)]
+
+    print(f"STARTUP_VALIDATION={args.validation}  runs={args.runs}")
+    for key in ("import", "factory", "ready"):
+        print(f"  {key:<8} {_fmt(r[key] for r in results)}")
+
+
+if __name__ == "__main__":
+    main()
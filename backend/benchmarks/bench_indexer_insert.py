@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+bench_indexer_insert.py — Indexer write throughput in logs/sec.
+
+  per_event : SELECT for a duplicate, INSERT, COMMIT for every log
+              (the previous process_action_logged_event)
+  batched   : one INSERT ... ON CONFLICT DO NOTHING per window, one COMMIT
+              (app.indexer_store.insert_action_logs)
+
+Synthetic ActionLogged rows are written to a throwaway database, so no RPC
+is needed.  Each mode gets a fresh table.
+
+Usage:
+  python benchmarks/bench_indexer_insert.py
+  python benchmarks/bench_indexer_insert.py --logs 50000 --window 2000
+  python benchmarks/bench_indexer_insert.py --database-url postgresql://localhost/bench
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.indexer_store import insert_action_logs
+from app.models import ActionLog
+
+
+def _rows(n: int):
+    now = datetime.now()
+    for i in range(n):
+        yield {
+            "log_id_onchain": None,
+            "user_address": f"0x{i % 1000:040x}",
+            "action": "bench_action",
+            "details": f"synthetic log {i}",
+            "timestamp": now,
+            "block_number": 1_000_000 + i // 4,
+            "tx_hash": f"0x{i // 2:064x}",  # two logs per tx
+            "log_index": i % 2,
+        }
+
+
+def _per_event(Session, rows, window):
+    session = Session()
+    try:
+        for row in rows:
+            exists = session.query(ActionLog).filter_by(tx_hash=row["tx_hash"], log_index=row["log_index"]).first()
+            if exists:
+                continue
+            session.add(ActionLog(**row))
+            session.commit()
+    finally:
+        session.close()
+
+
+def _batched(Session, rows, window):
+    session = Session()
+    try:
+        for i in range(0, len(rows), window):
+            insert_action_logs(session, rows[i:i + window])
+            session.commit()
+    finally:
+        session.close()
+
+
+MODES = {"per_event": _per_event, "batched": _batched}
+
+
+def _run(database_url, mode, rows, window):
+    engine = create_engine(database_url)
+    ActionLog.__table__.drop(engine, checkfirst=True)
+    ActionLog.__table__.create(engine)
+    Session = sessionmaker(bind=engine, autoflush=False)
+    try:
+        t0 = time.perf_counter()
+        MODES[mode](Session, rows, window)
+        elapsed = time.perf_counter() - t0
+        # Replaying the same rows must insert nothing
+        session = Session()
+        replayed = insert_action_logs(session, rows[:window])
+        session.rollback()
+        session.close()
+        return elapsed, replayed
+    finally:
+        ActionLog.__table__.drop(engine, checkfirst=True)
+        engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Indexer insert throughput (logs/sec)")
+    parser.add_argument("--logs", type=int, default=10_000)
+    parser.add_argument("--window", type=int, default=2_000, help="Logs per committed window (batched mode)")
+    parser.add_argument("--database-url", default=None, help="Defaults to a temporary SQLite file")
+    parser.add_argument("--modes", nargs="+", choices=sorted(MODES), default=["per_event", "batched"])
+    args = parser.parse_args()
+
+    rows = list(_rows(args.logs))
+    tmpdir = None
+    database_url = args.database_url
+    if database_url is None:
+        tmpdir = tempfile.mkdtemp(prefix="bench_indexer_")
+        database_url = f"sqlite:///{os.path.join(tmpdir, 'bench.db')}"
+
+    print(f"{args.logs} logs, window {args.window}, {database_url.split('://')[0]}")
+    for mode in args.modes:
+        elapsed, replayed = _run(database_url, mode, rows, args.window)
+        print(f"  {mode:10s} {elapsed:8.3f}s  {args.logs / elapsed:10.0f} logs/s  "
+              f"(replay inserted {replayed})")
+
+
+if __name__ == "__main__":
+    main()
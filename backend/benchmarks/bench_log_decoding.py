@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+bench_log_decoding.py — Event-log decode throughput (logs/sec).
+
+  web3        : contract.events.ActionLogged().process_log(raw_log)
+  precompiled : app.log_decoders registry (eth_abi TupleDecoders keyed by topic0)
+
+Raw ActionLogged logs are synthesised with eth_abi, so no RPC is needed.
+
+Usage:
+  python benchmarks/bench_log_decoding.py
+  python benchmarks/bench_log_decoding.py --logs 100000 --repeat 5
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from eth_abi import encode
+from hexbytes import HexBytes
+from web3 import Web3
+
+from app.log_decoders import DecoderRegistry
+
+ABI_PATH = Path(__file__).resolve().parent.parent / "app" / "abi" / "ActionLogger.json"
+CONTRACT_ADDRESS = Web3.to_checksum_address("0x" + "11" * 20)
+
+
+def _raw_logs(registry: DecoderRegistry, n: int):
+    topic0 = HexBytes(registry.topic("ActionLogged"))
+    logs = []
+    for i in range(n):
+        user = "0x" + f"{i:040x}"
+        logs.append({
+            "address": CONTRACT_ADDRESS,
+            "topics": [topic0, HexBytes(encode(["address"], [user]))],
+            "data": HexBytes(encode(["string", "uint256", "string"],
+                                    ["document_uploaded", 1_700_000_000 + i, f'{{"token_id": {i}}}'])),
+            "blockNumber": 1_000_000 + i // 10,
+            "blockHash": HexBytes(i.to_bytes(32, "big")),
+            "transactionHash": HexBytes((i // 2).to_bytes(32, "big")),
+            "transactionIndex": 0,
+            "logIndex": i % 10,
+            "removed": False,
+        })
+    return logs
+
+
+def _time(fn, logs, repeat):
+    runs = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for raw_log in logs:
+            fn(raw_log)
+        runs.append(time.perf_counter() - t0)
+    return statistics.median(runs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Event-log decode throughput")
+    parser.add_argument("--logs", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    abi = json.loads(ABI_PATH.read_text())
+    registry = DecoderRegistry.from_abi(abi)
+    event = Web3().eth.contract(address=CONTRACT_ADDRESS, abi=abi).events.ActionLogged()
+    logs = _raw_logs(registry, args.logs)
+
+    # Both paths must agree before timing them
+    expected = event.process_log(logs[0])["args"]
+    got = registry.decode(logs[0])["args"]
+    assert dict(expected) == got, (dict(expected), got)
+
+    print(f"{args.logs} ActionLogged logs, median of {args.repeat}")
+    for label, fn in (("web3", event.process_log), ("precompiled", registry.decode)):
+        elapsed = _time(fn, logs, args.repeat)
+        print(f"  {label:12s} {elapsed:8.3f}s  {args.logs / elapsed:10.0f} logs/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+bench_nft_reads.py — Compare the /user/docs read paths against a live RPC.
+
+  legacy : asyncio.run() per request, sync Web3 calls pushed to threads,
+           tokenData() fetched sequentially (the previous implementation)
+  aio    : shared background loop (app.aio), AsyncWeb3, tokenData() fan-out
+           with asyncio.gather
+
+Usage:
+  python benchmarks/bench_nft_reads.py --owner 0xYourWallet
+  python benchmarks/bench_nft_reads.py --owner 0xYourWallet --requests 50 --page-size 20
+
+Reads RPC_URL and NFT_DOC_CONTRACT_ADDRESS from the environment / .env.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from web3 import Web3
+
+from app import aio
+
+ABI_PATH = Path(__file__).resolve().parent.parent / "app" / "abi" / "NFTDoc.json"
+
+
+def _legacy_request(w3: Web3, address: str, abi: list, owner: str, page_size: int):
+    async def _inner():
+        contract = w3.eth.contract(address=address, abi=abi)
+        await asyncio.to_thread(lambda: w3.eth.get_code(address))
+        token_ids = await asyncio.to_thread(lambda: contract.functions.fetchNFTsForOwner(owner).call())
+        token_ids = list(token_ids)[::-1][:page_size]
+
+        def _gather_sync(ids):
+            return [contract.functions.tokenData(tid).call() for tid in ids]
+
+        return await asyncio.to_thread(_gather_sync, token_ids)
+
+    return asyncio.run(_inner())
+
+
+def _aio_request(rpc_url: str, address: str, abi: list, owner: str, page_size: int):
+    async def _inner():
+        contract = aio.get_async_contract(rpc_url, address, abi)
+        _, token_ids = await asyncio.gather(
+            contract.w3.eth.get_code(address),
+            contract.functions.fetchNFTsForOwner(owner).call(),
+        )
+        token_ids = list(token_ids)[::-1][:page_size]
+        return await asyncio.gather(*(contract.functions.tokenData(tid).call() for tid in token_ids))
+
+    return aio.run(_inner())
+
+
+def _timed(label: str, fn, n: int):
+    fn()  # warm-up: connection setup, ABI parsing
+    samples = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    samples.sort()
+    print(
+        f"{label:<8} n={n:<4} mean={statistics.mean(samples):8.1f} ms"
+        f"  p50={samples[len(samples) // 2]:8.1f} ms"
+        f"  p95={samples[int(len(samples) * 0.95) - 1]:8.1f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark /user/docs RPC read paths")
+    parser.add_argument("--owner", required=True, help="Wallet address that owns NFTDoc tokens")
+    parser.add_argument("--requests", type=int, default=20, help="Requests per path")
+    parser.add_argument("--page-size", type=int, default=10, help="tokenData() calls per request")
+    args = parser.parse_args()
+
+    rpc_url = os.getenv("RPC_URL")
+    address = os.getenv("NFT_DOC_CONTRACT_ADDRESS")
+    if not rpc_url or not address:
+        sys.exit("RPC_URL and NFT_DOC_CONTRACT_ADDRESS must be set")
+
+    address = Web3.to_checksum_address(address)
+    owner = Web3.to_checksum_address(args.owner)
+    abi = json.loads(ABI_PATH.read_text())
+    w3 = Web3(Web3.HTTPProvider(rpc_url))
+
+    _timed("legacy", lambda: _legacy_request(w3, address, abi, owner, args.page_size), args.requests)
+    _timed("aio", lambda: _aio_request(rpc_url, address, abi, owner, args.page_size), args.requests)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+bench_payout_batch.py — EssentialisPayout: per-recipient claim() vs owner claimBatch().
+
+  single  : each recipient sends claim() with an owner EIP-712 signature
+  batched : the owner sends claimBatch() for --batch-size recipients per tx
+
+Compiles contracts/DocToken.sol (needs node_modules/@openzeppelin) and
+deploys it on the local dev chain from a throwaway owner key.  Recipients
+are the chain's pre-funded dev accounts, reused round-robin, so both modes
+pay the same storage costs.  Reports receipt gasUsed per claim and
+wall-clock claims/sec (local chain: send + mine + receipt, sequential).
+
+Usage:
+  python benchmarks/bench_payout_batch.py
+  python benchmarks/bench_payout_batch.py --claims 200 --batch-size 50 --key-bytes 130
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from eth_account import Account
+from eth_account.messages import encode_typed_data
+
+from app.deploy.services.chain import get_local_w3, reset_chain
+from app.deploy.services.compiler import compile_file
+from app.deploy.services.deployer import deploy_contract
+
+SOL_PATH = Path(__file__).resolve().parent.parent.parent / "contracts" / "DocToken.sol"
+
+
+def _send_as_owner(w3, owner, fn):
+    tx = fn.build_transaction({"from": owner.address, "nonce": w3.eth.get_transaction_count(owner.address),
+                               "chainId": w3.eth.chain_id})
+    signed = owner.sign_transaction(tx)
+    return w3.eth.wait_for_transaction_receipt(w3.eth.send_raw_transaction(signed.raw_transaction))
+
+
+def _claim_signature(owner, chain_id, contract, recipient, amount, nonce, deadline):
+    encoded = encode_typed_data(full_message={
+        "types": {"Claim": [{"name": "recipient", "type": "address"}, {"name": "amount", "type": "uint256"},
+                            {"name": "nonce", "type": "uint256"}, {"name": "deadline", "type": "uint256"}]},
+        "primaryType": "Claim",
+        "domain": {"name": "EssentialisPayout", "version": "1", "chainId": chain_id,
+                   "verifyingContract": contract.address},
+        "message": {"recipient": recipient, "amount": amount, "nonce": nonce, "deadline": deadline},
+    })
+    return owner.sign_message(encoded).signature
+
+
+def run(claims, batch_size, key_bytes):
+    compiled = compile_file(SOL_PATH)["EssentialisPayout"]
+    w3 = get_local_w3()
+    funder = w3.eth.accounts[0]
+    recipients = w3.eth.accounts[1:]
+
+    owner = Account.create()
+    w3.eth.wait_for_transaction_receipt(w3.eth.send_transaction(
+        {"from": funder, "to": owner.address, "value": w3.to_wei(10, "ether")}))
+    result = deploy_contract(w3, compiled["abi"], compiled["bytecode"], owner.key.hex(),
+                             contract_name="EssentialisPayout")
+    contract = w3.eth.contract(address=result.address, abi=compiled["abi"])
+    amount = contract.functions.payoutAmount().call()
+    w3.eth.wait_for_transaction_receipt(w3.eth.send_transaction(
+        {"from": funder, "to": contract.address, "value": amount * claims * 2 + w3.to_wei(1, "ether")}))
+    chain_id = w3.eth.chain_id
+    pub_key = "k" * key_bytes
+
+    # --- single claims ---
+    gas, started = 0, time.perf_counter()
+    for i in range(claims):
+        recipient = recipients[i % len(recipients)]
+        nonce = contract.functions.nonces(recipient).call()
+        deadline = w3.eth.get_block("latest")["timestamp"] + 600
+        signature = _claim_signature(owner, chain_id, contract, recipient, amount, nonce, deadline)
+        tx_hash = contract.functions.claim(recipient, amount, deadline, signature, pub_key).transact({"from": recipient})
+        gas += w3.eth.wait_for_transaction_receipt(tx_hash)["gasUsed"]
+    single_seconds = time.perf_counter() - started
+    single_gas = gas / claims
+
+    # --- batched claims ---
+    gas, paid, started = 0, 0, time.perf_counter()
+    payout_topic = w3.keccak(text="Payout(address,uint256,uint256)")
+    for start in range(0, claims, batch_size):
+        chunk = [recipients[i % len(recipients)] for i in range(start, min(start + batch_size, claims))]
+        expected, seen = [], {}
+        for recipient in chunk:  # a recipient repeated within the batch expects its next nonce
+            seen[recipient] = seen.get(recipient, contract.functions.nonces(recipient).call() - 1) + 1
+            expected.append(seen[recipient])
+        receipt = _send_as_owner(w3, owner, contract.functions.claimBatch(
+            chunk, [amount] * len(chunk), expected, [pub_key] * len(chunk)))
+        gas += receipt["gasUsed"]
+        paid += sum(1 for log in receipt["logs"] if log["topics"][0] == payout_topic)
+    batch_seconds = time.perf_counter() - started
+    batch_gas = gas / claims
+
+    print(f"claims={claims}  batch_size={batch_size}  pub_key_bytes={key_bytes}  paid_in_batches={paid}")
+    print(f"{'mode':<10}{'txs':>6}{'gas/claim':>12}{'claims/sec':>12}")
+    print(f"{'single':<10}{claims:>6}{single_gas:>12,.0f}{claims / single_seconds:>12.1f}")
+    batches = -(-claims // batch_size)
+    print(f"{'batched':<10}{batches:>6}{batch_gas:>12,.0f}{claims / batch_seconds:>12.1f}")
+    print(f"gas saving per claim: {1 - batch_gas / single_gas:.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--claims", type=int, default=100)
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--key-bytes", type=int, default=0, help="pubEncryptionKey length per claim (0: none)")
+    args = parser.parse_args()
+    try:
+        run(args.claims, args.batch_size, args.key_bytes)
+    finally:
+        reset_chain()
+
+
+if __name__ == "__main__":
+    main()
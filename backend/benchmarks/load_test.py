@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+load_test.py — Concurrent load against a running backend (WSGI or ASGI).
+
+Start the server under test first, e.g.:
+  python serve.py --bind 127.0.0.1:8080 --workers 4 --threads 8     # WSGI
+  uvicorn asgi:app --port 8081 --workers 4                           # ASGI
+
+Then:
+  python benchmarks/load_test.py --url http://127.0.0.1:8080/ipfs/<cid> --concurrency 500
+  python benchmarks/load_test.py --url http://127.0.0.1:8081/ipfs/<cid> --concurrency 500
+  python benchmarks/load_test.py --url http://127.0.0.1:8081/doc/stream_batch \\
+      --method POST --json '{"token_ids": [0,1,2,3,4,5,6,7]}'
+  python benchmarks/load_test.py --url http://127.0.0.1:8081/user/docs --cookie "session=..."
+
+Each virtual client issues requests back-to-back for --duration seconds and
+reads the full body, so streaming endpoints are measured end to end.
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+import httpx
+
+
+async def _client(client: httpx.AsyncClient, args, deadline: float, latencies: list, errors: list, nbytes: list):
+    body = json.loads(args.json) if args.json else None
+    while time.perf_counter() < deadline:
+        t0 = time.perf_counter()
+        try:
+            async with client.stream(args.method, args.url, json=body) as response:
+                size = 0
+                async for chunk in response.aiter_bytes():
+                    size += len(chunk)
+                if response.status_code >= 400:
+                    errors.append(response.status_code)
+                    continue
+            latencies.append(time.perf_counter() - t0)
+            nbytes.append(size)
+        except httpx.HTTPError as e:
+            errors.append(type(e).__name__)
+
+
+async def _run(args):
+    headers = {"Cookie": args.cookie} if args.cookie else {}
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    latencies, errors, nbytes = [], [], []
+    async with httpx.AsyncClient(headers=headers, limits=limits, timeout=args.timeout) as client:
+        deadline = time.perf_counter() + args.duration
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            _client(client, args, deadline, latencies, errors, nbytes) for _ in range(args.concurrency)
+        ))
+        elapsed = time.perf_counter() - started
+
+    print(f"{args.method} {args.url}")
+    print(f"  concurrency={args.concurrency} duration={elapsed:.1f}s")
+    print(f"  ok={len(latencies)} errors={len(errors)} rps={len(latencies) / elapsed:.1f}"
+          f" throughput={sum(nbytes) / elapsed / 1e6:.2f} MB/s")
+    if latencies:
+        latencies.sort()
+        ms = [x * 1000 for x in latencies]
+        print(f"  latency mean={statistics.mean(ms):.1f} ms p50={ms[len(ms) // 2]:.1f} ms"
+              f" p95={ms[int(len(ms) * 0.95) - 1]:.1f} ms p99={ms[int(len(ms) * 0.99) - 1]:.1f} ms")
+    if errors:
+        kinds = {}
+        for e in errors:
+            kinds[e] = kinds.get(e, 0) + 1
+        print(f"  error breakdown: {kinds}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent HTTP load test")
+    parser.add_argument("--url", required=True)
+    parser.add_argument("--method", default="GET")
+    parser.add_argument("--json", help="JSON request body")
+    parser.add_argument("--cookie", help="Cookie header (for /user/docs)")
+    parser.add_argument("--concurrency", "-c", type=int, default=100)
+    parser.add_argument("--duration", "-d", type=float, default=30.0)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
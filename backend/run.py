@@ -12,6 +12,8 @@ app = create_app()
 @app.cli.command("init-admin")
 def init_admin():
     """Initializes the default admin user."""
+    # Schema creation normally happens on the startup-check thread; don't race it
+    db.create_all()
     admin_email = app.config.get('ADMIN_EMAIL')
     admin_password = os.environ.get('ADMIN_PASSWORD')
 
@@ -35,5 +37,21 @@ def init_admin():
     db.session.commit()
 
 
+@app.cli.command("rebuild-rollups")
+def rebuild_rollups():
+    """Recomputes the ActionLog hour/day rollup tables from existing rows."""
+    from app.indexer_store import rebuild_action_rollups
+    db.create_all()
+    print(f"Rolled up {rebuild_action_rollups(db.session)} ActionLog rows.")
+
+
+@app.cli.command("rotate-action-logs")
+def rotate_action_logs():
+    """Moves old ActionLog months into month tables and archives expired ones."""
+    from app import action_partitions
+    db.create_all()
+    print(action_partitions.maintain(db.session, app.config))
+
+
 if __name__ == '__main__':
     app.run(debug=False)  # debug=False for production
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+serve.py — Production entry point (gunicorn, preloaded, fork-safe).
+
+run.py's app.run() is Flask's development server.  This script runs the same
+app under gunicorn with --preload, so imports and create_app() happen once
+in the master and workers fork copy-on-write.  Each worker then:
+
+  post_fork         rebuilds Web3 HTTP sessions, the DB pool and the
+                    faucet client so nothing network-bound is shared
+  post_worker_init  warms the ABI/contract registry, chain id and DB pool
+                    before the worker starts accepting connections, then
+                    starts the leader-elected event indexer (INDEXER_ENABLED)
+
+Usage:
+  python serve.py
+  python serve.py --bind 0.0.0.0:8080 --worker-class gthread --workers 4 --threads 8
+  python serve.py --worker-class gevent --worker-connections 1000
+
+Every flag can also be set through the environment (SERVE_BIND,
+SERVE_WORKER_CLASS, SERVE_WORKERS, SERVE_THREADS, SERVE_WORKER_CONNECTIONS,
+SERVE_TIMEOUT).  gthread is the default and what the shared asyncio loop in
+app/aio.py is written for; gevent suits many slow, mostly-waiting requests
+(IPFS proxying) on the sync Web3/requests paths.
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+from pathlib import Path
+
+
+def _parse_args(argv=None):
+    env = os.environ.get
+    parser = argparse.ArgumentParser(
+        description="Essentialis backend — production server",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__,
+    )
+    parser.add_argument("--bind", "-b", default=env("SERVE_BIND", "0.0.0.0:8080"))
+    parser.add_argument("--worker-class", "-k", choices=["gthread", "gevent"],
+                        default=env("SERVE_WORKER_CLASS", "gthread"))
+    parser.add_argument("--workers", "-w", type=int,
+                        default=int(env("SERVE_WORKERS", str(multiprocessing.cpu_count() * 2 + 1))))
+    parser.add_argument("--threads", type=int, default=int(env("SERVE_THREADS", "8")),
+                        help="Threads per worker (gthread)")
+    parser.add_argument("--worker-connections", type=int, default=int(env("SERVE_WORKER_CONNECTIONS", "1000")),
+                        help="Concurrent connections per worker (gevent)")
+    parser.add_argument("--timeout", type=int, default=int(env("SERVE_TIMEOUT", "120")))
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = _parse_args(argv)
+
+    # gevent must patch the stdlib before anything imports socket/threading
+    if args.worker_class == "gevent":
+        from gevent import monkey
+        monkey.patch_all()
+
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+    from gunicorn.app.base import BaseApplication
+
+    from app import create_app
+    from app import lifecycle
+
+    # No background threads in the master (they would not survive fork); warm() starts the
+    # event indexer and the startup checks per worker
+    flask_app = create_app(start_background=False, start_checks=False)
+
+    def post_fork(server, worker):
+        lifecycle.reinit_after_fork(flask_app)
+
+    def post_worker_init(worker):
+        timings = lifecycle.warm(flask_app)
+        flask_app.logger.info(f"Worker {os.getpid()} warmed: {timings}")
+
+    options = {
+        "bind": args.bind,
+        "worker_class": args.worker_class,
+        "workers": args.workers,
+        "timeout": args.timeout,
+        "preload_app": True,
+        "post_fork": post_fork,
+        "post_worker_init": post_worker_init,
+    }
+    if args.worker_class == "gthread":
+        options["threads"] = args.threads
+    else:
+        options["worker_connections"] = args.worker_connections
+
+    class _Server(BaseApplication):
+        def load_config(self):
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return flask_app
+
+    _Server().run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""In-memory eth_getLogs and ActionLogged log factory for indexer tests."""
+
+import json
+from datetime import datetime, UTC
+from pathlib import Path
+
+from eth_abi import encode
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from web3 import Web3
+
+from app import db
+from app.event_indexer import Stream
+from app.indexer_store import store_action_logged
+
+ABI = json.loads((Path(__file__).resolve().parent.parent / "app" / "abi" / "ActionLogger.json").read_text())
+LOGGER_ADDRESS = "0x000000000000000000000000000000000000dEaD"
+USER = "0x" + "ab" * 20
+ACTION_LOGGED = Web3.keccak(text="ActionLogged(address,string,uint256,string)")
+
+
+def action_log(block, log_index, action="login", when=datetime(2026, 1, 5, 12), fork="a"):
+    """A raw ActionLogged log as eth_getLogs returns it.  ``fork`` varies the block hash (reorgs)."""
+    return {
+        "address": LOGGER_ADDRESS,
+        "topics": [ACTION_LOGGED, bytes(12) + bytes.fromhex(USER[2:])],
+        "data": encode(["string", "uint256", "string"], [action, int(when.replace(tzinfo=UTC).timestamp()), "{}"]),
+        "blockNumber": block,
+        "blockHash": Web3.keccak(text=f"{fork}:{block}"),
+        "transactionHash": Web3.keccak(text=f"{fork}:{block}:{log_index}"),
+        "logIndex": log_index,
+        "removed": False,
+    }
+
+
+class FakeEth:
+    """
+    get_logs over a list of raw logs.  ``max_range`` makes wider requests fail
+    the way hosted providers do; ``errors`` are raised by the next calls, in order.
+    """
+
+    def __init__(self, logs=(), max_range=None, block_number=0):
+        self.logs = list(logs)
+        self.max_range = max_range
+        self.block_number = block_number
+        self.errors = []
+        self.calls = []
+
+    def get_logs(self, params):
+        from_block, to_block = params["fromBlock"], params["toBlock"]
+        self.calls.append((from_block, to_block))
+        if self.errors:
+            raise self.errors.pop(0)
+        if self.max_range is not None and to_block - from_block + 1 > self.max_range:
+            raise ValueError(f"query returned more than 10000 results; block range {from_block}-{to_block}")
+        return [log for log in self.logs if from_block <= log["blockNumber"] <= to_block]
+
+
+class FakeWeb3:
+    def __init__(self, eth):
+        self.eth = eth
+
+
+def action_stream():
+    return Stream(Web3().eth.contract(address=LOGGER_ADDRESS, abi=ABI), ["ActionLogged"], store_action_logged)
+
+
+def session_factory(tmp_path, name="indexer.db"):
+    engine = create_engine(f"sqlite:///{tmp_path / name}")
+    db.metadata.create_all(engine)
+    return sessionmaker(bind=engine, autoflush=False)
@@ -0,0 +1,59 @@
+"""Replaying ActionLogged events after rotation or archival neither re-inserts them nor re-counts rollups."""
+
+import time
+from datetime import datetime, UTC
+
+from sqlalchemy import create_engine, func
+from sqlalchemy.orm import Session
+
+from app import action_partitions, indexer_store
+from app.models import ActionLog, ActionLogPartition, ActionRollup, UserActivityRollup
+
+USER = "0x" + "ab" * 20
+
+
+def _event(tx, log_index, when):
+    return {"args": {"user": USER, "action": "login", "details": "{}", "timestamp": int(when.replace(tzinfo=UTC).timestamp())},
+            "blockNumber": 100 + tx, "transactionHash": "0x" + f"{tx:064x}", "logIndex": log_index}
+
+
+def _rollup_total(session):
+    return session.query(func.sum(ActionRollup.count)).filter_by(granularity="day").scalar()
+
+
+def test_replay_after_rotate_and_archive(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'logs.db'}")
+    for model in (ActionLog, ActionLogPartition, ActionRollup, UserActivityRollup):
+        model.__table__.create(engine)
+    events = [_event(1, 0, datetime(2025, 1, 10)), _event(1, 1, datetime(2025, 1, 10)), _event(2, 0, datetime(2025, 2, 3))]
+
+    with Session(engine) as session:
+        assert indexer_store.store_action_logged(session, events) == 3
+        session.commit()
+        assert _rollup_total(session) == 3
+
+        assert action_partitions.rotate(session, now=datetime(2025, 12, 1), hot_months=1) == ["2025-01", "2025-02"]
+        assert indexer_store.store_action_logged(session, events) == 0
+        session.commit()
+        assert session.query(ActionLog).count() == 0
+        assert _rollup_total(session) == 3
+
+        archived = action_partitions.archive(session, tmp_path / "archive", now=datetime(2025, 12, 1),
+                                             retention_months=10)
+        assert archived == ["2025-01"]
+        # A new log in the archived month is still stored and counted
+        assert indexer_store.store_action_logged(session, events + [_event(3, 0, datetime(2025, 1, 20))]) == 1
+        session.commit()
+        assert _rollup_total(session) == 4
+
+
+def test_action_timestamps_are_utc(monkeypatch):
+    monkeypatch.setenv("TZ", "America/New_York")
+    time.tzset()
+    try:
+        row = indexer_store.action_log_row(_event(1, 0, datetime(2025, 1, 10, 3)))
+        assert row["timestamp"] == datetime(2025, 1, 10, 3)
+        assert action_partitions.utc_naive(datetime.fromisoformat("2025-01-10T05:00:00+02:00")) == datetime(2025, 1, 10, 3)
+    finally:
+        monkeypatch.undo()
+        time.tzset()
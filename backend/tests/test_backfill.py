@@ -0,0 +1,130 @@
+"""Parallel backfill and the adaptive eth_getLogs window against an in-memory chain."""
+
+import threading
+import time
+
+import pytest
+from requests.exceptions import ReadTimeout
+
+from app import event_indexer
+from app.event_indexer import AdaptiveWindow, backfill, is_range_error, load_checkpoint, resume_block, scan_logs
+from app.models import ActionLog
+from fake_chain import LOGGER_ADDRESS, FakeEth, FakeWeb3, action_log, action_stream, session_factory
+
+
+class SlowEth(FakeEth):
+    """Earlier ranges answer last, so fetches complete out of block order."""
+
+    def __init__(self, logs, fail_from=None):
+        super().__init__(logs)
+        self.fail_from = fail_from
+        self._lock = threading.Lock()
+
+    def get_logs(self, params):
+        time.sleep(max(0, 400 - params["fromBlock"]) / 4000)
+        if params["fromBlock"] == self.fail_from:
+            raise ValueError("execution reverted")
+        with self._lock:
+            return super().get_logs(params)
+
+
+def _backfill(tmp_path, monkeypatch, eth, end_block=399):
+    session = session_factory(tmp_path)()
+    stream = action_stream()
+    stream.state = load_checkpoint(session, LOGGER_ADDRESS, stream.key, {"INDEXER_START_BLOCK": 100})
+    session.commit()
+    monkeypatch.setattr(event_indexer, "_thread_web3", lambda rpc_url: FakeWeb3(eth))
+    committed = []
+    process_window = event_indexer.process_window
+
+    def recording(db_session, stream, to_block, logs, fence=None):
+        committed.append(to_block)
+        return process_window(db_session, stream, to_block, logs, fence)
+
+    monkeypatch.setattr(event_indexer, "process_window", recording)
+    config = {"RPC_URL": "http://fake", "INDEXER_BACKFILL_WORKERS": 4}
+    return session, stream, committed, lambda: backfill(session, stream, end_block, workers=4, range_size=50,
+                                                        config=config)
+
+
+def test_backfill_commits_ranges_in_order(tmp_path, monkeypatch):
+    logs = [action_log(block, 0) for block in range(100, 400, 7)]
+    session, stream, committed, run = _backfill(tmp_path, monkeypatch, SlowEth(logs))
+    run()
+    assert committed == list(range(149, 400, 50))
+    assert session.query(ActionLog).count() == len(logs)
+    assert resume_block(stream.state) == 400
+
+
+def test_backfill_failure_keeps_the_committed_prefix(tmp_path, monkeypatch):
+    logs = [action_log(block, 0) for block in range(100, 400, 7)]
+    session, stream, committed, run = _backfill(tmp_path, monkeypatch, SlowEth(logs, fail_from=250))
+    with pytest.raises(ValueError):
+        run()
+    assert committed == [149, 199, 249]
+    assert resume_block(stream.state) == 250
+    assert session.query(ActionLog).count() == len([log for log in logs if log["blockNumber"] < 250])
+
+
+def test_window_grows_and_halves():
+    window = AdaptiveWindow(initial=1, minimum=1, maximum=10, growth=1.5)
+    window.grow()
+    assert window.size == 2  # at least one block more, even below 1 / (growth - 1)
+    for _ in range(10):
+        window.grow()
+    assert window.size == 10
+    window.shrink()
+    assert window.size == 5
+    for _ in range(5):
+        window.shrink()
+    assert window.size == 1 and window.at_minimum
+
+
+def test_scan_shrinks_to_the_provider_limit_and_grows_back():
+    eth = FakeEth([action_log(block, 0) for block in range(0, 1000, 10)], max_range=100)
+    window = AdaptiveWindow(initial=400, maximum=1000)
+    windows = list(scan_logs(FakeWeb3(eth), LOGGER_ADDRESS, [], 0, 999, window))
+
+    assert eth.calls[:3] == [(0, 399), (0, 199), (0, 99)]  # halved on each "more than 10000 results"
+    assert eth.calls[3] == (100, 249)  # grown after the accepted range, then halved again
+    assert windows[0][0] == 0 and windows[-1][1] == 999
+    assert all(b[0] == a[1] + 1 for a, b in zip(windows, windows[1:]))
+    assert sum(len(logs) for _, _, logs in windows) == 100
+
+
+def test_range_error_at_minimum_window_is_raised():
+    eth = FakeEth(max_range=0)
+    with pytest.raises(ValueError):
+        list(scan_logs(FakeWeb3(eth), LOGGER_ADDRESS, [], 0, 9, AdaptiveWindow(initial=4, minimum=1)))
+    assert [end - start + 1 for start, end in eth.calls] == [4, 2, 1]
+
+
+def test_hard_errors_are_not_retried():
+    eth = FakeEth([action_log(5, 0)])
+    eth.errors.append(ValueError("execution reverted"))
+    with pytest.raises(ValueError):
+        list(scan_logs(FakeWeb3(eth), LOGGER_ADDRESS, [], 0, 9, AdaptiveWindow(initial=10)))
+    assert eth.calls == [(0, 9)]
+
+
+@pytest.mark.parametrize("exc", [
+    ValueError("query returned more than 10000 results"),
+    ValueError({"code": -32005, "message": "Log response size exceeded. You can make eth_getLogs requests with "
+                                           "up to a 2K block range"}),
+    ValueError("eth_getLogs block range is too large, max is 1k blocks"),
+    ValueError("Query timeout exceeded. Consider reducing your block range"),
+    ValueError("limit exceeded"),
+    ReadTimeout("HTTPSConnectionPool: Read timed out."),
+    TimeoutError(),
+])
+def test_provider_range_hints(exc):
+    assert is_range_error(exc)
+
+
+@pytest.mark.parametrize("exc", [
+    ValueError("execution reverted"),
+    ConnectionError("Connection refused"),
+    ValueError({"code": -32602, "message": "invalid argument 0: hex string without 0x prefix"}),
+])
+def test_other_errors_are_not_range_errors(exc):
+    assert not is_range_error(exc)
@@ -0,0 +1,71 @@
+"""A relayed claim is visible from any worker: FaucetClaim row, then its batch's OutboundTx row."""
+
+import json
+import types
+
+from app.claim_batcher import PAYOUT_TOPIC, ClaimBatcher, stored_claim
+from app.models import OutboundTx
+from fake_chain import session_factory
+
+RECIPIENT = "0x" + "cd" * 20
+
+
+class OutboxSender:
+    """submit() queues an OutboundTx row, as tx_outbox does."""
+
+    def __init__(self, factory):
+        self.factory = factory
+        self.address = "0x" + "01" * 20
+        self.web3 = types.SimpleNamespace(eth=types.SimpleNamespace(estimate_gas=self._no_estimate))
+        self.submitted = 0
+
+    @staticmethod
+    def _no_estimate(tx):
+        raise ValueError("no node")
+
+    def submit(self, tx, label=None):
+        handle = types.SimpleNamespace(id=f"req{self.submitted}")
+        session = self.factory()
+        session.add(OutboundTx(request_id=handle.id, sender="OWNER_PRIVATE_KEY", tx=json.dumps(tx), status="queued"))
+        session.commit()
+        session.close()
+        self.submitted += 1
+        return handle
+
+
+def _batcher(factory):
+    """A batcher whose batches are flushed by the test instead of its thread."""
+    contract = types.SimpleNamespace(address="0x" + "02" * 20, encode_abi=lambda name, args: "0x")
+    batcher = ClaimBatcher(OutboxSender(factory), contract, session_factory=factory)
+    batcher.stop()
+    batcher._thread.join(5)
+    return batcher
+
+
+def test_claim_status_from_another_worker(tmp_path):
+    factory = session_factory(tmp_path, "claims.db")
+    batcher = _batcher(factory)
+    pending = batcher.add(RECIPIENT, 1, 0)
+    other_worker = factory()
+    assert stored_claim(other_worker, RECIPIENT)["status"] == "batching"
+
+    batcher._flush([pending])
+    other_worker.expire_all()
+    assert stored_claim(other_worker, RECIPIENT)["status"] == "queued"
+
+    receipt = {"blockNumber": 7, "logs": [{"topics": [PAYOUT_TOPIC, "0x" + "00" * 12 + RECIPIENT[2:]]}]}
+    row = other_worker.query(OutboundTx).filter_by(request_id="req0").one()
+    row.status, row.tx_hash, row.receipt = "mined", "0x" + "ee" * 32, json.dumps(receipt)
+    other_worker.commit()
+    assert stored_claim(other_worker, RECIPIENT) == {
+        "claimId": pending.id, "status": "mined", "txHash": "0x" + "ee" * 32, "blockNumber": 7, "error": None}
+
+
+def test_mined_batch_without_payout_is_skipped(tmp_path):
+    factory = session_factory(tmp_path, "claims.db")
+    batcher = _batcher(factory)
+    batcher._flush([batcher.add(RECIPIENT, 1, 0)])
+    session = factory()
+    session.query(OutboundTx).update({"status": "mined", "receipt": json.dumps({"blockNumber": 7, "logs": []})})
+    session.commit()
+    assert stored_claim(session, RECIPIENT)["status"] == "skipped"
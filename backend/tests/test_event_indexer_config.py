@@ -0,0 +1,22 @@
+"""The event indexer reads its settings from the config it is given, not the global Config."""
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app import event_indexer
+from app.models import IndexerState
+
+
+def test_new_checkpoint_starts_at_configured_block(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'indexer.db'}")
+    IndexerState.__table__.create(engine)
+    with Session(engine) as session:
+        state = event_indexer.load_checkpoint(session, "0x" + "11" * 20, "ActionLogged",
+                                              {"INDEXER_START_BLOCK": 1234})
+        assert (state.last_block, event_indexer.resume_block(state)) == (1233, 1234)
+
+
+def test_backfill_threads_use_configured_rpc():
+    first = event_indexer._thread_web3("http://rpc-a.invalid")
+    assert event_indexer._thread_web3("http://rpc-a.invalid") is first
+    assert event_indexer._thread_web3("http://rpc-b.invalid").provider.endpoint_uri == "http://rpc-b.invalid"
@@ -0,0 +1,66 @@
+"""FeeOracle: one eth_feeHistory per new block, legacy fallback only when the node lacks EIP-1559."""
+
+import pytest
+from web3.exceptions import MethodUnavailable
+
+from app import fee_oracle
+from app.fee_oracle import FeeOracle
+
+
+class FakeEth:
+    def __init__(self):
+        self.block_number = 100
+        self.gas_price = 7
+        self.history_calls = 0
+        self.history_error = None
+        self.history = None
+
+    def fee_history(self, count, newest, percentiles):
+        self.history_calls += 1
+        if self.history_error is not None:
+            raise self.history_error
+        if self.history is not None:
+            return self.history
+        return {"oldestBlock": self.block_number - count + 1, "baseFeePerGas": [10] * (count + 1),
+                "reward": [[2_000_000_000]] * count}
+
+
+class FakeWeb3:
+    def __init__(self):
+        self.eth = FakeEth()
+
+
+@pytest.fixture
+def oracle(monkeypatch):
+    monkeypatch.setattr(fee_oracle, "REFRESH_SECONDS", 0)
+    return FeeOracle(FakeWeb3())
+
+
+def test_refreshes_once_per_block(oracle):
+    eth = oracle.web3.eth
+    assert oracle.snapshot().block == 100
+    oracle.snapshot()
+    oracle.snapshot()
+    assert eth.history_calls == 1
+    eth.block_number = 101
+    assert oracle.snapshot().block == 101
+    assert eth.history_calls == 2
+
+
+def test_transient_error_keeps_eip1559(oracle):
+    eth = oracle.web3.eth
+    first = oracle.snapshot()
+    eth.block_number, eth.history_error = 101, TimeoutError("read timed out")
+    assert oracle.snapshot() is first  # cached value served
+    eth.block_number, eth.history_error = 102, None
+    assert oracle.snapshot().eip1559 and "maxFeePerGas" in oracle.tx_fields()
+
+
+def test_missing_method_downgrades(oracle):
+    oracle.web3.eth.history_error = MethodUnavailable("the method eth_feeHistory does not exist/is not available")
+    assert oracle.tx_fields() == {"gasPrice": 7}
+
+
+def test_missing_base_fee_downgrades(oracle):
+    oracle.web3.eth.history = {"oldestBlock": 91, "baseFeePerGas": [], "reward": []}
+    assert oracle.tx_fields() == {"gasPrice": 7}
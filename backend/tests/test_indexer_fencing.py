@@ -0,0 +1,80 @@
+"""Two indexers on the same window: only one commits, checkpoints never move back, rollups count once."""
+
+import pytest
+from sqlalchemy import func
+
+from app import event_indexer, indexer_store
+from app.event_indexer import IndexerStopped, load_checkpoint, process_window
+from app.leases import Lease
+from app.models import ActionLog, ActionRollup, IndexerState
+from fake_chain import LOGGER_ADDRESS, action_log, action_stream, session_factory
+
+
+def _stream(session):
+    stream = action_stream()
+    stream.state = load_checkpoint(session, LOGGER_ADDRESS, stream.key, {"INDEXER_START_BLOCK": 100})
+    session.commit()
+    return stream
+
+
+def _rollup_total(session):
+    return session.query(func.sum(ActionRollup.count)).filter_by(granularity="day").scalar()
+
+
+def test_overlapping_leaders_commit_one_window(tmp_path):
+    factory = session_factory(tmp_path)
+    leader, stalled = factory(), factory()
+    first, second = _stream(leader), _stream(stalled)  # both loaded the checkpoint before either wrote
+    logs = [action_log(101, 0), action_log(101, 1), action_log(103, 0)]
+
+    assert process_window(leader, first, 110, logs) == 3
+    with pytest.raises(IndexerStopped):
+        process_window(stalled, second, 110, logs)
+
+    assert leader.query(ActionLog).count() == 3
+    assert _rollup_total(leader) == 3
+
+
+def test_checkpoint_never_moves_back(tmp_path):
+    factory = session_factory(tmp_path)
+    leader, stalled = factory(), factory()
+    first, second = _stream(leader), _stream(stalled)
+
+    process_window(leader, first, 200, [action_log(150, 0)])
+    with pytest.raises(IndexerStopped):
+        process_window(stalled, second, 120, [action_log(110, 0)])
+
+    state = leader.query(IndexerState).one()
+    leader.refresh(state)
+    assert (state.last_block, state.last_log_index) == (200, -1)
+    assert leader.query(ActionLog).count() == 1
+
+
+def test_failed_fence_writes_nothing(tmp_path):
+    session = session_factory(tmp_path)()
+    stream = _stream(session)
+    with pytest.raises(IndexerStopped):
+        process_window(session, stream, 110, [action_log(101, 0)], fence=lambda s: False)
+    assert session.query(ActionLog).count() == 0
+    assert event_indexer.resume_block(stream.state) == 100
+
+
+def test_rollups_count_only_inserted_rows(tmp_path):
+    session = session_factory(tmp_path)()
+    row = indexer_store.action_log_row(action_stream().decode([action_log(101, 0)])[0])
+    indexer_store.insert_ignore(session, ActionLog, [row], ["tx_hash", "log_index"])  # another writer got it first
+    new = indexer_store.action_log_row(action_stream().decode([action_log(102, 0)])[0])
+
+    inserted = indexer_store.insert_ignore_returning(session, ActionLog, [row, new], ["tx_hash", "log_index"])
+    assert inserted == [new]
+
+
+def test_lease_fence(tmp_path):
+    factory = session_factory(tmp_path)
+    mine, theirs = Lease(factory, "event-indexer", ttl=20), Lease(factory, "event-indexer", ttl=20)
+    assert mine.acquire()
+    session = factory()
+    assert mine.held(session) and not theirs.held(session)
+    session.rollback()
+    mine.release()
+    assert not mine.held(session)
@@ -0,0 +1,50 @@
+"""Each APP_PROFILES value loads only the app modules its blueprints need (checked in a fresh interpreter)."""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+BACKEND = Path(__file__).resolve().parent.parent
+
+# app.* modules create_app() imports per profile (excluding the app package itself)
+EXPECTED = {
+    "read": {"aio", "config", "dbretry", "decorators", "fee_oracle", "models", "pubkey_directory", "readiness",
+             "reads", "receipt_tracker", "services"},
+    "write": {"admin", "aio", "auth", "claim_batcher", "claim_index", "config", "dbretry", "decorators", "faucet",
+              "faucet_signer", "fee_oracle", "ipfs", "models", "pubkey_directory", "readiness", "receipt_tracker",
+              "routes", "services", "tx_sender"},
+    "deploy": {"config", "deploy", "deploy.routes", "deploy.services", "deploy.services.chain",
+               "deploy.services.compiler", "deploy.services.deployer", "fee_oracle", "readiness"},
+    "admin": {"action_partitions", "admin", "admin_routes", "auth", "config", "dbretry", "decorators", "live_feed",
+              "models", "readiness"},
+}
+
+SCRIPT = """
+import json, sys
+from app import create_app
+create_app(start_background=False)
+print(json.dumps(sorted(name[4:] for name in sys.modules if name.startswith("app."))))
+"""
+
+
+def _imported_modules(profile, tmp_path):
+    env = dict(os.environ, APP_PROFILES=profile, PYTHONPATH=str(BACKEND), STARTUP_VALIDATION="off",
+               DATABASE_URL=f"sqlite:///{tmp_path / 'profile.db'}", RPC_URL="http://127.0.0.1:8545",
+               NFT_DOC_CONTRACT_ADDRESS="0x0000000000000000000000000000000000000001",
+               ACTION_LOGGER_CONTRACT_ADDRESS="0x0000000000000000000000000000000000000002",
+               INDEXER_ENABLED="false")
+    result = subprocess.run([sys.executable, "-c", SCRIPT], cwd=BACKEND, env=env, capture_output=True, text=True,
+                            timeout=120)
+    assert result.returncode == 0, result.stderr
+    return set(json.loads(result.stdout.strip().splitlines()[-1]))
+
+
+@pytest.mark.parametrize("profile", EXPECTED)
+def test_profile_imports(profile, tmp_path):
+    if profile == "deploy":
+        pytest.importorskip("solcx")
+    assert _imported_modules(profile, tmp_path) == EXPECTED[profile]
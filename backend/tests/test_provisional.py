@@ -0,0 +1,81 @@
+"""The unconfirmed tail in ProvisionalLog: follows reorgs, never double-counts, drops once confirmed."""
+
+from web3 import Web3
+
+from app.event_indexer import load_checkpoint, poll_stream, refresh_provisional
+from app.indexer_store import drop_provisional, replace_provisional
+from app.models import ActionLog, ProvisionalLog
+from fake_chain import LOGGER_ADDRESS, FakeEth, FakeWeb3, action_log, action_stream, session_factory
+
+
+def _setup(tmp_path, logs):
+    session = session_factory(tmp_path)()
+    stream = action_stream()
+    stream.state = load_checkpoint(session, LOGGER_ADDRESS, stream.key, {"INDEXER_START_BLOCK": 101})
+    session.commit()
+    return session, stream, FakeEth(logs)
+
+
+def _provisional(session):
+    return sorted((row.block_number, row.tx_hash) for row in session.query(ProvisionalLog))
+
+
+def _tx(block, fork="a"):
+    return Web3.to_hex(action_log(block, 0, fork=fork)["transactionHash"])
+
+
+def test_poll_splits_confirmed_and_provisional(tmp_path):
+    session, stream, eth = _setup(tmp_path, [action_log(block, 0) for block in range(101, 106)])
+    poll_stream(session, FakeWeb3(eth), stream, head=105, confirmations=3)
+
+    assert sorted(row.block_number for row in session.query(ActionLog)) == [101, 102]
+    assert [block for block, _ in _provisional(session)] == [103, 104, 105]
+    assert (stream.state.last_block, stream.state.last_log_index) == (102, 0)
+
+
+def test_reorg_replaces_the_orphaned_tail(tmp_path):
+    session, stream, eth = _setup(tmp_path, [action_log(block, 0) for block in range(101, 106)])
+    poll_stream(session, FakeWeb3(eth), stream, head=105, confirmations=3)
+
+    # Blocks 104+ reorged: 104 is now empty, 105 and 106 carry other logs
+    eth.logs = [log for log in eth.logs if log["blockNumber"] < 104] + [action_log(105, 0, fork="b"),
+                                                                        action_log(106, 0, fork="b")]
+    poll_stream(session, FakeWeb3(eth), stream, head=106, confirmations=3)
+
+    assert sorted(row.block_number for row in session.query(ActionLog)) == [101, 102, 103]
+    assert session.query(ProvisionalLog.tx_hash).filter_by(block_number=104).count() == 0
+    assert [block for block, _ in _provisional(session)] == [105, 106]
+    assert {tx_hash for _, tx_hash in _provisional(session)} == {_tx(105, "b"), _tx(106, "b")}
+
+
+def test_refresh_is_idempotent(tmp_path):
+    session, stream, eth = _setup(tmp_path, [action_log(block, 0) for block in range(101, 106)])
+    refresh_provisional(session, FakeWeb3(eth), stream, head=105)
+    first = _provisional(session)
+    refresh_provisional(session, FakeWeb3(eth), stream, head=105)
+    assert _provisional(session) == first and len(first) == 5
+
+
+def test_replace_provisional_counts_added_and_rolled_back(tmp_path):
+    session, stream, _ = _setup(tmp_path, [])
+    canonical = stream.decode([action_log(block, 0) for block in (103, 104)])
+    assert replace_provisional(session, LOGGER_ADDRESS, stream.key, 103, canonical) == (2, 0)
+    assert replace_provisional(session, LOGGER_ADDRESS, stream.key, 103, canonical) == (0, 0)
+
+    forked = stream.decode([action_log(103, 0), action_log(104, 0, fork="b"), action_log(105, 0, fork="b")])
+    assert replace_provisional(session, LOGGER_ADDRESS, stream.key, 103, forked) == (2, 1)
+    assert _provisional(session) == sorted(
+        [(103, forked[0]["transactionHash"]), (104, forked[1]["transactionHash"]),
+         (105, forked[2]["transactionHash"])])
+
+
+def test_drop_provisional_only_touches_its_stream(tmp_path):
+    session, stream, _ = _setup(tmp_path, [])
+    replace_provisional(session, LOGGER_ADDRESS, stream.key, 103,
+                        stream.decode([action_log(block, 0) for block in (103, 104, 105)]))
+    replace_provisional(session, LOGGER_ADDRESS, "OtherStream", 103,
+                        stream.decode([action_log(103, 0, fork="other")]))
+
+    assert drop_provisional(session, LOGGER_ADDRESS, stream.key, 104) == 2
+    assert session.query(ProvisionalLog).filter_by(stream=stream.key).count() == 1
+    assert session.query(ProvisionalLog).filter_by(stream="OtherStream").count() == 1
@@ -0,0 +1,40 @@
+"""Public-key recovery from each transaction type eth_getTransactionByHash can return."""
+
+import pytest
+from eth_account import Account
+
+from app.pubkey_directory import recover_from_transaction
+
+BASE = {"nonce": 3, "gas": 21000, "to": "0x" + "11" * 20, "value": 5, "data": b"\x01\x02"}
+CASES = {
+    "eip1559": dict(BASE, type=2, chainId=11155420, maxFeePerGas=10**9, maxPriorityFeePerGas=10**8, accessList=[]),
+    "eip2930": dict(BASE, type=1, chainId=1, gasPrice=10**9,
+                    accessList=[{"address": "0x" + "22" * 20, "storageKeys": ["0x" + "00" * 32]}]),
+    "eip155": dict(BASE, chainId=11155420, gasPrice=10**9),
+    "pre155": dict(BASE, gasPrice=10**9),
+}
+
+
+def _fetched(account, fields):
+    """``fields`` signed by ``account``, shaped like a web3 get_transaction result."""
+    signed = account.sign_transaction(fields)
+    tx = {name: value for name, value in fields.items() if name != "data"}
+    tx.update({"type": fields.get("type", 0), "input": fields["data"], "from": account.address,
+               "hash": signed.hash, "r": signed.r, "s": signed.s, "v": signed.v})
+    if "type" in fields:
+        tx["yParity"] = signed.v
+    return tx
+
+
+@pytest.mark.parametrize("kind", CASES)
+def test_recovers_sender_key(kind):
+    account = Account.create()
+    assert recover_from_transaction(_fetched(account, CASES[kind])) == account._key_obj.public_key.to_hex()
+
+
+@pytest.mark.parametrize("kind", CASES)
+def test_rejects_key_of_another_address(kind):
+    tx = _fetched(Account.create(), CASES[kind])
+    tx["from"] = Account.create().address
+    with pytest.raises(ValueError):
+        recover_from_transaction(tx)
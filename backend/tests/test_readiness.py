@@ -0,0 +1,28 @@
+"""A preloaded master attaches an unready StartupState but runs no check thread; workers start it."""
+
+import threading
+
+from flask import Flask
+
+from app import readiness
+
+
+def _checker_threads():
+    return [thread for thread in threading.enumerate() if thread.name == "startup-checks"]
+
+
+def test_master_starts_no_checker(monkeypatch):
+    app = Flask(__name__)
+    app.config["STARTUP_VALIDATION"] = "background"
+    before = len(_checker_threads())
+
+    state = readiness.start(app, start_thread=False)
+    assert app.extensions["startup_state"] is state
+    assert not state.ready
+    assert len(_checker_threads()) == before
+
+    monkeypatch.setattr(readiness, "CHECKS", (("database", lambda app: "ok"),))
+    worker_state = readiness.start_checker(app)
+    for thread in _checker_threads():
+        thread.join(5)
+    assert worker_state.ready and app.extensions["startup_state"] is worker_state
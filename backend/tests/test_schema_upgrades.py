@@ -0,0 +1,49 @@
+"""schema_upgrades brings an action_log table created before log_index up to the model, idempotently."""
+
+from sqlalchemy import create_engine, inspect, text
+
+from app import schema_upgrades
+
+OLD_ACTION_LOG = """
+CREATE TABLE action_log (
+    id INTEGER NOT NULL PRIMARY KEY,
+    log_id_onchain BIGINT,
+    user_address VARCHAR(42),
+    action VARCHAR(255),
+    details TEXT,
+    timestamp DATETIME,
+    block_number BIGINT,
+    tx_hash VARCHAR(66) UNIQUE
+)
+"""
+
+
+def _old_schema_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as connection:
+        connection.execute(text(OLD_ACTION_LOG))
+        connection.execute(text("CREATE INDEX ix_action_log_timestamp ON action_log (timestamp)"))
+        connection.execute(text("INSERT INTO action_log (id, action, tx_hash) VALUES (1, 'login', '0xaa'), (2, 'mint', '0xbb')"))
+    return engine
+
+
+def test_upgrade_moves_unique_key_and_keeps_rows(tmp_path):
+    engine = _old_schema_engine(tmp_path)
+    assert schema_upgrades.upgrade(engine)
+
+    insp = inspect(engine)
+    assert "log_index" in {column["name"] for column in insp.get_columns("action_log")}
+    keys = [columns for _, _, columns in schema_upgrades._unique_keys(insp, "action_log")]
+    assert ["tx_hash", "log_index"] in keys and ["tx_hash"] not in keys
+
+    with engine.begin() as connection:
+        rows = connection.execute(text("SELECT id, action, tx_hash, log_index FROM action_log ORDER BY id")).all()
+        assert [tuple(row) for row in rows] == [(1, "login", "0xaa", 0), (2, "mint", "0xbb", 0)]
+        # A second ActionLogged event in the same tx is now storable
+        connection.execute(text("INSERT INTO action_log (action, tx_hash, log_index) VALUES ('mint', '0xbb', 1)"))
+
+    assert schema_upgrades.upgrade(engine) == []
+
+
+def test_upgrade_skips_missing_table(tmp_path):
+    assert schema_upgrades.upgrade(create_engine(f"sqlite:///{tmp_path / 'empty.db'}")) == []
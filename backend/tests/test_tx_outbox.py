@@ -0,0 +1,98 @@
+"""Two relays for one wallet: only the lease holder sends, nonces stay unique, failover works."""
+
+import time
+
+import pytest
+from eth_account import Account
+from flask import Flask
+from web3 import EthereumTesterProvider, Web3
+
+from app import db, tx_outbox, tx_sender
+from app.models import OutboundTx
+
+KEY = 'OWNER_PRIVATE_KEY'
+
+
+@pytest.fixture
+def setup(tmp_path):
+    account = Account.create()
+    app = Flask(__name__)
+    app.config.update(SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'outbox.db'}", RPC_URL="http://127.0.0.1:1",
+                      OWNER_PRIVATE_KEY=account.key.hex(), TX_SENDER_LEASE_TTL=4)
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+
+    w3 = Web3(EthereumTesterProvider())
+    w3.eth.send_transaction({"from": w3.eth.accounts[0], "to": account.address, "value": 10 ** 18})
+    # The relay's local sender, on the in-process test chain instead of RPC_URL
+    tx_sender._senders[KEY] = tx_sender.TxSender(w3, account.key.hex(), name="faucet")
+
+    first = tx_outbox.get_outbox(app, KEY, "faucet")
+    second = tx_outbox.TxOutbox(app, KEY, "faucet-2", first.session_factory, first.watcher)  # another worker
+    yield app, w3, first, second
+    first.stop()
+    second.stop()
+    tx_sender._senders.pop(KEY).stop()
+    tx_outbox._reset_after_fork()
+
+
+def test_one_relay_sends_for_both(setup):
+    app, w3, first, second = setup
+    deadline = time.monotonic() + 5
+    while not (first.is_leader or second.is_leader) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert first.is_leader != second.is_leader
+
+    handles = [(first, second)[i % 2].submit({"to": w3.eth.accounts[1], "value": 1, "gas": 21000}, label=f"t{i}")
+               for i in range(6)]
+    for handle in handles:
+        handle.wait(timeout=30)
+        assert handle.status == "mined", handle.error
+        assert handle.receipt["status"] == 1
+    assert sorted(handle.nonce for handle in handles) == list(range(6))
+    with app.app_context():
+        assert {row.status for row in OutboundTx.query.all()} == {"mined"}
+
+
+def test_failover_after_leader_stops(setup):
+    app, w3, first, second = setup
+    time.sleep(0.5)
+    leader, follower = (first, second) if first.is_leader else (second, first)
+    leader.stop()
+    handle = follower.submit({"to": w3.eth.accounts[1], "value": 1, "gas": 21000}, label="after-failover")
+    handle.wait(timeout=30)
+    assert handle.status == "mined", handle.error
+    assert follower.is_leader
+
+
+def test_demoted_relay_sends_nothing_and_requeues(setup):
+    app, w3, first, second = setup
+    for outbox in (first, second):  # drive both relays by hand
+        outbox.stop()
+        outbox._thread.join(5)
+    sender = tx_sender._senders[KEY]
+    assert first.lease.acquire()
+    first._take_over(sender)
+
+    handle = first.submit({"to": w3.eth.accounts[1], "value": 1, "gas": 21000}, label="stalled")
+    first.lease.valid_until = 0.0  # stalled past ttl/2 with the row already claimed
+    first._claim_queued(sender)
+    relayed, _ = first._relayed[next(iter(first._relayed))]
+    relayed.wait(timeout=10)
+    assert relayed.status == "unsent"
+    assert w3.eth.get_transaction_count(sender.address) == 0
+    first._write_back()
+    with app.app_context():
+        row = OutboundTx.query.filter_by(request_id=handle.id).one()
+        assert (row.status, row.nonce, row.tx_hash) == ("queued", None, None)
+
+    first.lease.release()
+    assert second.lease.acquire()
+    second._take_over(sender)
+    second._claim_queued(sender)
+    second._relayed[next(iter(second._relayed))][0].wait(timeout=30)
+    second._write_back()
+    handle.wait(timeout=30)
+    assert handle.status == "mined", handle.error
+    assert handle.nonce == 0
@@ -19,6 +19,7 @@ contract EssentialisPayout is EIP712 {
 
     event Payout(address indexed user, uint256 amount, uint256 nonce);
     event KeyRegistered(address indexed user, string pubKey); // @audit New event
+    event ClaimSkipped(address indexed user, uint256 nonce, string reason);
 
     modifier onlyOwner() { require(msg.sender == owner, "Not owner"); _; }
     modifier notPaused() { require(!paused, "Paused"); _; }
@@ -27,6 +28,10 @@ contract EssentialisPayout is EIP712 {
     bytes32 private constant CLAIM_TYPEHASH =
         keccak256("Claim(address recipient,uint256 amount,uint256 nonce,uint256 deadline)");
 
+    // Gas forwarded to each recipient in claimBatch: enough for a plain receive()
+    // that emits an event, too little for one recipient to starve the rest of the batch
+    uint256 private constant BATCH_TRANSFER_GAS = 2300;
+
     constructor() EIP712("EssentialisPayout", "1") {
         owner = msg.sender;
     }
@@ -72,6 +77,50 @@ contract EssentialisPayout is EIP712 {
         emit Payout(recipient, amount, nonce);
     }
 
+    // Owner-relayed payouts for many recipients in one transaction. The owner is
+    // the signer claim() checks against, so no per-recipient signature is needed.
+    // expectedNonces[i] must equal nonces[recipients[i]]: a claim relayed twice
+    // (or twice in one batch with the same nonce) is skipped, not paid again.
+    // Entries failing a check emit ClaimSkipped instead of reverting the batch.
+    function claimBatch(
+        address[] calldata recipients,
+        uint256[] calldata amounts,
+        uint256[] calldata expectedNonces,
+        string[] calldata pubEncryptionKeys
+    ) external onlyOwner notPaused {
+        uint256 count = recipients.length;
+        require(
+            amounts.length == count && expectedNonces.length == count && pubEncryptionKeys.length == count,
+            "Length mismatch"
+        );
+        uint256 amount = payoutAmount;
+
+        for (uint256 i = 0; i < count; i++) {
+            address recipient = recipients[i];
+            uint256 nonce = nonces[recipient];
+
+            if (isBlacklisted[recipient]) { emit ClaimSkipped(recipient, nonce, "Blacklisted"); continue; }
+            if (nonce != expectedNonces[i]) { emit ClaimSkipped(recipient, nonce, "Stale nonce"); continue; }
+            if (amounts[i] != amount) { emit ClaimSkipped(recipient, nonce, "Wrong amount"); continue; }
+            if (address(this).balance < amount) { emit ClaimSkipped(recipient, nonce, "Insufficient funds"); continue; }
+
+            nonces[recipient] = nonce + 1; // before the transfer, as in claim()
+            (bool ok, ) = payable(recipient).call{value: amount, gas: BATCH_TRANSFER_GAS}("");
+            if (!ok) {
+                nonces[recipient] = nonce;
+                emit ClaimSkipped(recipient, nonce, "Transfer failed");
+                continue;
+            }
+
+            if (bytes(pubEncryptionKeys[i]).length > 0) {
+                encryptionKeys[recipient] = pubEncryptionKeys[i];
+                emit KeyRegistered(recipient, pubEncryptionKeys[i]);
+            }
+
+            emit Payout(recipient, amount, nonce);
+        }
+    }
+
     // Fallback registration for users who already claimed or don't need funds
     function registerEncryptionKey(string calldata pubKey) external {
         require(bytes(pubKey).length > 0, "Empty key");